@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+"""
+Scheduled backup script.
+Backs up all schools (or selected ones) straight to disk, outside the web worker.
+
+Example (cron, every night at 01:00):
+    0 1 * * * cd /path/to/tansealsen-3.0 && python backup_all.py --out /var/backups/tanse --incremental --workers 4
+
+Equivalent Flask CLI command:
+    flask --app my_app backup-all --out /var/backups/tanse
+"""
+
+import sys
+import os
+
+# Add the parent directory to sys.path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, current_dir)
+
+from my_app import create_app
+from my_app.commands import backup_all_command
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        backup_all_command.main(args=sys.argv[1:], prog_name="backup_all.py")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+"""
+Cek EXPLAIN QUERY PLAN untuk query di route yang sering dibuka.
+
+Database SQLite sementara dibuat lewat migrasi Alembic (flask db upgrade), diisi
+beberapa sekolah, lalu setiap query dicek memakai indeks yang diharapkan
+(lihat __table_args__ di my_app/models.py). Keluar dengan kode 1 jika ada
+query yang jatuh ke full scan.
+
+Contoh:
+    python benchmarks/explain_indexes.py --schools 5 --students 300
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_migrate import upgrade
+from sqlalchemy import text
+
+from my_app import create_app, trash
+from my_app.extensions import db
+from my_app.models import (School, Classroom, Student, Violation, ViolationPhoto,
+                           ViolationCategory, ViolationRule, INCLUDE_DELETED)
+from my_app.views.classes import _class_roster, _class_summaries
+
+CLASSES_PER_SCHOOL = 10
+
+
+def bench_config(directory):
+    return {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directory, 'explain.db')}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'SQLALCHEMY_BINDS': {},
+        'FRAGMENT_CACHE_BACKEND': 'none',
+        'UPLOAD_FOLDER': os.path.join(directory, 'uploads'),
+    }
+
+
+def seed(schools, students):
+    for s in range(schools):
+        school = School(name=f"Sekolah {s}", address="-")
+        db.session.add(school)
+        db.session.flush()
+        classes = [Classroom(name=f"Kelas {c}", school_id=school.id) for c in range(CLASSES_PER_SCHOOL)]
+        db.session.add_all(classes)
+        db.session.add_all([ViolationCategory(name=f"Kategori {c}", points=5, school_id=school.id) for c in range(3)])
+        db.session.add_all([ViolationRule(code=f"P{r}", description="-", school_id=school.id) for r in range(5)])
+        db.session.flush()
+        rows = [Student(name=f"Siswa {i:04d}", nis=f"{s}-{i:05d}", school_id=school.id,
+                        classroom_id=classes[i % len(classes)].id) for i in range(students)]
+        db.session.add_all(rows)
+        db.session.flush()
+        violations = [Violation(description="-", points=5, student_id=student.id, kategori_pelanggaran="Kategori 0")
+                      for student in rows for _ in range(2)]
+        db.session.add_all(violations)
+        db.session.flush()
+        db.session.add_all([ViolationPhoto(filename=f"bukti_{v.id}.jpg", violation_id=v.id) for v in violations[::4]])
+        # Sebagian kecil masuk Data Terhapus, seperti di sekolah sungguhan
+        trash.delete_rows(school.id, trash.ENTITY_VIOLATION, violations[::50])
+        trash.delete_rows(school.id, trash.ENTITY_STUDENT, rows[-3:])
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+
+
+def hot_queries():
+    """(route, query, indeks yang diharapkan) untuk sekolah/kelas/siswa pertama."""
+    school_id, class_id, student_id, violation_id = 1, 1, 1, 1
+    return [
+        ('violations.add_violation (kelas)',
+         Classroom.query.filter_by(name='Kelas 3', school_id=school_id),
+         ['uq_classrooms_school_name']),
+        ('violations.add_violation (siswa)',
+         Student.query.filter_by(name='Siswa 0003', classroom_id=class_id, school_id=school_id),
+         ['ix_students_classroom_name']),
+        ('classes.manage_classes',
+         _class_summaries(school_id),
+         ['uq_classrooms_school_name', 'ix_students_classroom_name', 'ix_violations_student_date']),
+        ('classes.view_class',
+         _class_roster(school_id, class_id),
+         ['ix_students_classroom_name', 'ix_violations_student_date']),
+        ('settings.restore_data (NIS)',
+         Student.query.filter_by(nis='0-00003', school_id=school_id),
+         ['uq_students_school_nis']),
+        ('classes.student_history',
+         Violation.query.filter_by(student_id=student_id).order_by(Violation.date_posted.desc()),
+         ['ix_violations_student_date']),
+        ('classes.print_class_report',
+         Violation.query.join(Student).filter(Student.classroom_id == class_id, Student.school_id == school_id)
+         .order_by(Violation.date_posted.desc()),
+         ['ix_students_classroom_name', 'ix_violations_student_date']),
+        ('Violation.photos',
+         ViolationPhoto.query.filter_by(violation_id=violation_id),
+         ['ix_violation_photos_violation_id']),
+        ('violations.add_violation (kategori)',
+         ViolationCategory.query.filter_by(school_id=school_id),
+         ['ix_violation_categories_school_id']),
+        ('violations.add_violation (pasal)',
+         ViolationRule.query.filter_by(school_id=school_id),
+         ['ix_violation_rules_school_id']),
+        ('trash.deleted_items (pelanggaran)',
+         trash._school_rows(trash.ENTITY_VIOLATION, school_id).order_by(Violation.deleted_at.desc()).limit(200),
+         ['ix_violations_deleted']),
+        ('trash.deleted_items (siswa)',
+         trash._school_rows(trash.ENTITY_STUDENT, school_id).order_by(Student.deleted_at.desc()).limit(200),
+         ['ix_students_deleted']),
+        ('flask purge-deleted',
+         Violation.query.execution_options(include_deleted=True).filter(
+             Violation.deleted_at < trash.retention_cutoff(days=30)).order_by(Violation.id).limit(500),
+         ['ix_violations_deleted']),
+    ]
+
+
+def index_aliases():
+    """Unique constraint di SQLite menjadi indeks 'sqlite_autoindex_<tabel>_N'; petakan ke nama constraint."""
+    aliases = {}
+    for table in db.metadata.sorted_tables:
+        for row in db.session.execute(text(f"PRAGMA index_list('{table.name}')")):
+            columns = [info.name for info in db.session.execute(text(f"PRAGMA index_info('{row.name}')"))]
+            for constraint in table.constraints:
+                if constraint.name and [c.name for c in constraint.columns] == columns:
+                    aliases[row.name] = constraint.name
+    return aliases
+
+
+def explain(query):
+    statement = query.statement
+    # Filter hapus lunak dipasang listener saat eksekusi (my_app/trash.py), bukan di query.statement
+    if not statement.get_execution_options().get(INCLUDE_DELETED, False):
+        statement = statement.options(trash.ACTIVE_ONLY)
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    return [row.detail for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+
+def check():
+    """Kembalikan [(route, lolos, rencana)] untuk setiap query."""
+    aliases = index_aliases()
+    results = []
+    for route, query, expected in hot_queries():
+        plan = explain(query)
+        used = ' | '.join(plan)
+        for name, alias in aliases.items():
+            used = used.replace(name, alias)
+        results.append((route, all(f'INDEX {name}' in used for name in expected), used))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schools', type=int, default=5)
+    parser.add_argument('--students', type=int, default=300, help='Siswa per sekolah.')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app(bench_config(directory))
+        with app.app_context():
+            upgrade()
+            seed(args.schools, args.students)
+            results = check()
+            db.engine.dispose()
+
+    failed = 0
+    for route, ok, plan in results:
+        failed += not ok
+        print(f"{'OK ' if ok else 'GAGAL'} {route:<40} {plan}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
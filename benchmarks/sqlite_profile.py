@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Benchmark profil SQLite: bawaan SQLite vs SQLITE_PERFORMANCE_MODE.
+
+Beberapa proses (seperti worker gunicorn) mengirim POST /add_violation
+bersamaan sementara proses lain membuka beranda (GET /). Dicatat waktu total,
+request per detik, latensi p95 dan jumlah request gagal (misal "database is locked").
+
+Contoh:
+    python benchmarks/sqlite_profile.py --writers 8 --readers 4 --requests 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import multiprocessing
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from my_app import create_app
+from my_app.extensions import db
+from my_app.models import User, School, Classroom, Student, ViolationCategory
+
+STUDENTS = 200
+
+
+def bench_config(directory, performance):
+    return {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(directory, 'bench.db')}",
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'SQLALCHEMY_BINDS': {},
+        'SQLITE_PERFORMANCE_MODE': performance,
+        'FRAGMENT_CACHE_BACKEND': 'none',
+        'UPLOAD_FOLDER': os.path.join(directory, 'uploads'),
+        'EVENT_BACKEND': 'memory',
+    }
+
+
+def seed(config):
+    app = create_app(config)
+    with app.app_context():
+        db.create_all()
+        school = School(name="Sekolah Benchmark", address="-")
+        user = User(username="bench", role="school_admin")
+        user.set_password("bench")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="10A", school_id=school.id)
+        category = ViolationCategory(name="Ringan", points=5, school_id=school.id)
+        db.session.add_all([classroom, category])
+        db.session.flush()
+        db.session.add_all([Student(name=f"Siswa {i:03d}", nis=f"B{i:04d}", school_id=school.id,
+                                    classroom_id=classroom.id) for i in range(STUDENTS)])
+        db.session.commit()
+        category_id = category.id
+        db.engine.dispose()
+    return category_id
+
+
+def worker(config, kind, index, requests, category_id, barrier, results):
+    # Satu proses per worker, seperti gunicorn -w N
+    app = create_app(config)
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    latencies = []
+    failures = 0
+    barrier.wait()
+    for n in range(requests):
+        started = time.perf_counter()
+        try:
+            if kind == 'write':
+                response = client.post('/add_violation', data={
+                    'kelas': '10A',
+                    'nama_murid': f"Siswa {(index * requests + n) % STUDENTS:03d}",
+                    'deskripsi': 'Benchmark',
+                    'kategori_id': category_id,
+                    'tanggal_kejadian': '25/02/2026',
+                })
+                ok = response.status_code == 302
+            else:
+                ok = client.get('/').status_code == 200
+        except Exception:
+            ok = False
+        latencies.append(time.perf_counter() - started)
+        failures += not ok
+    results.put((kind, latencies, failures))
+
+
+def run(performance, writers, readers, requests):
+    with tempfile.TemporaryDirectory() as directory:
+        config = bench_config(directory, performance)
+        category_id = seed(config)
+        kinds = ['write'] * writers + ['read'] * readers
+        barrier = multiprocessing.Barrier(len(kinds) + 1)
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=worker,
+                                             args=(config, kind, i, requests, category_id, barrier, results))
+                     for i, kind in enumerate(kinds)]
+        for process in processes:
+            process.start()
+        barrier.wait()
+        started = time.perf_counter()
+        collected = [results.get() for _ in processes]
+        total = time.perf_counter() - started
+        for process in processes:
+            process.join()
+
+    latencies = {'write': [], 'read': []}
+    failures = 0
+    for kind, values, failed in collected:
+        latencies[kind] += values
+        failures += failed
+
+    def p95(values):
+        return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 2 else 0.0
+
+    count = sum(len(v) for v in latencies.values())
+    return {
+        'total': total,
+        'rps': count / total,
+        'write_p95': p95(latencies['write']),
+        'read_p95': p95(latencies['read']),
+        'failures': failures,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=25, help='Request per proses.')
+    args = parser.parse_args()
+
+    print(f"{'Profil':<12} {'Waktu (s)':>10} {'Req/s':>8} {'Tulis p95 (ms)':>15} {'Baca p95 (ms)':>14} {'Gagal':>6}")
+    for label, performance in (('bawaan', False), ('performa', True)):
+        result = run(performance, args.writers, args.readers, args.requests)
+        print(f"{label:<12} {result['total']:>10.2f} {result['rps']:>8.1f} {result['write_p95']:>15.1f} "
+              f"{result['read_p95']:>14.1f} {result['failures']:>6}")
+
+
+if __name__ == '__main__':
+    main()
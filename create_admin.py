@@ -1,7 +1,9 @@
-from my_app.app import app
+from my_app import create_app
 from my_app.extensions import db
 from my_app.models import User
 
+app = create_app()
+
 # Script ini untuk membuat user admin secara manual
 with app.app_context():
     db.create_all()  # Pastikan tabel dibuat ulang jika belum ada
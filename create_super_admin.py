@@ -1,7 +1,9 @@
-from my_app.app import app
+from my_app import create_app
 from my_app.extensions import db
 from my_app.models import User, School, ViolationCategory, ViolationRule, ViolationPhoto, Violation
 
+app = create_app()
+
 # Script RESET DATABASE dengan struktur baru
 with app.app_context():
     print("⏳ Menghapus database lama...")
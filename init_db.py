@@ -1,8 +1,9 @@
 #!/usr/bin/env python
 """
 Database initialization script.
-This script creates all missing tables, including the new 'ayats' table.
-Run this when you see: "Table 'tanse_db.ayats' doesn't exist"
+Membuat/meng-upgrade semua tabel lewat migrasi (sama dengan `flask --app my_app db upgrade`),
+sehingga database yang dibuat di sini langsung tercatat di alembic_version.
+Database lama hasil db.create_all() harus di-stamp dulu (lihat README, "Migrasi Database").
 """
 
 import sys
@@ -12,19 +13,29 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
-from my_app.app import app, db
-from my_app.models import User, School, Student, Classroom, Violation, ViolationRule, ViolationCategory, Ayat, ViolationPhoto
+from flask_migrate import upgrade
+from sqlalchemy import inspect
+
+from my_app import create_app
+from my_app.extensions import db
+
+app = create_app()
 
 def init_database():
     """Initialize database by creating all tables."""
     with app.app_context():
         print("🔧 Initializing database...")
         
+        tables = inspect(db.engine).get_table_names()
+        if tables and 'alembic_version' not in tables:
+            print("❌ Database sudah berisi tabel tanpa riwayat migrasi.")
+            print("   Jalankan dulu: flask --app my_app db stamp 7f9396a4bd63")
+            return False
+
         try:
-            # Create all tables that don't exist
-            db.create_all()
+            upgrade()
             print("✅ Database initialized successfully!")
-            print("   - All tables created (Ayat table included)")
+            print("   - Schema upgraded to the latest migration")
             
         except Exception as e:
             print(f"❌ Error initializing database: {e}")
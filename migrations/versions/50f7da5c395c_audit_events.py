@@ -0,0 +1,46 @@
+"""audit events
+
+Tabel jejak audit (audit_events), ditulis berkelompok oleh my_app/audit.py.
+
+Revision ID: 50f7da5c395c
+Revises: 879352426b7d
+Create Date: 2026-10-19 08:29:33.149269
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '50f7da5c395c'
+down_revision = '879352426b7d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('audit_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('school_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('username', sa.String(length=150), nullable=True),
+    sa.Column('action', sa.String(length=40), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=True),
+    sa.Column('details', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['school_id'], ['schools.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('audit_events', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_events_entity', ['entity', 'entity_id'], unique=False)
+        batch_op.create_index('ix_audit_events_school_created', ['school_id', 'created_at'], unique=False)
+
+
+
+def downgrade():
+    with op.batch_alter_table('audit_events', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_events_school_created')
+        batch_op.drop_index('ix_audit_events_entity')
+
+    op.drop_table('audit_events')
@@ -0,0 +1,63 @@
+"""violation category id
+
+Pelanggaran (dan arsipnya) mendapat category_id -> violation_categories.id.
+Baris lama diisi dengan mencocokkan snapshot nama kategori_pelanggaran ke
+kategori milik sekolah siswa; yang tidak cocok (kategori "Umum", kategori
+yang sudah dihapus/diganti nama) tetap NULL dan memakai snapshot nama.
+
+Indeks kategori_pelanggaran dihapus: filter dan statistik kini memakai category_id.
+
+Revision ID: f4f7c78855bb
+Revises: 0ae0e73872ce
+Create Date: 2026-10-19 08:08:12.097999
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4f7c78855bb'
+down_revision = '0ae0e73872ce'
+branch_labels = None
+depends_on = None
+
+BACKFILL = """
+UPDATE {table} SET category_id = (
+    SELECT MIN(vc.id) FROM violation_categories vc
+    JOIN students s ON s.school_id = vc.school_id
+    WHERE s.id = {table}.student_id AND vc.name = {table}.kategori_pelanggaran
+)
+WHERE kategori_pelanggaran IS NOT NULL
+"""
+
+
+def upgrade():
+    with op.batch_alter_table('archived_violations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_archived_violations_category_id'), ['category_id'], unique=False)
+        batch_op.create_foreign_key('fk_archived_violations_category_id', 'violation_categories',
+                                    ['category_id'], ['id'], ondelete='SET NULL')
+
+    with op.batch_alter_table('violations', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_violations_category_id'), ['category_id'], unique=False)
+        batch_op.create_foreign_key('fk_violations_category_id', 'violation_categories',
+                                    ['category_id'], ['id'], ondelete='SET NULL')
+        batch_op.drop_index(batch_op.f('ix_violations_kategori_pelanggaran'))
+
+    for table in ('violations', 'archived_violations'):
+        op.execute(BACKFILL.format(table=table))
+
+
+def downgrade():
+    with op.batch_alter_table('violations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_violations_kategori_pelanggaran'), ['kategori_pelanggaran'], unique=False)
+        batch_op.drop_constraint('fk_violations_category_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_violations_category_id'))
+        batch_op.drop_column('category_id')
+
+    with op.batch_alter_table('archived_violations', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_archived_violations_category_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_archived_violations_category_id'))
+        batch_op.drop_column('category_id')
@@ -0,0 +1,49 @@
+import os
+
+
+def create_app(config=None):
+    """Buat instance aplikasi Flask.
+
+    `config` boleh berupa kelas/objek konfigurasi, nama import-nya
+    ('my_app.config.TestConfig'), atau dict yang menimpa nilai Config.
+    Tanpa argumen dipakai env MY_APP_CONFIG, lalu my_app.config.Config.
+
+    Gunicorn: gunicorn "my_app:create_app()"
+    """
+    # Import di dalam fungsi: `import my_app.<modul>` tidak ikut memuat seluruh aplikasi
+    from flask import Flask
+
+    # my_app.trash memasang listener hapus lunak pada Session saat diimpor
+    from my_app import cache, identity, sqlite_profile, trash  # noqa: F401
+    from my_app.api import api
+    from my_app.commands import register_commands
+    from my_app.config import Config
+    from my_app.extensions import db, migrate, login_manager
+    from my_app.views import register_blueprints
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    config = config or os.environ.get('MY_APP_CONFIG')
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    # Inisialisasi Extensions
+    db.init_app(app)
+    sqlite_profile.init_app(app, db)
+    # Folder migrations/ di root repo, agar `flask db ...` bisa dijalankan dari folder mana pun
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(app.root_path), 'migrations'))
+    login_manager.init_app(app)
+    # User + sekolah diambil dari cache identitas (my_app/identity.py)
+    login_manager.user_loader(identity.load_user)
+
+    register_blueprints(app)
+    app.register_blueprint(api)
+
+    # Cache fragmen template ({% cache %}) + invalidasi setelah POST
+    cache.init_app(app)
+
+    # Perintah CLI (flask --app my_app backup-all ...)
+    register_commands(app)
+    return app
@@ -0,0 +1,374 @@
+import base64
+import gzip
+from datetime import datetime
+from functools import wraps
+
+from flask import Blueprint, jsonify, request, url_for
+from flask_login import current_user, login_user
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import selectinload
+
+from my_app import audit, cache, events, leaderboard, sync, violations
+from my_app.extensions import db
+from my_app.models import User, Student, Violation, Classroom, ViolationRule, ViolationCategory
+
+# API JSON untuk aplikasi mobile guru.
+# Autentikasi memakai sesi Flask-Login yang sama dengan web (POST /api/v1/login).
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Respons lebih kecil dari ini tidak dikompres (overhead gzip tidak sepadan)
+GZIP_MIN_SIZE = 500
+GZIP_LEVEL = 6
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+@api.errorhandler(ApiError)
+def handle_api_error(error):
+    return jsonify({'error': error.message}), error.status
+
+
+@api.errorhandler(404)
+def handle_not_found(error):
+    return jsonify({'error': 'Data tidak ditemukan.'}), 404
+
+
+@api.after_request
+def gzip_response(response):
+    """Kompres respons JSON dengan gzip jika klien mendukung."""
+    if (response.status_code < 200 or response.status_code >= 300 or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_SIZE:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Content-Length'] = str(len(response.get_data()))
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def api_login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or not current_user.school_id:
+            raise ApiError('Login sebagai Admin Sekolah diperlukan.', 401)
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+# --- HELPER ---
+
+def _payload():
+    """Data request dari JSON atau form (multipart untuk upload foto)."""
+    if request.is_json:
+        return request.get_json(silent=True) or {}
+    return request.form.to_dict(flat=True) | {k: request.form.getlist(k) for k in ('student_ids', 'ayat_ids')
+                                                 if k in request.form}
+
+
+def _fields():
+    """Sparse fieldset: ?fields=id,name,... (None berarti semua field)."""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    return {f.strip() for f in raw.split(',') if f.strip()}
+
+
+def _pick(data, fields):
+    if fields is None:
+        return data
+    return {k: v for k, v in data.items() if k in fields}
+
+
+def _limit():
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def encode_cursor(*values):
+    raw = '|'.join(v.isoformat() if isinstance(v, datetime) else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, count):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        parts = raw.split('|')
+        if len(parts) != count:
+            raise ValueError(raw)
+        return parts
+    except ValueError:
+        raise ApiError('Cursor tidak valid.')
+
+
+def _page(items, limit, cursor_of):
+    """Ambil `limit` item pertama dari hasil query limit+1, plus cursor halaman berikutnya."""
+    has_more = len(items) > limit
+    items = items[:limit]
+    return items, (cursor_of(items[-1]) if has_more else None)
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def _student_dict(student):
+    return {
+        'id': student.id,
+        'name': student.name,
+        'nis': student.nis,
+        'class_id': student.classroom_id,
+        'poin': student.poin,
+    }
+
+
+def _violation_dict(violation, fields):
+    data = {
+        'id': violation.id,
+        'student_id': violation.student_id,
+        'date_posted': _iso(violation.date_posted),
+        'points': violation.points,
+        'category_id': violation.category_id,
+        'category': violation.kategori_pelanggaran,
+        'pasal': violation.pasal,
+        'description': violation.description,
+        'recorded_by': violation.di_input_oleh,
+        'is_remitted': bool(violation.is_remitted),
+        'remission_reason': violation.remission_reason,
+        'remission_date': _iso(violation.remission_date),
+    }
+    # Relasi hanya diserialisasi bila diminta, agar tidak memicu query tambahan
+    if fields is None or 'ayat_ids' in fields:
+        data['ayat_ids'] = [a.id for a in violation.ayats]
+    if fields is None or 'photos' in fields:
+        data['photos'] = [{
+            'url': url_for('files.uploaded_file', filename=p.filename),
+            'remission': p.is_remission,
+        } for p in violation.photos]
+    return _pick(data, fields)
+
+
+def _school_violation(violation_id):
+    return Violation.query.join(Student).filter(
+        Violation.id == violation_id,
+        Student.school_id == current_user.school_id
+    ).first_or_404()
+
+
+# --- AUTH ---
+
+@api.route("/login", methods=['POST'])
+def login():
+    data = _payload()
+    user = User.query.filter_by(username=data.get('username')).first()
+    if not user or not user.check_password(data.get('password')):
+        raise ApiError('Login Gagal. Cek username dan password', 401)
+    login_user(user, remember=bool(data.get('remember')))
+    return jsonify({'id': user.id, 'username': user.username, 'school_id': user.school_id, 'role': user.role})
+
+
+# --- MASTER DATA ---
+
+@api.route("/classes")
+@api_login_required
+def list_classes():
+    fields = _fields()
+    classes = Classroom.query.filter_by(school_id=current_user.school_id).order_by(Classroom.name).all()
+    return jsonify({'items': [_pick({'id': c.id, 'name': c.name}, fields) for c in classes]})
+
+
+@api.route("/categories")
+@api_login_required
+def list_categories():
+    fields = _fields()
+    categories = ViolationCategory.query.filter_by(school_id=current_user.school_id).order_by(ViolationCategory.points).all()
+    return jsonify({'items': [_pick({'id': c.id, 'name': c.name, 'points': c.points}, fields) for c in categories]})
+
+
+@api.route("/rules")
+@api_login_required
+def list_rules():
+    fields = _fields()
+    rules = ViolationRule.query.options(selectinload(ViolationRule.ayats)).filter_by(
+        school_id=current_user.school_id).order_by(ViolationRule.code).all()
+    items = [_pick({
+        'id': r.id,
+        'code': r.code,
+        'description': r.description,
+        'ayats': [{'id': a.id, 'number': a.number, 'description': a.description} for a in r.ayats],
+    }, fields) for r in rules]
+    return jsonify({'items': items})
+
+
+# --- SISWA ---
+
+@api.route("/students")
+@api_login_required
+def list_students():
+    """Daftar siswa, urut id. Paginasi cursor: ?cursor=...&limit=..."""
+    fields = _fields()
+    limit = _limit()
+    query = Student.query.filter_by(school_id=current_user.school_id, graduated_at=None)
+    class_id = request.args.get('class_id', type=int)
+    if class_id:
+        query = query.filter_by(classroom_id=class_id)
+    cursor = request.args.get('cursor')
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        query = query.filter(Student.id > int(last_id))
+    rows = query.order_by(Student.id).limit(limit + 1).all()
+    rows, next_cursor = _page(rows, limit, lambda s: encode_cursor(s.id))
+    return jsonify({'items': [_pick(_student_dict(s), fields) for s in rows], 'next_cursor': next_cursor})
+
+
+# --- PELANGGARAN ---
+
+@api.route("/violations")
+@api_login_required
+def list_violations():
+    """Daftar pelanggaran terbaru dulu, paginasi cursor pada (date_posted, id)."""
+    fields = _fields()
+    limit = _limit()
+    query = Violation.query.join(Student).filter(Student.school_id == current_user.school_id)
+    student_id = request.args.get('student_id', type=int)
+    if student_id:
+        query = query.filter(Violation.student_id == student_id)
+    class_id = request.args.get('class_id', type=int)
+    if class_id:
+        query = query.filter(Student.classroom_id == class_id)
+    cursor = request.args.get('cursor')
+    if cursor:
+        date_str, last_id = decode_cursor(cursor, 2)
+        try:
+            last_date, last_id = datetime.fromisoformat(date_str), int(last_id)
+        except ValueError:
+            raise ApiError('Cursor tidak valid.')
+        query = query.filter(or_(
+            Violation.date_posted < last_date,
+            and_(Violation.date_posted == last_date, Violation.id < last_id)
+        ))
+    if fields is None or 'ayat_ids' in fields:
+        query = query.options(selectinload(Violation.ayats))
+    if fields is None or 'photos' in fields:
+        query = query.options(selectinload(Violation.photos))
+    rows = query.order_by(Violation.date_posted.desc(), Violation.id.desc()).limit(limit + 1).all()
+    rows, next_cursor = _page(rows, limit, lambda v: encode_cursor(v.date_posted, v.id))
+    return jsonify({'items': [_violation_dict(v, fields) for v in rows], 'next_cursor': next_cursor})
+
+
+@api.route("/violations", methods=['POST'])
+@api_login_required
+def create_violations():
+    """Catat pelanggaran untuk satu (`student_id`) atau banyak (`student_ids`) siswa."""
+    data = _payload()
+    raw_ids = data.get('student_ids') or ([data['student_id']] if data.get('student_id') else [])
+    try:
+        requested_ids = {int(s) for s in raw_ids}
+    except (TypeError, ValueError):
+        raise ApiError('student_ids tidak valid.')
+    if not requested_ids:
+        raise ApiError('student_id atau student_ids wajib diisi.')
+    description = (data.get('description') or '').strip()
+    if not description:
+        raise ApiError('description wajib diisi.')
+
+    student_rows = {s_id: (name, class_name) for s_id, name, class_name in db.session.query(
+        Student.id, Student.name, Classroom.name).outerjoin(Classroom, Student.classroom_id == Classroom.id).filter(
+        Student.id.in_(requested_ids), Student.school_id == current_user.school_id)}
+    student_ids = list(student_rows)
+    if len(student_ids) != len(requested_ids):
+        raise ApiError('Siswa tidak ditemukan.', 404)
+
+    category = None
+    if data.get('category_id'):
+        category = ViolationCategory.query.filter_by(id=data['category_id'], school_id=current_user.school_id).first()
+        if not category:
+            raise ApiError('Kategori tidak ditemukan.', 404)
+    rule = None
+    if data.get('rule_id'):
+        rule = ViolationRule.query.filter_by(id=data['rule_id'], school_id=current_user.school_id).first()
+        if not rule:
+            raise ApiError('Pasal tidak ditemukan.', 404)
+    date_posted = None
+    if data.get('date_posted'):
+        try:
+            date_posted = datetime.fromisoformat(data['date_posted'])
+        except (TypeError, ValueError):
+            raise ApiError('date_posted harus berformat ISO 8601.')
+
+    created = violations.record_violations(
+        student_ids, description,
+        category.points if category else 0,
+        category.name if category else "Umum",
+        pasal=f"{rule.code} - {rule.description}" if rule else None,
+        rule_id=rule.id if rule else None,
+        ayat_ids=data.get('ayat_ids') or (),
+        date_posted=date_posted,
+        di_input_oleh=data.get('recorded_by') or current_user.full_name or current_user.username,
+        photo_filenames=violations.store_photos(request.files.getlist('bukti_file')),
+        category_id=category.id if category else None
+    )
+    cache.bump_data_version(current_user.school_id)
+    db.session.commit()
+    items = [_violation_dict(v, None) for v in created]
+    payloads = [events.violation_payload(violation, *student_rows[violation.student_id]) for violation in created]
+    for payload in payloads:
+        events.publish(current_user.school_id, events.VIOLATION_ADDED, payload)
+    leaderboard.publish_alerts(current_user.school_id)
+    audit.record_violations(audit.VIOLATION_CREATE, payloads, via='api')
+    return jsonify({'items': items}), 201
+
+
+@api.route("/violations/<int:violation_id>/remit", methods=['POST'])
+@api_login_required
+def remit_violation(violation_id):
+    violation = _school_violation(violation_id)
+    reason = (_payload().get('reason') or '').strip()
+    if not reason:
+        raise ApiError('Keterangan remisi wajib diisi.')
+    violations.remit_violation(violation, reason, request.files.get('remission_photo'))
+    db.session.commit()
+    payload = events.violation_payload(violation)
+    events.publish(current_user.school_id, events.VIOLATION_REMITTED, payload)
+    audit.record_violations(audit.VIOLATION_REMIT, [payload], reason=reason, via='api')
+    return jsonify(_violation_dict(violation, None))
+
+
+# --- SINKRONISASI ---
+
+@api.route("/sync")
+@api_login_required
+def sync_changes():
+    """Perubahan sejak token `?since=` (tanpa token: snapshot penuh).
+
+    Simpan `token` dari respons dan kirim kembali pada sinkronisasi berikutnya.
+    Jika `reset` bernilai true, klien harus mengganti seluruh data lokalnya.
+    """
+    since = None
+    token = request.args.get('since')
+    if token:
+        (since_str,) = decode_cursor(token, 1)
+        try:
+            since = datetime.fromisoformat(since_str)
+        except ValueError:
+            raise ApiError('Token sinkronisasi tidak valid.')
+    changes = sync.changes_since(current_user.school_id, since)
+    return jsonify({
+        'reset': changes['reset'],
+        'classes': [{'id': c.id, 'name': c.name} for c in changes['classes']],
+        'students': [_student_dict(s) | {'graduated': s.graduated_at is not None} for s in changes['students']],
+        'violations': [_violation_dict(v, None) for v in changes['violations']],
+        'deleted': changes['deleted'],
+        'token': encode_cursor(changes['until']),
+    })
@@ -8,30 +8,12 @@ if __name__ == "__main__":
     parent_dir = os.path.dirname(current_dir)
     sys.path.append(parent_dir)
 
-from flask import Flask
-from my_app.config import Config
-from my_app.extensions import db, migrate
-from my_app.models import User, School, Student, Classroom, Violation, ViolationRule, ViolationCategory, Ayat, ViolationPhoto  # Import models agar terdeteksi
-from my_app.routes import main
-from flask_login import LoginManager
+from my_app import create_app
+from my_app.extensions import db  # noqa: F401 (dipakai skrip lama: from my_app.app import app, db)
 
-app = Flask(__name__)
-app.config.from_object(Config)
-
-# Inisialisasi Extensions
-db.init_app(app)
-migrate.init_app(app, db) # Inisialisasi Flask-Migrate
-
-# Login Manager Setup
-login_manager = LoginManager()
-login_manager.login_view = 'main.login'
-login_manager.init_app(app)
-
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
-app.register_blueprint(main)
+# Instance global untuk kompatibilitas (flask --app my_app.app, skrip lama).
+# Kode baru sebaiknya memakai create_app().
+app = create_app()
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,126 @@
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, insert, delete, func, literal, or_
+
+from my_app import cache, leaderboard
+from my_app.extensions import db
+from my_app.sync import record_tombstones, ENTITY_VIOLATION
+from my_app.models import (Student, Violation, ViolationPhoto, violation_ayats,
+                           ArchivedViolation, ArchivedViolationPhoto, archived_violation_ayats)
+
+# Kolom yang disalin apa adanya dari 'violations' ke 'archived_violations'
+VIOLATION_COLUMNS = ('description', 'points', 'date_posted', 'student_id', 'pasal',
+                     'category_id', 'kategori_pelanggaran', 'di_input_oleh', 'is_remitted', 'remission_reason',
+                     'remission_date')
+
+
+def academic_year_start(when=None):
+    """Tanggal mulai tahun ajaran yang memuat `when` (default: sekarang)."""
+    when = when or datetime.utcnow()
+    start_month = current_app.config.get('ACADEMIC_YEAR_START_MONTH', 7)
+    year = when.year if when.month >= start_month else when.year - 1
+    return datetime(year, start_month, 1)
+
+
+def academic_year_label(start):
+    """Label tahun ajaran, contoh: '2024/2025'."""
+    return f"{start.year}/{start.year + 1}"
+
+
+def archive_violations(school_id, boundary):
+    """Pindahkan pelanggaran sekolah yang terjadi sebelum `boundary` ke tabel arsip.
+
+    Data dipindahkan per tahun ajaran dengan INSERT ... SELECT lalu DELETE,
+    termasuk foto dan tautan ayat. Tidak melakukan commit; pemanggil yang
+    menentukan batas transaksi. Mengembalikan jumlah pelanggaran yang diarsipkan.
+    """
+    school_violations = select(Violation.id).join(Student).where(
+        Student.school_id == school_id,
+        Violation.date_posted < boundary
+    )
+    oldest = db.session.execute(
+        select(func.min(Violation.date_posted)).where(Violation.id.in_(school_violations))
+    ).scalar()
+    if oldest is None:
+        return 0
+
+    total = 0
+    year_start = academic_year_start(oldest)
+    while year_start < boundary:
+        year_end = min(year_start.replace(year=year_start.year + 1), boundary)
+        ids = db.session.execute(school_violations.where(
+            Violation.date_posted >= year_start,
+            Violation.date_posted < year_end
+        )).scalars().all()
+        if ids:
+            _move_violations(ids, academic_year_label(year_start))
+            # Bagi klien sinkronisasi, pelanggaran yang diarsipkan sama dengan terhapus
+            record_tombstones(school_id, ENTITY_VIOLATION, ids)
+            total += len(ids)
+        year_start = year_start.replace(year=year_start.year + 1)
+    if total:
+        cache.bump_data_version(school_id)
+    return total
+
+
+def _move_violations(ids, label):
+    # Tahun ajaran baru: poin pelanggaran yang diarsipkan dikembalikan ke saldo siswa
+    leaderboard.record_archived(db.session.execute(
+        select(Violation.student_id, func.sum(Violation.points)).where(
+            Violation.id.in_(ids), or_(Violation.is_remitted.is_(None), Violation.is_remitted == False)  # noqa: E712
+        ).group_by(Violation.student_id)
+    ).all())
+    # archived_at yang sama untuk satu batch dipakai untuk memetakan ID asal -> ID arsip.
+    # Dibulatkan ke detik: DATETIME MySQL membuang mikrodetik, sehingga nilai yang
+    # tersimpan tidak akan sama lagi dengan nilai Python dan foto/ayat tidak tersalin.
+    archived_at = datetime.utcnow().replace(microsecond=0)
+    columns = [getattr(Violation, name) for name in VIOLATION_COLUMNS]
+    db.session.execute(
+        insert(ArchivedViolation).from_select(
+            ['original_id'] + list(VIOLATION_COLUMNS) + ['academic_year', 'archived_at'],
+            select(Violation.id, *columns, literal(label), literal(archived_at)).where(Violation.id.in_(ids))
+        )
+    )
+    batch = select(ArchivedViolation.id, ArchivedViolation.original_id).where(
+        ArchivedViolation.original_id.in_(ids),
+        ArchivedViolation.archived_at == archived_at
+    ).subquery()
+    db.session.execute(
+        insert(ArchivedViolationPhoto).from_select(
+            ['filename', 'violation_id', 'kind'],
+            select(ViolationPhoto.filename, batch.c.id, ViolationPhoto.kind).join(
+                batch, batch.c.original_id == ViolationPhoto.violation_id)
+        )
+    )
+    db.session.execute(
+        insert(archived_violation_ayats).from_select(
+            ['violation_id', 'ayat_id'],
+            select(batch.c.id, violation_ayats.c.ayat_id).join(
+                batch, batch.c.original_id == violation_ayats.c.violation_id)
+        )
+    )
+    db.session.execute(delete(violation_ayats).where(violation_ayats.c.violation_id.in_(ids)))
+    db.session.execute(delete(ViolationPhoto).where(ViolationPhoto.violation_id.in_(ids)))
+    db.session.execute(delete(Violation).where(Violation.id.in_(ids)))
+
+
+def archived_years(school_id):
+    """Daftar tahun ajaran yang sudah diarsipkan untuk sekolah ini."""
+    return db.session.execute(
+        select(ArchivedViolation.academic_year).join(Student).where(
+            Student.school_id == school_id
+        ).group_by(ArchivedViolation.academic_year).order_by(ArchivedViolation.academic_year.desc())
+    ).scalars().all()
+
+
+def archived_violations_for_student(student_id):
+    return ArchivedViolation.query.filter_by(student_id=student_id).order_by(
+        ArchivedViolation.date_posted.desc()).all()
+
+
+def archived_violations_for_class(school_id, class_id):
+    return ArchivedViolation.query.join(Student).filter(
+        Student.classroom_id == class_id,
+        Student.school_id == school_id
+    ).order_by(ArchivedViolation.date_posted.desc()).all()
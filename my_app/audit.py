@@ -0,0 +1,187 @@
+import atexit
+import json
+import queue
+import threading
+from datetime import datetime
+
+from flask import current_app, has_request_context
+from flask_login import current_user
+from sqlalchemy import insert
+
+from my_app.extensions import db
+from my_app.models import AuditEvent
+
+# Jejak audit (siapa mencatat, menghapus, meremisi, memindahkan apa).
+#
+# record() hanya memasukkan event ke antrean di memori; thread flusher per app
+# menulisnya ke tabel audit_events berkelompok (satu INSERT executemany per
+# batch), sehingga route tulis tidak menunggu round trip tambahan. Antrean
+# dibatasi AUDIT_QUEUE_SIZE: jika penuh (database macet), event dibuang dan
+# dicatat di log. Sisa antrean ditulis saat proses berhenti (atexit).
+#
+# AUDIT_FLUSH_INTERVAL = 0 mematikan thread: event ditulis saat flush()
+# dipanggil (test, perintah CLI).
+
+# Aksi yang dicatat (kolom action)
+VIOLATION_CREATE = 'violation.create'
+VIOLATION_DELETE = 'violation.delete'
+VIOLATION_REMIT = 'violation.remit'
+VIOLATION_BULK_REMIT = 'violation.bulk_remit'
+VIOLATION_RESTORE = 'violation.restore'
+STUDENT_IMPORT = 'student.import'
+STUDENT_MOVE = 'student.move'
+STUDENT_PROMOTE = 'student.promote'
+STUDENT_DELETE = 'student.delete'
+STUDENT_RESTORE = 'student.restore'
+CLASS_CREATE = 'class.create'
+CLASS_DELETE = 'class.delete'
+CLASS_RESTORE = 'class.restore'
+SETTINGS_CHANGE = 'settings.change'
+ACTIONS = {
+    VIOLATION_CREATE: 'Catat pelanggaran',
+    VIOLATION_DELETE: 'Hapus pelanggaran',
+    VIOLATION_REMIT: 'Remisi',
+    VIOLATION_BULK_REMIT: 'Remisi massal',
+    VIOLATION_RESTORE: 'Pulihkan pelanggaran',
+    STUDENT_IMPORT: 'Impor siswa',
+    STUDENT_MOVE: 'Mutasi siswa',
+    STUDENT_PROMOTE: 'Kenaikan kelas',
+    STUDENT_DELETE: 'Hapus siswa',
+    STUDENT_RESTORE: 'Pulihkan siswa',
+    CLASS_CREATE: 'Buat kelas',
+    CLASS_DELETE: 'Hapus kelas',
+    CLASS_RESTORE: 'Pulihkan kelas',
+    SETTINGS_CHANGE: 'Ubah pengaturan',
+}
+
+# Entitas (kolom entity)
+ENTITY_VIOLATION = 'violation'
+ENTITY_STUDENT = 'student'
+ENTITY_CLASS = 'class'
+ENTITY_SETTINGS = 'settings'
+
+
+class AuditWriter:
+    def __init__(self, app, max_size=10000, batch_size=500, interval=1.0):
+        self.app = app
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue = queue.Queue(maxsize=max_size)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = None
+
+    def put(self, row):
+        try:
+            self.queue.put_nowait(row)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            self.app.logger.warning('Antrean audit penuh, event %s dibuang', row['action'])
+            return
+        if self.interval and self.thread is None:
+            self._start()
+
+    def _start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self._run, name='audit-flusher', daemon=True)
+            self.thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self.stopping.is_set():
+            try:
+                first = self.queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            self._write([first] + self._drain(self.batch_size - 1))
+
+    def _drain(self, limit):
+        rows = []
+        while len(rows) < limit:
+            try:
+                rows.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows):
+        try:
+            with self.app.app_context():
+                with db.engine.begin() as conn:
+                    conn.execute(insert(AuditEvent.__table__), rows)
+        except Exception:
+            # Audit tidak boleh menghentikan thread; batch ini hilang, tercatat di log
+            self.app.logger.exception('Gagal menulis %s event audit', len(rows))
+
+    def flush(self):
+        """Tulis semua event yang masih di antrean sekarang (di thread pemanggil)."""
+        count = 0
+        rows = self._drain(self.batch_size)
+        while rows:
+            self._write(rows)
+            count += len(rows)
+            rows = self._drain(self.batch_size)
+        return count
+
+    def close(self):
+        """Hentikan flusher lalu tulis sisa antrean. Dipanggil atexit."""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 5)
+        self.flush()
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(app=None):
+    app = app or current_app._get_current_object()
+    with _writers_lock:
+        writer = _writers.get(app)
+        if writer is None:
+            writer = AuditWriter(app, max_size=app.config.get('AUDIT_QUEUE_SIZE', 10000),
+                                 batch_size=app.config.get('AUDIT_BATCH_SIZE', 500),
+                                 interval=app.config.get('AUDIT_FLUSH_INTERVAL', 1.0))
+            _writers[app] = writer
+        return writer
+
+
+def record(action, entity, entity_id=None, school_id=None, **details):
+    """Antrekan satu event audit atas nama user yang login. Panggil setelah commit."""
+    user = current_user if has_request_context() and current_user.is_authenticated else None
+    get_writer().put({
+        'school_id': school_id or (user.school_id if user else None),
+        'user_id': user.id if user else None,
+        'username': user.username if user else None,
+        'action': action,
+        'entity': entity,
+        'entity_id': entity_id,
+        'details': json.dumps(details, default=str, separators=(',', ':')) if details else None,
+        'created_at': datetime.utcnow(),
+    })
+
+
+def record_violations(action, payloads, **details):
+    """Satu event per pelanggaran (create/delete/remit) dari data events.violation_payload,
+    yang sudah dibuat sebelum commit sehingga tidak perlu memuat ulang objek."""
+    for payload in payloads:
+        record(action, ENTITY_VIOLATION, payload['id'], student_id=payload['student_id'],
+               student_name=payload['student_name'], points=payload['points'], category=payload['category'],
+               **details)
+
+
+def flush(app=None):
+    return get_writer(app).flush()
+
+
+def recent_events(school_id, action=None, limit=200):
+    """Event audit terbaru sekolah (yang sudah ditulis ke database)."""
+    query = AuditEvent.query.filter_by(school_id=school_id)
+    if action:
+        query = query.filter(AuditEvent.action == action)
+    return query.order_by(AuditEvent.created_at.desc(), AuditEvent.id.desc()).limit(limit).all()
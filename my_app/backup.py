@@ -0,0 +1,604 @@
+import io
+import os
+import json
+import shutil
+import zipfile
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from werkzeug.security import safe_join
+
+from my_app import cache, jsonstream, leaderboard, sync, trash
+from my_app.storage import store_icon
+from my_app.extensions import db
+from my_app.models import (User, Student, Violation, Classroom, ViolationRule, ViolationCategory,
+                           ViolationPhoto, Ayat, ArchivedViolation, BackupSnapshot, Tombstone,
+                           PHOTO_KIND_EVIDENCE, PHOTO_KIND_REMISSION)
+
+BACKUP_FULL = 'full'
+BACKUP_INCREMENTAL = 'incremental'
+
+# Ukuran blok saat menyalin foto dari ZIP ke disk
+EXTRACT_CHUNK_SIZE = 1024 * 1024
+
+
+# --- EXPORT ---
+
+def _violation_entry(v):
+    return {
+        "date": v.date_posted.isoformat(),
+        "description": v.description,
+        "points": v.points,
+        "pasal": v.pasal,
+        "kategori": v.kategori_pelanggaran,
+        "reporter": v.di_input_oleh,
+        "is_remitted": v.is_remitted,
+        "remission_reason": v.remission_reason,
+        "remission_date": v.remission_date.isoformat() if v.remission_date else None,
+        "ayats": [{"number": a.number, "description": a.description} for a in v.ayats],
+        "photos": [p.filename for p in v.photos],
+        "remission_photos": [p.filename for p in v.photos if p.is_remission]
+    }
+
+
+def _violations_by_student(model, school_id, since=None):
+    query = model.query.join(Student).filter(Student.school_id == school_id).options(
+        selectinload(model.photos), selectinload(model.ayats))
+    if since is not None:
+        query = query.filter(model.updated_at >= since)
+    grouped = {}
+    for v in query.order_by(model.date_posted):
+        grouped.setdefault(v.student_id, []).append(v)
+    return grouped
+
+
+def _deleted_since(school_id, since):
+    """Data yang dihapus sejak `since` (dari tombstone), untuk backup inkremental.
+
+    Backup tidak menyimpan ID database, jadi data dicatat dengan kunci yang
+    dipakai restore: nama kelas, NIS siswa, serta NIS + tanggal + deskripsi
+    pelanggaran. Data yang sudah di-purge atau diarsipkan tidak bisa dicocokkan
+    lagi dan dilewati.
+    """
+    ids = {entity: [] for entity in sync.ENTITIES}
+    rows = db.session.execute(select(Tombstone.entity, Tombstone.entity_id).where(
+        Tombstone.school_id == school_id,
+        Tombstone.deleted_at >= since
+    ))
+    for entity, entity_id in rows:
+        ids.setdefault(entity, []).append(entity_id)
+
+    deleted = {"classrooms": [], "students": [], "violations": []}
+    if ids[sync.ENTITY_CLASS]:
+        deleted["classrooms"] = [name for (name,) in db.session.query(Classroom.name).execution_options(
+            include_deleted=True).filter(Classroom.id.in_(ids[sync.ENTITY_CLASS]), Classroom.deleted_at.isnot(None))]
+    if ids[sync.ENTITY_STUDENT]:
+        deleted["students"] = [nis for (nis,) in db.session.query(Student.nis).execution_options(
+            include_deleted=True).filter(Student.id.in_(ids[sync.ENTITY_STUDENT]), Student.deleted_at.isnot(None))]
+    if ids[sync.ENTITY_VIOLATION]:
+        rows = db.session.query(Student.nis, Violation.date_posted, Violation.description).join(
+            Student, Student.id == Violation.student_id).execution_options(include_deleted=True).filter(
+            Violation.id.in_(ids[sync.ENTITY_VIOLATION]), Violation.deleted_at.isnot(None))
+        deleted["violations"] = [{"nis": nis, "date": date_posted.isoformat(), "description": description}
+                                 for nis, date_posted, description in rows]
+    return deleted
+
+
+def collect_backup_data(school, since=None, until=None):
+    """Kumpulkan data sekolah dalam bentuk dict siap ditulis ke data.json.
+
+    Jika `since` diisi, hanya siswa dan pelanggaran yang berubah sejak waktu
+    tersebut yang disertakan (backup inkremental), ditambah daftar data yang
+    dihapus sejak itu. Pengaturan sekolah selalu disertakan utuh karena ukurannya kecil.
+    """
+    until = until or datetime.utcnow()
+    # updated_at diisi saat flush: baris yang di-flush sesaat sebelum `since` (akhir backup
+    # sebelumnya) tetapi baru di-commit sesudahnya tetap terambil. Duplikat aman karena
+    # restore backup inkremental idempoten.
+    changed_since = since - sync.TOKEN_MARGIN if since is not None else None
+    violations = _violations_by_student(Violation, school.id, changed_since)
+    # Pelanggaran yang sudah diarsipkan ikut dibackup penuh; saat restore masuk kembali sebagai data biasa
+    if since is None:
+        for student_id, items in _violations_by_student(ArchivedViolation, school.id).items():
+            violations.setdefault(student_id, []).extend(items)
+
+    students = Student.query.filter_by(school_id=school.id).options(selectinload(Student.classroom))
+    if since is not None:
+        students = students.filter(db.or_(Student.updated_at >= changed_since, Student.id.in_(list(violations))))
+
+    students_data = []
+    for s in students:
+        students_data.append({
+            "name": s.name,
+            "nis": s.nis,
+            "classroom": s.classroom.name if s.classroom else None,
+            "violations": [_violation_entry(v) for v in violations.get(s.id, [])]
+        })
+
+    # Data Settings (Anggota, Pasal, Kategori)
+    members_data = [{"username": u.username, "full_name": u.full_name} for u in school.users if u.role != 'super_admin']
+    rules_data = []
+    for r in school.rules:
+        rules_data.append({
+            "code": r.code,
+            "description": r.description,
+            "ayats": [{"number": a.number, "description": a.description} for a in r.ayats]
+        })
+    categories_data = [{"name": c.name, "points": c.points} for c in school.categories]
+    classrooms_data = [{"name": c.name} for c in school.classrooms]
+
+    data = {
+        "school": {
+            "name": school.name,
+            "address": school.address,
+            "logo": school.logo
+        },
+        "backup_date": datetime.now().isoformat(),
+        "backup": {
+            "type": BACKUP_INCREMENTAL if since is not None else BACKUP_FULL,
+            "since": since.isoformat() if since else None,
+            "until": until.isoformat()
+        },
+        "settings": {
+            "members": members_data,
+            "rules": rules_data,
+            "categories": categories_data,
+            "classrooms": classrooms_data
+        },
+        "students": students_data
+    }
+    if since is not None:
+        data["deleted"] = _deleted_since(school.id, changed_since)
+    return data
+
+
+def write_backup_zip(target, data, upload_folder):
+    """Tulis data.json beserta foto bukti dan logo ke `target` (path atau file object)."""
+    with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED) as zf:
+        # data.json ditulis bertahap ke entri ZIP, tanpa membuat string JSON utuh di memori
+        with zf.open('data.json', 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8') as fp:
+            json.dump(data, fp, indent=4)
+
+        written = set()
+
+        def add_file_to_zip(filename):
+            if not filename or filename in written: return
+            file_path = os.path.join(upload_folder, filename)
+            if os.path.exists(file_path):
+                zf.write(file_path, arcname=filename)
+                written.add(filename)
+
+        for s in data['students']:
+            for v in s['violations']:
+                for p_name in v['photos']:
+                    add_file_to_zip(p_name)
+
+        # Logo hanya ikut di backup penuh
+        if data['backup']['type'] == BACKUP_FULL:
+            add_file_to_zip(data['school']['logo'])
+
+
+def backup_filename(school, kind, when=None):
+    # Format Nama File: Backup_NamaSekolah_Tanggal_Waktu_DataPelanggaran[_Inkremental].zip
+    date_str = (when or datetime.now()).strftime("%Y-%m-%d_%H-%M-%S")
+    clean_school_name = "".join(c for c in school.name if c.isalnum() or c in (' ', '_')).replace(' ', '_')
+    suffix = "_Inkremental" if kind == BACKUP_INCREMENTAL else ""
+    return f"Backup_{clean_school_name}_{date_str}_DataPelanggaran{suffix}.zip"
+
+
+def last_snapshot(school_id):
+    return BackupSnapshot.query.filter_by(school_id=school_id).order_by(
+        BackupSnapshot.until.desc(), BackupSnapshot.id.desc()).first()
+
+
+def create_backup(target, school, upload_folder, incremental=False):
+    """Buat backup (penuh atau inkremental) dan catat watermark-nya.
+
+    Backup inkremental dimulai dari 'until' snapshot terakhir; bila belum ada
+    snapshot sama sekali, otomatis menjadi backup penuh. Mengembalikan
+    BackupSnapshot baru (belum di-commit). Jika `target` berupa direktori,
+    file ZIP ditulis langsung ke dalamnya.
+    """
+    parent = last_snapshot(school.id) if incremental else None
+    since = parent.until if parent else None
+    # Dibulatkan ke detik agar sama persis setelah disimpan di kolom DATETIME MySQL
+    until = datetime.utcnow().replace(microsecond=0)
+    data = collect_backup_data(school, since=since, until=until)
+    kind = data['backup']['type']
+    filename = backup_filename(school, kind)
+    data['backup']['parent'] = parent.filename if parent else None
+    if isinstance(target, str) and os.path.isdir(target):
+        target = os.path.join(target, filename)
+    write_backup_zip(target, data, upload_folder)
+    snapshot = BackupSnapshot(school_id=school.id, kind=kind, since=since, until=until,
+                              filename=filename, parent_id=parent.id if parent else None)
+    db.session.add(snapshot)
+    return snapshot
+
+
+# --- RESTORE ---
+
+def _open_data_json(zf):
+    return io.TextIOWrapper(zf.open('data.json'), encoding='utf-8')
+
+
+def read_header(zf):
+    """Baca semua bagian data.json kecuali daftar siswa (school, backup, settings, ...).
+
+    Daftar siswa dilewati secara streaming sehingga memori tetap kecil.
+    """
+    header = {}
+    with _open_data_json(zf) as fp:
+        for key, value in jsonstream.iter_object(fp, stream_keys=('students',)):
+            if key != 'students':
+                header[key] = value
+    return header
+
+
+def iter_students(zf):
+    """Iterasi data siswa di data.json satu per satu tanpa memuat seluruh file."""
+    with _open_data_json(zf) as fp:
+        for key, value in jsonstream.iter_object(fp, stream_keys=('students',)):
+            if key == 'students':
+                yield from value
+
+def read_manifest(data):
+    """Info rantai backup; backup lama (tanpa kunci 'backup') dianggap backup penuh."""
+    manifest = data.get('backup') or {}
+    return {
+        "type": manifest.get('type', BACKUP_FULL),
+        "since": manifest.get('since'),
+        "until": manifest.get('until') or data.get('backup_date') or '',
+        "parent": manifest.get('parent'),
+    }
+
+
+def order_backup_chain(items):
+    """Urutkan [(manifest, payload), ...]: backup penuh terbaru dulu, lalu inkremental setelahnya.
+
+    Mengembalikan (urutan, rantai_lengkap). Rantai dianggap lengkap bila setiap
+    backup inkremental dimulai tepat dari 'until' backup sebelumnya.
+    """
+    fulls = sorted((i for i in items if i[0]['type'] == BACKUP_FULL), key=lambda i: i[0]['until'])
+    deltas = sorted((i for i in items if i[0]['type'] == BACKUP_INCREMENTAL), key=lambda i: i[0]['until'])
+    ordered = fulls[-1:]
+    if fulls:
+        deltas = [d for d in deltas if (d[0]['since'] or '') >= fulls[-1][0]['until']]
+    ordered += deltas
+    complete = True
+    for prev, item in zip(ordered, ordered[1:]):
+        if item[0]['since'] != prev[0]['until']:
+            complete = False
+    if ordered and ordered[0][0]['type'] == BACKUP_INCREMENTAL:
+        complete = False
+    return ordered, complete
+
+
+def extract_file(zf, name, upload_folder):
+    """Salin satu file dari ZIP ke folder upload secara bertahap (per blok, tidak dimuat utuh).
+
+    File yang sudah ada dengan ukuran sama dilewati (foto berbasis hash dengan
+    nama sama pasti isinya sama). Nama yang mencoba keluar dari folder upload
+    diabaikan. Mengembalikan True jika file ditulis.
+    """
+    path = safe_join(upload_folder, name)
+    if path is None:
+        return False
+    info = zf.getinfo(name)
+    if os.path.exists(path) and os.path.getsize(path) == info.file_size:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with zf.open(info) as src, open(tmp_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, EXTRACT_CHUNK_SIZE)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def restore_archive(zf, data, school, upload_folder):
+    """Terapkan satu arsip backup ke sekolah. Tidak melakukan commit.
+
+    `data` adalah header dari read_header(); daftar siswa dibaca bertahap
+    langsung dari ZIP.
+
+    Backup inkremental juga memperbarui data yang sudah ada (kelas siswa,
+    status remisi) dan memindahkan data yang dihapus ke Data Terhapus, agar
+    hasil base + delta sama dengan kondisi terakhir.
+    Mengembalikan (jumlah_siswa_baru, jumlah_pelanggaran_baru).
+    """
+    incremental = read_manifest(data)['type'] == BACKUP_INCREMENTAL
+    names = set(zf.namelist())
+    cache.bump_data_version(school.id)
+
+    # 1. Restore Settings
+    if 'school' in data:
+        school.name = data['school'].get('name', school.name)
+        school.address = data['school'].get('address', school.address)
+        logo_name = data['school'].get('logo')
+        if logo_name:
+            school.logo = logo_name
+            # Extract logo file if in zip
+            if logo_name in names:
+                extract_file(zf, logo_name, upload_folder)
+            # Ikon tidak ikut di-backup; dibuat ulang dari logo
+            logo_path = safe_join(upload_folder, logo_name)
+            if logo_path and os.path.isfile(logo_path):
+                school.icon = store_icon(logo_path)
+
+    # Restore Rules (with ayats)
+    for r_data in data.get('settings', {}).get('rules', []):
+        rule = ViolationRule.query.filter_by(code=r_data['code'], school_id=school.id).first()
+        if not rule:
+            rule = ViolationRule(code=r_data['code'], description=r_data['description'], school_id=school.id)
+            db.session.add(rule)
+            db.session.flush()
+        # Restore ayats for this rule
+        for a_data in r_data.get('ayats', []):
+            if not Ayat.query.filter_by(rule_id=rule.id, description=a_data['description'], number=a_data.get('number')).first():
+                db.session.add(Ayat(number=a_data.get('number'), description=a_data['description'], rule_id=rule.id))
+
+    # Restore Categories
+    for c_data in data.get('settings', {}).get('categories', []):
+        if not ViolationCategory.query.filter_by(name=c_data['name'], school_id=school.id).first():
+            db.session.add(ViolationCategory(name=c_data['name'], points=c_data['points'], school_id=school.id))
+
+    # Restore Classrooms (kelas di Data Terhapus ikut dipulihkan)
+    for c_data in data.get('settings', {}).get('classrooms', []):
+        classroom = Classroom.query.execution_options(include_deleted=True).filter_by(
+            name=c_data['name'], school_id=school.id).first()
+        if not classroom:
+            db.session.add(Classroom(name=c_data['name'], school_id=school.id))
+        elif classroom.deleted_at:
+            trash.restore_rows(school.id, trash.ENTITY_CLASS, [classroom])
+
+    # Restore Members (Users) - Password will need reset or default
+    for m_data in data.get('settings', {}).get('members', []):
+        if not User.query.filter_by(username=m_data['username']).first():
+            new_user = User(username=m_data['username'], full_name=m_data['full_name'], role='school_admin', school_id=school.id)
+            new_user.set_password('guru123') # Default password for restored users
+            db.session.add(new_user)
+
+    db.session.flush()
+
+    # 2. Restore Siswa & Pelanggaran
+    count_students = 0
+    count_violations = 0
+    # Backup hanya menyimpan nama kategori; cocokkan ke kategori sekolah untuk category_id
+    category_ids = dict(db.session.query(ViolationCategory.name, ViolationCategory.id).filter_by(school_id=school.id))
+
+    for s_data in iter_students(zf):
+        # Cari Classroom ID
+        classroom = None
+        if s_data.get('classroom'):
+            classroom = Classroom.query.filter_by(name=s_data['classroom'], school_id=school.id).first()
+
+        # Cari atau Buat Siswa (NIS unik termasuk siswa di Data Terhapus)
+        student = Student.query.execution_options(include_deleted=True).filter_by(
+            nis=s_data['nis'], school_id=school.id).first()
+        if student and student.deleted_at:
+            trash.restore_rows(school.id, trash.ENTITY_STUDENT, [student])
+        if not student:
+            student = Student(
+                name=s_data['name'],
+                nis=s_data['nis'],
+                school_id=school.id,
+                classroom_id=classroom.id if classroom else None
+            )
+            db.session.add(student)
+            db.session.flush()
+            count_students += 1
+        elif incremental:
+            student.name = s_data['name']
+            student.classroom_id = classroom.id if classroom else None
+
+        # Restore Violations
+        for v_data in s_data.get('violations', []):
+            try: v_date = datetime.fromisoformat(v_data['date'])
+            except ValueError: v_date = datetime.utcnow()
+
+            # Cek duplikat; pelanggaran di Data Terhapus dipulihkan (saldo dihitung ulang di akhir)
+            existing = Violation.query.execution_options(include_deleted=True).filter_by(
+                student_id=student.id,
+                date_posted=v_date,
+                description=v_data['description']
+            ).first()
+            if existing and existing.deleted_at:
+                trash.restore_rows(school.id, trash.ENTITY_VIOLATION, [existing])
+
+            if existing:
+                violation = existing
+                if incremental:
+                    violation.is_remitted = v_data.get('is_remitted', False)
+                    violation.remission_reason = v_data.get('remission_reason')
+                    violation.remission_date = _parse_datetime(v_data.get('remission_date'))
+            else:
+                violation = Violation(
+                    student_id=student.id,
+                    date_posted=v_date,
+                    description=v_data['description'],
+                    points=v_data['points'],
+                    pasal=v_data['pasal'],
+                    category_id=category_ids.get(v_data['kategori']),
+                    kategori_pelanggaran=v_data['kategori'],
+                    di_input_oleh=v_data['reporter'],
+                    is_remitted=v_data.get('is_remitted', False),
+                    remission_reason=v_data.get('remission_reason'),
+                    remission_date=_parse_datetime(v_data.get('remission_date'))
+                )
+                db.session.add(violation)
+                db.session.flush()
+                count_violations += 1
+
+                # Link ayats back to violation (by matching description)
+                for a_data in v_data.get('ayats', []):
+                    ayat = Ayat.query.filter_by(description=a_data['description'], number=a_data.get('number')).first()
+                    if ayat:
+                        violation.ayats.append(ayat)
+
+            if existing and not incremental:
+                continue
+
+            # Restore Photos
+            remission_photos = set(v_data.get('remission_photos', []))
+            for p_name in v_data.get('photos', []):
+                # Extract file
+                if p_name in names:
+                    extract_file(zf, p_name, upload_folder)
+
+                # DB Record
+                if not ViolationPhoto.query.filter_by(violation_id=violation.id, filename=p_name).first():
+                    kind = PHOTO_KIND_REMISSION if p_name in remission_photos else PHOTO_KIND_EVIDENCE
+                    db.session.add(ViolationPhoto(filename=p_name, violation_id=violation.id, kind=kind))
+
+    # 3. Penghapusan dari backup inkremental: pindahkan ke Data Terhapus (anak dulu, lalu induk)
+    if incremental:
+        _apply_deletions(data.get('deleted') or {}, school)
+
+    # Saldo poin dan rollup peringkat dihitung ulang dari data hasil restore
+    db.session.flush()
+    leaderboard.rebuild(school.id)
+    return count_students, count_violations
+
+
+def _apply_deletions(deleted, school):
+    for v_data in deleted.get('violations', []):
+        try: v_date = datetime.fromisoformat(v_data['date'])
+        except ValueError: continue
+        rows = Violation.query.join(Student).filter(
+            Student.school_id == school.id,
+            Student.nis == v_data['nis'],
+            Violation.date_posted == v_date,
+            Violation.description == v_data['description']
+        ).all()
+        trash.delete_rows(school.id, trash.ENTITY_VIOLATION, rows)
+
+    if deleted.get('students'):
+        rows = Student.query.filter(Student.school_id == school.id, Student.nis.in_(deleted['students'])).all()
+        trash.delete_rows(school.id, trash.ENTITY_STUDENT, rows)
+
+    if deleted.get('classrooms'):
+        rows = Classroom.query.filter(Classroom.school_id == school.id,
+                                      Classroom.name.in_(deleted['classrooms'])).all()
+        trash.delete_rows(school.id, trash.ENTITY_CLASS, rows)
+
+
+# --- BACKUP TERJADWAL (CLI) ---
+
+def school_backup_dir(out_dir, school_id):
+    return os.path.join(out_dir, f"school_{school_id}")
+
+
+def _backup_parents(entries):
+    """{nama_file: nama_file_parent atau None} dari manifest setiap ZIP backup."""
+    parents = {}
+    for entry in entries:
+        try:
+            with zipfile.ZipFile(entry.path) as zf:
+                parents[entry.name] = read_manifest(read_header(zf))['parent']
+        except (zipfile.BadZipFile, KeyError, ValueError):
+            parents[entry.name] = None
+    return parents
+
+
+def rotate_backups(directory, keep):
+    """Hapus file backup terlama di `directory`, sisakan `keep` file terbaru.
+
+    Rotasi per rantai: backup penuh dan inkremental sebelumnya yang masih
+    dibutuhkan file yang disimpan ikut disimpan, agar tetap bisa di-restore.
+    """
+    if keep is None or keep <= 0 or not os.path.isdir(directory):
+        return []
+    entries = [e for e in os.scandir(directory) if e.is_file() and e.name.endswith('.zip')]
+    entries.sort(key=lambda e: (e.stat().st_mtime, e.name), reverse=True)
+    parents = _backup_parents(entries)
+    kept = set()
+    for entry in entries[:keep]:
+        name = entry.name
+        while name and name not in kept:
+            kept.add(name)
+            name = parents.get(name)
+    removed = []
+    for entry in entries:
+        if entry.name not in kept:
+            os.remove(entry.path)
+            removed.append(entry.name)
+    return removed
+
+
+def _chain_on_disk(snapshot, directory):
+    """True jika file snapshot dan semua parent-nya masih ada di `directory`."""
+    while snapshot is not None:
+        if not os.path.isfile(os.path.join(directory, snapshot.filename)):
+            return False
+        snapshot = db.session.get(BackupSnapshot, snapshot.parent_id) if snapshot.parent_id else None
+    return True
+
+
+def backup_school_to_dir(school, out_dir, upload_folder, incremental=False, keep=None):
+    """Tulis backup satu sekolah langsung ke disk lalu rotasi file lama. Melakukan commit."""
+    directory = school_backup_dir(out_dir, school.id)
+    os.makedirs(directory, exist_ok=True)
+    # Rantai yang sebagian filenya sudah tidak ada (dihapus, atau snapshot dari unduhan web)
+    # tidak bisa di-restore: mulai rantai baru dengan backup penuh
+    if incremental and not _chain_on_disk(last_snapshot(school.id), directory):
+        incremental = False
+    # Tulis ke file sementara dulu agar backup yang gagal di tengah jalan tidak terlihat utuh
+    partial = os.path.join(directory, '.backup.part')
+    snapshot = create_backup(partial, school, upload_folder, incremental=incremental)
+    os.replace(partial, os.path.join(directory, snapshot.filename))
+    db.session.commit()
+    rotate_backups(directory, keep)
+    return snapshot.filename
+
+
+def _backup_worker(school_id, out_dir, incremental, keep):
+    # Dijalankan di proses terpisah: setiap worker membuat app sendiri (konfigurasi dari MY_APP_CONFIG)
+    from my_app import create_app
+    from my_app.models import School
+    app = create_app()
+    with app.app_context():
+        school = db.session.get(School, school_id)
+        try:
+            filename = backup_school_to_dir(school, out_dir, app.config['UPLOAD_FOLDER'],
+                                            incremental=incremental, keep=keep)
+            return school_id, filename, None
+        except Exception as e:
+            db.session.rollback()
+            return school_id, None, str(e)
+        finally:
+            db.session.remove()
+
+
+def backup_schools(school_ids, out_dir, upload_folder, incremental=False, keep=None, workers=1):
+    """Backup beberapa sekolah ke `out_dir`. Mengembalikan [(school_id, filename, error), ...].
+
+    Dengan workers > 1, setiap sekolah diproses di process pool terpisah.
+    """
+    from my_app.models import School
+
+    if workers <= 1:
+        results = []
+        for school_id in school_ids:
+            school = db.session.get(School, school_id)
+            try:
+                results.append((school_id, backup_school_to_dir(school, out_dir, upload_folder,
+                                                                incremental=incremental, keep=keep), None))
+            except Exception as e:
+                db.session.rollback()
+                results.append((school_id, None, str(e)))
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor
+    # Koneksi milik proses induk jangan sampai ikut diwarisi proses anak
+    db.engine.dispose()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_backup_worker, school_id, out_dir, incremental, keep) for school_id in school_ids]
+        return [f.result() for f in futures]
@@ -0,0 +1,265 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from my_app.extensions import db
+from my_app.models import School
+
+# Cache potongan template (fragment) yang mahal dirender.
+#
+# Kunci = nama fragmen + ID sekolah + School.data_version + parameter tambahan.
+# Helper yang mengubah data yang di-cache (kelas, siswa, pelanggaran, pasal/ayat,
+# kategori) memanggil bump_data_version; versi naik di transaksi yang sama saat
+# commit, sehingga entri lama tidak pernah terbaca lagi dan cukup dibuang oleh LRU.
+#
+# Backend (config FRAGMENT_CACHE_BACKEND):
+# - 'memory': LRU di memori proses, dibatasi FRAGMENT_CACHE_MAX_BYTES
+# - 'file'  : file di FRAGMENT_CACHE_DIR, dipakai bersama semua worker gunicorn
+# - 'none'  : nonaktif
+
+
+class MemoryCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.items.get(key)
+            if value is not None:
+                self.items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        cost = len(value.encode('utf-8'))
+        if cost > self.max_bytes:
+            return
+        with self.lock:
+            old = self.items.pop(key, None)
+            if old is not None:
+                self.size -= len(old.encode('utf-8'))
+            self.items[key] = value
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self.items.popitem(last=False)
+                self.size -= len(evicted.encode('utf-8'))
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+            self.size = 0
+
+
+class FileCache:
+    """Satu file per entri; mtime diperbarui saat dibaca sehingga bisa dipakai sebagai urutan LRU."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.html')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as fp:
+                value = fp.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return value
+
+    def set(self, key, value):
+        data = value.encode('utf-8')
+        if len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as fp:
+            fp.write(data)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith('.html'):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.html'):
+                os.remove(os.path.join(self.directory, name))
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(app=None):
+    """Backend cache untuk app ini, atau None jika dinonaktifkan."""
+    app = app or current_app._get_current_object()
+    with _caches_lock:
+        if app not in _caches:
+            backend = app.config.get('FRAGMENT_CACHE_BACKEND', 'memory')
+            max_bytes = app.config.get('FRAGMENT_CACHE_MAX_BYTES', 16 * 1024 * 1024)
+            if backend == 'file':
+                _caches[app] = FileCache(app.config['FRAGMENT_CACHE_DIR'], max_bytes)
+            elif backend == 'memory':
+                _caches[app] = MemoryCache(max_bytes)
+            else:
+                _caches[app] = None
+        return _caches[app]
+
+
+# Kunci Session.info: ID sekolah yang versinya dinaikkan saat commit berikutnya
+_PENDING_BUMPS = 'data_version_bumps'
+
+
+def bump_data_version(school_id):
+    """Tandai data sekolah berubah; semua fragmen lama otomatis tidak terpakai.
+
+    Tidak melakukan commit: versi dinaikkan di transaksi pemanggil, tepat sebelum
+    commit (sekali per sekolah), dan batal jika transaksi di-rollback.
+    """
+    session = db.session()
+    if not session.in_transaction():
+        # Mulai transaksi agar rollback berikutnya juga membatalkan bump ini
+        session.begin()
+    session.info.setdefault(_PENDING_BUMPS, set()).add(school_id)
+
+
+@event.listens_for(Session, 'before_commit')
+def _apply_bumps(session):
+    school_ids = session.info.pop(_PENDING_BUMPS, None)
+    if school_ids:
+        # Kunci baris sekolah baru diambil di akhir transaksi, urut ID agar tidak deadlock
+        session.execute(update(School).where(School.id.in_(sorted(school_ids))).values(
+            data_version=School.data_version + 1).execution_options(synchronize_session=False))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _drop_bumps(session, previous_transaction):
+    # Rollback savepoint tidak membatalkan bump transaksi luarnya
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_BUMPS, None)
+
+
+def school_key():
+    """'<id sekolah>:<versi data>' untuk user yang login, atau None."""
+    if not current_user.is_authenticated or not current_user.school_id:
+        return None
+    # Dibaca langsung dari database: objek sekolah milik current_user bisa berasal
+    # dari cache identitas (my_app/identity.py) dan membawa versi lama
+    version = db.session.query(School.data_version).filter_by(id=current_user.school_id).scalar()
+    return f'{current_user.school_id}:{version or 0}'
+
+
+def today_key():
+    """Fragmen yang memuat data 'hari ini' harus berganti kunci setiap hari."""
+    return datetime.utcnow().strftime('%Y-%m-%d')
+
+
+class Lazy:
+    """Nilai yang baru dihitung saat pertama kali dipakai template.
+
+    Query untuk fragmen yang diambil dari cache tidak pernah dijalankan.
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._loaded = False
+        self._value = None
+
+    def _get(self):
+        if not self._loaded:
+            self._value = self._func(*self._args, **self._kwargs)
+            self._loaded = True
+        return self._value
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __bool__(self):
+        return bool(self._get())
+
+    def __str__(self):
+        return str(self._get())
+
+    def __html__(self):
+        return Markup.escape(self._get())
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'nama', param1, param2 %} ... {% endcache %}"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cache_support', [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, parts, caller):
+        cache = get_cache()
+        scope = school_key()
+        if cache is None or scope is None:
+            return caller()
+        name, extra = parts[0], parts[1:]
+        key = ':'.join(['fragment', str(name), scope] + [str(p) for p in extra])
+        value = cache.get(key)
+        if value is None:
+            value = caller()
+            cache.set(key, str(value))
+        return Markup(value)
+
+
+def init_app(app):
+    app.jinja_env.add_extension(FragmentCacheExtension)
@@ -0,0 +1,147 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from my_app.extensions import db
+from my_app.models import School
+
+
+@click.command('backup-all')
+@click.option('--out', 'out_dir', required=True, type=click.Path(file_okay=False), help='Direktori tujuan backup.')
+@click.option('--school', 'schools', multiple=True, help='ID atau nama sekolah (boleh diulang). Default: semua sekolah.')
+@click.option('--incremental', is_flag=True, help='Hanya ekspor perubahan sejak backup terakhir.')
+@click.option('--keep', default=7, show_default=True, help='Jumlah file backup terbaru yang disimpan per sekolah (beserta rantai backup yang dibutuhkannya).')
+@click.option('--workers', default=1, show_default=True, help='Jumlah proses paralel.')
+@with_appcontext
+def backup_all_command(out_dir, schools, incremental, keep, workers):
+    """Backup semua (atau sebagian) sekolah langsung ke disk."""
+    from my_app.backup import backup_schools
+
+    query = School.query.order_by(School.id)
+    if schools:
+        ids = [int(s) for s in schools if s.isdigit()]
+        names = [s for s in schools if not s.isdigit()]
+        query = query.filter(db.or_(School.id.in_(ids), School.name.in_(names)))
+    school_ids = [s.id for s in query]
+    if not school_ids:
+        click.echo("Tidak ada sekolah yang cocok.")
+        return
+
+    results = backup_schools(school_ids, out_dir, current_app.config['UPLOAD_FOLDER'],
+                             incremental=incremental, keep=keep, workers=workers)
+    failed = 0
+    for school_id, filename, error in results:
+        if error:
+            failed += 1
+            click.echo(f"❌ Sekolah #{school_id}: {error}")
+        else:
+            click.echo(f"✅ Sekolah #{school_id}: {filename}")
+    if failed:
+        raise SystemExit(1)
+
+
+@click.command('gc-uploads')
+@click.option('--delete', is_flag=True, help='Hapus file orphan (default: hanya laporan).')
+@click.option('--quarantine', 'quarantine_dir', type=click.Path(file_okay=False),
+              help='Pindahkan file orphan ke direktori ini alih-alih menghapusnya.')
+@click.option('--min-age', default=3600, show_default=True, help='Lewati file yang lebih muda dari N detik.')
+@with_appcontext
+def gc_uploads_command(delete, quarantine_dir, min_age):
+    """Bersihkan file di folder upload yang tidak dirujuk database."""
+    from my_app.storage import collect_garbage, format_size
+
+    root = current_app.config['UPLOAD_FOLDER']
+    if not os.path.isdir(root):
+        click.echo("Folder upload belum ada.")
+        return
+    orphans, total = collect_garbage(root, quarantine_dir=quarantine_dir, delete=delete, min_age=min_age)
+    for name in orphans:
+        click.echo(f"  {name}")
+    if quarantine_dir:
+        action = f"dipindahkan ke {quarantine_dir}"
+    elif delete:
+        action = "dihapus"
+    else:
+        action = "ditemukan (jalankan dengan --delete atau --quarantine untuk membersihkan)"
+    click.echo(f"{len(orphans)} file orphan ({format_size(total)}) {action}.")
+
+
+@click.command('storage-report')
+@with_appcontext
+def storage_report_command():
+    """Laporan pemakaian penyimpanan foto per sekolah."""
+    from my_app.storage import storage_usage, format_size
+
+    for row in storage_usage(current_app.config['UPLOAD_FOLDER']):
+        click.echo(f"{row['school'].name}: {row['files']} file, {format_size(row['bytes'])}")
+
+
+@click.command('prune-tombstones')
+@with_appcontext
+def prune_tombstones_command():
+    """Hapus tombstone sinkronisasi yang melewati masa simpan."""
+    from my_app.sync import prune_tombstones
+
+    count = prune_tombstones()
+    db.session.commit()
+    click.echo(f"{count} tombstone dihapus.")
+
+
+@click.command('purge-deleted')
+@click.option('--days', type=int, help='Masa simpan Data Terhapus (hari). Default: SOFT_DELETE_RETENTION_DAYS.')
+@click.option('--batch-size', default=500, show_default=True, help='Jumlah baris per transaksi.')
+@with_appcontext
+def purge_deleted_command(days, batch_size):
+    """Hapus permanen pelanggaran, siswa dan kelas yang sudah melewati masa simpan Data Terhapus."""
+    from my_app.trash import purge, retention_cutoff, ENTITY_VIOLATION, ENTITY_STUDENT, ENTITY_CLASS
+
+    counts = purge(retention_cutoff(days=days), batch_size=batch_size)
+    click.echo(f"{counts[ENTITY_VIOLATION]} pelanggaran, {counts[ENTITY_STUDENT]} siswa dan "
+               f"{counts[ENTITY_CLASS]} kelas dihapus permanen.")
+
+
+@click.command('generate-school-icons')
+@click.option('--force', is_flag=True, help='Buat ulang ikon walaupun sudah ada.')
+@with_appcontext
+def generate_school_icons_command(force):
+    """Buat ikon favicon untuk sekolah yang logonya diupload sebelum ikon tersedia."""
+    from my_app.storage import absolute_path, store_icon
+
+    count = 0
+    query = School.query.filter(School.logo.isnot(None))
+    if not force:
+        query = query.filter(School.icon.is_(None))
+    for school in query:
+        path = absolute_path(school.logo)
+        if not path or not os.path.isfile(path):
+            click.echo(f"⚠️  {school.name}: file logo tidak ditemukan.")
+            continue
+        school.icon = store_icon(path)
+        if school.icon:
+            count += 1
+    db.session.commit()
+    click.echo(f"{count} ikon sekolah dibuat.")
+
+
+@click.command('rebuild-points')
+@click.option('--school', 'school_id', type=int, help='ID sekolah. Default: semua sekolah.')
+@with_appcontext
+def rebuild_points_command(school_id):
+    """Hitung ulang saldo poin siswa dan rollup peringkat dari data pelanggaran."""
+    from my_app.leaderboard import rebuild
+
+    count = rebuild(school_id)
+    db.session.commit()
+    click.echo(f"Saldo poin dihitung ulang, {count} baris rollup harian dibuat.")
+
+
+def register_commands(app):
+    app.cli.add_command(backup_all_command)
+    app.cli.add_command(gc_uploads_command)
+    app.cli.add_command(storage_report_command)
+    app.cli.add_command(generate_school_icons_command)
+    app.cli.add_command(prune_tombstones_command)
+    app.cli.add_command(purge_deleted_command)
+    app.cli.add_command(rebuild_points_command)
@@ -1,5 +1,26 @@
 import os
 
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def engine_options(uri):
+    """Opsi create_engine dari env (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE)."""
+    options = {
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 280),
+        'pool_pre_ping': True,
+    }
+    # SQLite tidak memakai pool koneksi berukuran tetap
+    if not uri.startswith('sqlite'):
+        options.update(
+            pool_size=_env_int('DB_POOL_SIZE', 10),
+            max_overflow=_env_int('DB_MAX_OVERFLOW', 20),
+            pool_timeout=_env_int('DB_POOL_TIMEOUT', 30),
+        )
+    return options
+
+
 class Config:
     # Direktori dasar aplikasi
     BASE_DIR = os.path.abspath(os.path.dirname(__file__))
@@ -13,20 +34,84 @@ class Config:
     DB_HOST = 'localhost'        # Server lokal
     DB_NAME = 'tanse_db'         # Nama database yang baru saja Anda buat
     
-    # Connection String untuk MySQL
-    SQLALCHEMY_DATABASE_URI = f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+    # Connection String untuk MySQL (DATABASE_URL menimpa nilai di atas)
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        'DATABASE_URL', f"mysql+pymysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}")
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # Opsi tambahan agar koneksi stabil
-    SQLALCHEMY_ENGINE_OPTIONS = {
-        'pool_recycle': 280,
-        'pool_pre_ping': True,
-    }
+    # Pool koneksi, bisa diatur per deployment lewat env DB_POOL_*
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Replika baca (opsional): dipakai halaman dengan @replica_reads (my_app/replica.py)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {
+        'replica': dict(url=DATABASE_REPLICA_URL, **engine_options(DATABASE_REPLICA_URL))
+    } if DATABASE_REPLICA_URL else {}
     
+    # Profil SQLite (DATABASE_URL=sqlite:///...): WAL, pragma cache, busy timeout dan
+    # BEGIN IMMEDIATE untuk request tulis (my_app/sqlite_profile.py). 0 = bawaan SQLite.
+    SQLITE_PERFORMANCE_MODE = os.environ.get('SQLITE_PERFORMANCE_MODE', '1') == '1'
+    SQLITE_BUSY_TIMEOUT_MS = _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    SQLITE_CACHE_SIZE_KB = 64 * 1024
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
     # Konfigurasi Upload
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     
-    PER_PAGE = 20
\ No newline at end of file
+    PER_PAGE = 20
+
+    # Arsip tahun ajaran: bulan dimulainya tahun ajaran baru (7 = Juli)
+    ACADEMIC_YEAR_START_MONTH = 7
+
+    # Peringatan saldo poin siswa (awal 100): dicatat saat saldo turun di bawah ambang ini
+    POINT_ALERT_THRESHOLDS = (75, 50, 25)
+
+    # Remisi massal dengan pelanggaran lebih dari ini diproses di thread latar belakang
+    BULK_REMISSION_BACKGROUND_THRESHOLD = 1000
+
+    # Sinkronisasi delta: tombstone lebih tua dari ini boleh dihapus;
+    # klien dengan token yang lebih lama menerima snapshot penuh
+    SYNC_TOMBSTONE_RETENTION_DAYS = 90
+
+    # Data Terhapus (hapus lunak) masih bisa dipulihkan selama N hari,
+    # setelah itu dihapus permanen oleh `flask purge-deleted`
+    SOFT_DELETE_RETENTION_DAYS = 30
+
+    # Dashboard live (Server-Sent Events): 'memory' untuk satu worker,
+    # 'file' jika aplikasi dijalankan dengan beberapa worker (gunicorn -w N)
+    EVENT_BACKEND = os.environ.get('EVENT_BACKEND', 'memory')
+    EVENT_DIR = os.path.join(BASE_DIR, 'instance', 'events')
+    # Koneksi SSE ditutup setelah N detik; browser otomatis tersambung ulang
+    EVENT_STREAM_TIMEOUT = 300
+
+    # Cache fragmen template: 'memory' (per worker), 'file' (dibagi semua worker) atau 'none'
+    FRAGMENT_CACHE_BACKEND = os.environ.get('FRAGMENT_CACHE_BACKEND', 'memory')
+    FRAGMENT_CACHE_DIR = os.path.join(BASE_DIR, 'instance', 'fragments')
+    FRAGMENT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+    # Cache identitas user+sekolah per proses (detik); 0 = nonaktif
+    IDENTITY_CACHE_TTL = 60
+    IDENTITY_CACHE_SIZE = 512
+
+    # Jejak audit: ditulis berkelompok oleh thread latar belakang (my_app/audit.py)
+    AUDIT_FLUSH_INTERVAL = 1.0   # detik; 0 = tanpa thread, tulis saat audit.flush()
+    AUDIT_BATCH_SIZE = 500
+    AUDIT_QUEUE_SIZE = 10000
+
+
+class TestConfig(Config):
+    """Konfigurasi test suite (tests/conftest.py): SQLite di memori."""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SQLALCHEMY_BINDS = {}
+    WTF_CSRF_ENABLED = False
+    SECRET_KEY = 'test_secret_key'
+
+    # Test mengubah database langsung (tanpa POST), jadi fragmen dan identitas tidak di-cache
+    FRAGMENT_CACHE_BACKEND = 'none'
+    IDENTITY_CACHE_TTL = 0
+    AUDIT_FLUSH_INTERVAL = 0
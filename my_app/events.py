@@ -0,0 +1,197 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from flask import current_app
+
+# Pub/sub event pelanggaran per sekolah untuk dashboard live (Server-Sent Events).
+#
+# Dua backend (config EVENT_BACKEND):
+# - 'memory': antrean di memori proses. Cukup untuk satu worker (flask run / waitress).
+# - 'file'  : log JSON per sekolah di EVENT_DIR. Semua worker di mesin yang sama
+#             membaca file yang sama, sehingga event dari worker lain ikut terkirim.
+
+VIOLATION_ADDED = 'violation_added'
+VIOLATION_REMITTED = 'violation_remitted'
+VIOLATION_DELETED = 'violation_deleted'
+# Remisi massal: satu event ringkas {count, points}
+VIOLATIONS_REMITTED = 'violations_remitted'
+# Saldo poin siswa turun melewati ambang sanksi (my_app/leaderboard.py)
+POINT_ALERT = 'point_alert'
+
+# Jumlah event terakhir yang disimpan per sekolah untuk klien yang tersambung ulang
+MEMORY_BACKLOG = 200
+
+# Log file diputar ulang jika melebihi ukuran ini
+FILE_MAX_BYTES = 1024 * 1024
+FILE_POLL_INTERVAL = 0.5
+
+
+class MemoryBroker:
+    def __init__(self, backlog=MEMORY_BACKLOG):
+        self.backlog = backlog
+        self.condition = threading.Condition()
+        self.events = {}
+        self.last_id = 0
+
+    def publish(self, school_id, event_type, data):
+        with self.condition:
+            self.last_id += 1
+            queue = self.events.setdefault(school_id, deque(maxlen=self.backlog))
+            queue.append((str(self.last_id), event_type, data))
+            self.condition.notify_all()
+
+    def listen(self, school_id, last_event_id=None, timeout=15):
+        """Generator (id, tipe, data); menghasilkan None tiap `timeout` detik tanpa event (keep-alive).
+
+        Posisi awal ditentukan saat listen() dipanggil, bukan saat generator pertama kali dibaca.
+        """
+        cursor = int(last_event_id) if last_event_id and last_event_id.isdigit() else self.last_id
+        return self._follow(school_id, cursor, timeout)
+
+    def _follow(self, school_id, cursor, timeout):
+        while True:
+            with self.condition:
+                pending = [e for e in self.events.get(school_id, ()) if int(e[0]) > cursor]
+                if not pending:
+                    self.condition.wait(timeout)
+                    pending = [e for e in self.events.get(school_id, ()) if int(e[0]) > cursor]
+            if not pending:
+                yield None
+                continue
+            for event in pending:
+                cursor = int(event[0])
+                yield event
+
+
+class FileBroker:
+    """ID event = '<inode>-<offset>' di dalam file log sekolah."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = threading.Lock()
+
+    def _path(self, school_id):
+        return os.path.join(self.directory, f'events-{school_id}.log')
+
+    def publish(self, school_id, event_type, data):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(school_id)
+        line = json.dumps({'type': event_type, 'data': data}, separators=(',', ':')) + '\n'
+        with self.lock:
+            try:
+                if os.path.getsize(path) > FILE_MAX_BYTES:
+                    # Ganti file baru; pembaca mendeteksi inode berbeda lalu mulai dari awal
+                    os.replace(path, path + '.old')
+            except FileNotFoundError:
+                pass
+            # Satu write() dengan O_APPEND: baris dari beberapa proses tidak saling terpotong
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line.encode('utf-8'))
+            finally:
+                os.close(fd)
+
+    def listen(self, school_id, last_event_id=None, timeout=15):
+        path = self._path(school_id)
+        inode, offset = None, None
+        if last_event_id and '-' in last_event_id:
+            inode_str, _, offset_str = last_event_id.partition('-')
+            if inode_str.isdigit() and offset_str.isdigit():
+                inode, offset = int(inode_str), int(offset_str)
+        if offset is None:
+            # Klien baru mulai dari ujung file
+            try:
+                stat = os.stat(path)
+                inode, offset = stat.st_ino, stat.st_size
+            except FileNotFoundError:
+                inode, offset = None, 0
+        return self._follow(path, inode, offset, timeout)
+
+    def _follow(self, path, inode, offset, timeout):
+        idle = 0.0
+        while True:
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat is not None:
+                if inode is None:
+                    inode = stat.st_ino
+                elif inode != stat.st_ino or offset > stat.st_size:
+                    # File sudah diputar: baca file baru dari awal
+                    inode, offset = stat.st_ino, 0
+                if stat.st_size > offset:
+                    with open(path, 'rb') as fp:
+                        fp.seek(offset)
+                        chunk = fp.read(stat.st_size - offset)
+                    # Hanya baris lengkap; sisa baris yang belum selesai ditulis dibaca lagi nanti
+                    end = chunk.rfind(b'\n') + 1
+                    for raw in chunk[:end].splitlines():
+                        offset += len(raw) + 1
+                        try:
+                            record = json.loads(raw)
+                        except ValueError:
+                            continue
+                        yield f'{inode}-{offset}', record['type'], record['data']
+                    if end:
+                        idle = 0.0
+                        continue
+            time.sleep(FILE_POLL_INTERVAL)
+            idle += FILE_POLL_INTERVAL
+            if idle >= timeout:
+                idle = 0.0
+                yield None
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+def get_broker(app=None):
+    app = app or current_app._get_current_object()
+    with _brokers_lock:
+        broker = _brokers.get(app)
+        if broker is None:
+            if app.config.get('EVENT_BACKEND', 'memory') == 'file':
+                broker = FileBroker(app.config['EVENT_DIR'])
+            else:
+                broker = MemoryBroker()
+            _brokers[app] = broker
+        return broker
+
+
+def violation_payload(violation, student_name=None, class_name=None):
+    """Data ringkas pelanggaran untuk event. Nama siswa/kelas bisa diberikan agar tidak perlu query."""
+    if student_name is None:
+        student = violation.student
+        student_name = student.name
+        class_name = student.classroom.name if student.classroom else None
+    return {
+        'id': violation.id,
+        'student_id': violation.student_id,
+        'student_name': student_name,
+        'class_name': class_name,
+        'points': violation.points,
+        'category': violation.kategori_pelanggaran,
+        'date_posted': violation.date_posted.isoformat() if violation.date_posted else None,
+        'is_remitted': bool(violation.is_remitted),
+    }
+
+
+def publish(school_id, event_type, data):
+    """Kirim event ke semua dashboard sekolah. Panggil setelah commit."""
+    try:
+        get_broker().publish(school_id, event_type, data)
+    except OSError as e:
+        # Dashboard live tidak boleh menggagalkan pencatatan pelanggaran
+        current_app.logger.warning('Gagal mengirim event %s: %s', event_type, e)
+
+
+def format_sse(event):
+    if event is None:
+        return ': ping\n\n'
+    event_id, event_type, data = event
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
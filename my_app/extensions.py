@@ -1,5 +1,12 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from flask_login import LoginManager
 
-db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+from my_app.replica import RoutingSession
+
+# RoutingSession mengarahkan query baca view tertentu ke replika (my_app/replica.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+migrate = Migrate()
+
+login_manager = LoginManager()
+login_manager.login_view = 'auth.login'
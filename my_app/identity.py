@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy.orm import joinedload
+
+from my_app.extensions import db
+from my_app.models import User
+
+# Cache identitas user untuk Flask-Login.
+#
+# Tanpa cache, setiap request menjalankan dua query: SELECT user (load_user)
+# lalu SELECT school (current_user.school). Di sini user dimuat sekali beserta
+# sekolahnya (joinedload), disimpan terlepas dari session selama beberapa
+# detik (IDENTITY_CACHE_TTL), lalu di-merge ke session request tanpa query.
+#
+# Kunci cache = ID sesi Flask-Login '<id user>:<credential_version>' (User.get_id).
+# Ganti password menaikkan credential_version sehingga sesi lama tidak lagi cocok.
+# Invalidasi eksplisit (invalidate_user/invalidate_school) hanya berlaku di proses
+# ini; worker lain menyusul paling lambat setelah TTL habis.
+
+
+class IdentityCache:
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.items.get(key)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self.items[key]
+                return None
+            self.items.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.items[key] = (time.monotonic() + self.ttl, user)
+            self.items.move_to_end(key)
+            while len(self.items) > self.max_size:
+                self.items.popitem(last=False)
+
+    def discard(self, predicate):
+        with self.lock:
+            for key in [k for k, (_, user) in self.items.items() if predicate(user)]:
+                del self.items[key]
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(app=None):
+    """Cache identitas untuk app ini, atau None jika IDENTITY_CACHE_TTL = 0."""
+    app = app or current_app._get_current_object()
+    with _caches_lock:
+        if app not in _caches:
+            ttl = app.config.get('IDENTITY_CACHE_TTL', 60)
+            _caches[app] = IdentityCache(ttl, app.config.get('IDENTITY_CACHE_SIZE', 512)) if ttl > 0 else None
+        return _caches[app]
+
+
+def _load(user_id, version):
+    user = db.session.get(User, user_id, options=[joinedload(User.school)])
+    if user is None:
+        return None
+    if version != str(user.credential_version or 0):
+        return None
+    return user
+
+
+def load_user(session_id):
+    """user_loader Flask-Login."""
+    user_id, _, version = str(session_id).partition(':')
+    # Sesi lama (sebelum ada credential_version) hanya berisi ID user: harus login ulang
+    if not user_id.isdigit() or not version:
+        return None
+    cache = get_cache()
+    if cache is None:
+        return _load(int(user_id), version)
+
+    cached = cache.get(session_id)
+    if cached is None:
+        user = _load(int(user_id), version)
+        if user is None:
+            return None
+        # Objek yang disimpan harus lepas dari session agar tidak ikut expire saat commit
+        school = user.school
+        db.session.expunge(user)
+        if school is not None:
+            db.session.expunge(school)
+        cache.set(session_id, user)
+        cached = user
+    # Salinan untuk session request ini; load=False berarti tanpa query
+    return db.session.merge(cached, load=False)
+
+
+def invalidate_user(user_id):
+    cache = get_cache()
+    if cache is not None:
+        cache.discard(lambda user: user.id == user_id)
+
+
+def invalidate_school(school_id):
+    cache = get_cache()
+    if cache is not None:
+        cache.discard(lambda user: user.school_id == school_id)
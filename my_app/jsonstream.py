@@ -0,0 +1,110 @@
+import json
+
+# Pembaca JSON bertahap untuk file backup besar.
+# Hanya satu elemen array (misal satu siswa beserta pelanggarannya) yang
+# berada di memori pada satu waktu, berapa pun ukuran file data.json.
+
+_WHITESPACE = ' \t\n\r'
+
+# Batas ukuran satu nilai (karakter); data.json rusak/terpotong tidak dibaca tanpa batas
+MAX_VALUE_SIZE = 64 * 1024 * 1024
+
+
+class _StreamReader:
+    def __init__(self, fp, chunk_size=64 * 1024, max_value_size=MAX_VALUE_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size=None):
+        chunk = self.fp.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Buang bagian buffer yang sudah diproses
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON tidak valid: diharapkan '{char}' pada posisi {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Nilai belum utuh: gandakan isi buffer sebelum parse ulang, sehingga
+                # jumlah parse ulang logaritmik terhadap ukuran nilai, bukan per chunk
+                pending = len(self.buf) - self.pos
+                if pending >= self.max_value_size:
+                    raise ValueError(f"JSON tidak valid: nilai pada posisi {self.pos} "
+                                     f"melebihi {self.max_value_size} karakter")
+                if self.eof or not self._fill(max(pending, self.chunk_size)):
+                    raise
+                continue
+            # Angka di ujung buffer bisa saja terpotong; baca lagi untuk memastikan
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def array(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"JSON tidak valid: diharapkan ',' atau ']' pada posisi {self.pos}")
+
+
+def iter_object(fp, stream_keys=(), chunk_size=64 * 1024, max_value_size=MAX_VALUE_SIZE):
+    """Iterasi pasangan (kunci, nilai) level teratas sebuah objek JSON dari file teks `fp`.
+
+    Untuk kunci di `stream_keys` yang bernilai array, nilainya berupa generator
+    elemen array. Generator yang tidak dihabiskan pemanggil akan dilewati
+    otomatis sebelum kunci berikutnya dibaca. Nilai (atau elemen array) yang
+    lebih besar dari `max_value_size` karakter menimbulkan ValueError.
+    """
+    reader = _StreamReader(fp, chunk_size, max_value_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key in stream_keys and reader.peek() == '[':
+            items = reader.array()
+            yield key, items
+            for _ in items:
+                pass
+        else:
+            yield key, reader.value()
+        char = reader.peek()
+        reader.pos += 1
+        if char == '}':
+            return
+        if char != ',':
+            raise ValueError(f"JSON tidak valid: diharapkan ',' atau '}}' pada posisi {reader.pos}")
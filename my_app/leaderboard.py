@@ -0,0 +1,247 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, case, delete, func, or_, select, update, bindparam
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import selectinload
+
+from my_app import archive, events
+from my_app.extensions import db
+from my_app.models import Student, Violation, ArchivedViolation, StudentDailyPoints, PointAlert
+
+# Peringkat pelanggar dan peringatan saldo poin.
+#
+# Setiap penulisan pelanggaran (catat, remisi, hapus, arsip) memanggil fungsi
+# record_* di modul ini dalam transaksi yang sama:
+# - Student.poin dikurangi/ditambah langsung (saldo berjalan)
+# - tabel rollup student_daily_points ditambah per (siswa, hari), sehingga
+#   peringkat rentang apa pun cukup SUM beberapa baris per siswa
+# - perpindahan saldo melewati POINT_ALERT_THRESHOLDS dideteksi dari saldo
+#   lama/baru, tanpa memindai ulang riwayat pelanggaran
+
+# Saldo awal setiap siswa (sama dengan default Student.poin)
+STARTING_POINTS = 100
+
+# Pilihan periode peringkat
+RANGE_TODAY = 'today'
+RANGE_WEEK = 'week'
+RANGE_MONTH = 'month'
+RANGE_SEMESTER = 'semester'
+RANGES = {RANGE_TODAY: 'Hari Ini', RANGE_WEEK: '7 Hari', RANGE_MONTH: '30 Hari', RANGE_SEMESTER: 'Semester Ini'}
+
+# Kunci session.info untuk peringatan baru yang belum dikirim ke dashboard live
+_PENDING_ALERTS = 'point_alerts'
+
+# INSERT ... ON CONFLICT/ON DUPLICATE KEY per dialect untuk menambah baris rollup
+_UPSERT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert, 'mysql': mysql.insert}
+
+
+# --- PENCATATAN ---
+
+def record_added(violations):
+    """Pelanggaran baru sudah di-flush: kurangi saldo dan tambah rollup."""
+    _apply([(v.student_id, v.date_posted, v.points, 1) for v in violations])
+
+
+def record_remitted(violations):
+    """Panggil sebelum is_remitted diset: poin dikembalikan ke saldo, jumlah kasus tetap."""
+    _apply([(v.student_id, v.date_posted, -v.points, 0) for v in violations if not v.is_remitted])
+
+
+def record_removed(violations):
+    """Pelanggaran dipindahkan ke Data Terhapus (my_app/trash.py)."""
+    _apply([(v.student_id, v.date_posted, 0 if v.is_remitted else -v.points, -1) for v in violations])
+
+
+def record_restored(violations):
+    """Pelanggaran dipulihkan dari Data Terhapus: kebalikan record_removed."""
+    _apply([(v.student_id, v.date_posted, 0 if v.is_remitted else v.points, 1) for v in violations])
+
+
+def record_archived(student_points):
+    """Pelanggaran tahun ajaran lama diarsipkan: saldo dipulihkan, rollup (riwayat) tetap.
+
+    `student_points` berisi pasangan (student_id, jumlah poin aktif yang diarsipkan).
+    """
+    _apply([(student_id, None, -points, 0) for student_id, points in student_points], rollup=False)
+
+
+def _apply(entries, rollup=True):
+    """entries: [(student_id, date_posted, poin, jumlah kasus)]. Poin positif menurunkan saldo. Tidak commit."""
+    deltas = defaultdict(int)
+    days = defaultdict(lambda: [0, 0])
+    for student_id, date_posted, points, count in entries:
+        deltas[student_id] += points or 0
+        if rollup:
+            day = days[(student_id, date_posted.date())]
+            day[0] += points or 0
+            day[1] += count
+    if not deltas:
+        return
+
+    changed = {student_id: delta for student_id, delta in deltas.items() if delta}
+    students = Student.__table__
+    if changed:
+        db.session.execute(
+            update(students).where(students.c.id == bindparam('student')).values(
+                poin=func.coalesce(students.c.poin, STARTING_POINTS) - bindparam('delta')),
+            [{'student': student_id, 'delta': delta} for student_id, delta in changed.items()]
+        )
+    rows = {student_id: (school_id, poin) for student_id, school_id, poin in db.session.execute(
+        select(students.c.id, students.c.school_id, students.c.poin).where(students.c.id.in_(list(deltas))))}
+
+    if days:
+        _add_to_rollup([{
+            'student_id': student_id, 'day': day, 'school_id': rows[student_id][0],
+            'points': points, 'violation_count': count,
+        } for (student_id, day), (points, count) in days.items()])
+    _check_thresholds({student_id: (rows[student_id], delta) for student_id, delta in changed.items()})
+
+
+def _add_to_rollup(rows):
+    table = StudentDailyPoints.__table__
+    stmt = _UPSERT_INSERTS[db.engine.dialect.name](table)
+    if db.engine.dialect.name == 'mysql':
+        stmt = stmt.on_duplicate_key_update(
+            points=table.c.points + stmt.inserted.points,
+            violation_count=table.c.violation_count + stmt.inserted.violation_count)
+    else:
+        stmt = stmt.on_conflict_do_update(index_elements=[table.c.student_id, table.c.day], set_={
+            'points': table.c.points + stmt.excluded.points,
+            'violation_count': table.c.violation_count + stmt.excluded.violation_count,
+        })
+    db.session.execute(stmt, rows)
+
+
+def _check_thresholds(changes):
+    """changes: {student_id: ((school_id, saldo_baru), selisih)}; saldo lama = saldo baru + selisih."""
+    thresholds = current_app.config.get('POINT_ALERT_THRESHOLDS', ())
+    now = datetime.utcnow()
+    alerts = []
+    for student_id, ((school_id, balance), delta) in changes.items():
+        previous = balance + delta
+        crossed_down = [t for t in thresholds if previous >= t > balance]
+        crossed_up = [t for t in thresholds if balance >= t > previous]
+        alerts += [PointAlert(school_id=school_id, student_id=student_id, threshold=t, balance=balance,
+                              created_at=now) for t in crossed_down]
+        if crossed_up:
+            # Saldo naik kembali (remisi/arsip): peringatan ambang tersebut selesai
+            PointAlert.query.filter(
+                PointAlert.student_id == student_id,
+                PointAlert.threshold.in_(crossed_up),
+                PointAlert.resolved_at.is_(None)
+            ).update({PointAlert.resolved_at: now}, synchronize_session=False)
+    if alerts:
+        db.session.add_all(alerts)
+        db.session.info.setdefault(_PENDING_ALERTS, []).extend(alerts)
+
+
+def publish_alerts(school_id):
+    """Kirim peringatan baru ke dashboard live. Panggil setelah commit."""
+    for alert in db.session.info.pop(_PENDING_ALERTS, []):
+        events.publish(school_id, events.POINT_ALERT, {
+            'id': alert.id,
+            'student_id': alert.student_id,
+            'student_name': alert.student.name,
+            'threshold': alert.threshold,
+            'balance': alert.balance,
+        })
+
+
+# --- PERINGKAT ---
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def range_bounds(name, today=None):
+    """(tanggal_awal, tanggal_akhir) inklusif untuk salah satu RANGES."""
+    today = today or datetime.utcnow().date()
+    if name == RANGE_WEEK:
+        return today - timedelta(days=6), today
+    if name == RANGE_MONTH:
+        return today - timedelta(days=29), today
+    if name == RANGE_SEMESTER:
+        # Semester ganjil = 6 bulan pertama tahun ajaran, genap = sisanya
+        year_start = archive.academic_year_start(datetime.combine(today, time())).date()
+        second = _add_months(year_start, 6)
+        return (second if today >= second else year_start), today
+    return today, today
+
+
+def top_students(school_id, start, end, classroom_id=None, limit=10):
+    """Siswa dengan poin bersih terbanyak pada [start, end], dihitung dari tabel rollup.
+
+    Setiap baris berisi Student, violation_count dan total_points.
+    """
+    total_points = func.sum(StudentDailyPoints.points).label('total_points')
+    query = db.session.query(
+        Student,
+        func.sum(StudentDailyPoints.violation_count).label('violation_count'),
+        total_points
+    ).join(StudentDailyPoints, StudentDailyPoints.student_id == Student.id).filter(
+        StudentDailyPoints.school_id == school_id,
+        StudentDailyPoints.day >= start,
+        StudentDailyPoints.day <= end
+    )
+    if classroom_id:
+        query = query.filter(Student.classroom_id == classroom_id)
+    return query.options(selectinload(Student.classroom)).group_by(Student.id).having(
+        func.sum(StudentDailyPoints.violation_count) > 0
+    ).order_by(total_points.desc(), Student.name).limit(limit).all()
+
+
+def open_alerts(school_id, limit=50):
+    """Peringatan saldo yang belum selesai, terbaru dulu."""
+    # Join ke siswa: peringatan siswa yang ada di Data Terhapus ikut tersembunyi
+    return PointAlert.query.join(PointAlert.student).filter(
+        PointAlert.school_id == school_id, PointAlert.resolved_at.is_(None)).options(
+        selectinload(PointAlert.student).selectinload(Student.classroom)
+    ).order_by(PointAlert.created_at.desc(), PointAlert.id.desc()).limit(limit).all()
+
+
+# --- HITUNG ULANG ---
+
+def rebuild(school_id=None):
+    """Hitung ulang saldo dan rollup dari tabel pelanggaran (setelah restore). Tidak commit.
+
+    Peringatan tidak dibuat ulang. Mengembalikan jumlah baris rollup.
+    """
+    # Subquery di dalam UPDATE tidak difilter listener hapus lunak, jadi deleted_at ditulis sendiri
+    active = and_(or_(Violation.is_remitted.is_(None), Violation.is_remitted == False),  # noqa: E712
+                  Violation.deleted_at.is_(None))
+    penalty = select(func.coalesce(func.sum(Violation.points), 0)).where(
+        Violation.student_id == Student.id, active).scalar_subquery()
+    balances = update(Student).values(poin=STARTING_POINTS - penalty)
+    if school_id:
+        balances = balances.where(Student.school_id == school_id)
+    db.session.execute(balances.execution_options(synchronize_session=False))
+
+    cleanup = delete(StudentDailyPoints)
+    if school_id:
+        cleanup = cleanup.where(StudentDailyPoints.school_id == school_id)
+    db.session.execute(cleanup)
+
+    totals = defaultdict(lambda: [0, 0])
+    for model in (Violation, ArchivedViolation):
+        day = func.date(model.date_posted)
+        query = select(
+            model.student_id, day, Student.school_id,
+            func.sum(case((model.is_remitted == True, 0), else_=model.points)),  # noqa: E712
+            func.count(model.id)
+        ).join(Student, Student.id == model.student_id).group_by(model.student_id, day, Student.school_id)
+        if school_id:
+            query = query.where(Student.school_id == school_id)
+        for student_id, day_value, row_school_id, points, count in db.session.execute(query):
+            # SQLite mengembalikan DATE() sebagai teks 'YYYY-MM-DD'
+            total = totals[(student_id, date.fromisoformat(str(day_value)), row_school_id)]
+            total[0] += points or 0
+            total[1] += count
+    if totals:
+        db.session.execute(StudentDailyPoints.__table__.insert(), [{
+            'student_id': student_id, 'day': day, 'school_id': row_school_id,
+            'points': points, 'violation_count': count,
+        } for (student_id, day, row_school_id), (points, count) in totals.items()])
+    return len(totals)
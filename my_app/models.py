@@ -3,6 +3,20 @@ from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 
+# --- HAPUS LUNAK ---
+# Pelanggaran, siswa dan kelas yang dihapus hanya diberi deleted_at. Semua SELECT ORM
+# otomatis menyembunyikannya (listener di my_app/trash.py); query yang memang butuh
+# data terhapus memakai .execution_options(include_deleted=True).
+INCLUDE_DELETED = 'include_deleted'
+
+class SoftDelete:
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+def _deleted_index(table):
+    """Indeks parsial baris terhapus (halaman Data Terhapus, purge). MySQL: indeks biasa."""
+    return db.Index(f'ix_{table}_deleted', 'deleted_at', sqlite_where=db.text('deleted_at IS NOT NULL'),
+                    postgresql_where=db.text('deleted_at IS NOT NULL'))
+
 class School(db.Model):
     __tablename__ = 'schools'
     
@@ -10,6 +24,10 @@ class School(db.Model):
     name = db.Column(db.String(150), nullable=False, unique=True)
     address = db.Column(db.String(255), nullable=True)
     logo = db.Column(db.String(255), nullable=True)
+    # Ikon PNG kecil berbasis hash, dibuat dari logo saat upload (storage.store_icon)
+    icon = db.Column(db.String(255), nullable=True)
+    # Naik setiap ada perubahan data sekolah; bagian dari kunci cache fragmen (my_app/cache.py)
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     users = db.relationship('User', backref='school', lazy=True)
@@ -28,9 +46,15 @@ class User(db.Model, UserMixin):
     
     role = db.Column(db.String(20), default='school_admin', nullable=False)
     school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=True)
+    # Naik setiap password diganti; bagian dari ID sesi (lihat my_app/identity.py)
+    credential_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     def set_password(self, password):
         self.password = generate_password_hash(password, method='pbkdf2:sha256')
+        self.credential_version = (self.credential_version or 0) + 1
+
+    def get_id(self):
+        return f"{self.id}:{self.credential_version or 0}"
 
     def check_password(self, password):
         return check_password_hash(self.password, password)
@@ -39,34 +63,56 @@ class User(db.Model, UserMixin):
     def is_super_admin(self):
         return self.role == 'super_admin'
 
-class Classroom(db.Model):
+class Classroom(SoftDelete, db.Model):
     __tablename__ = 'classrooms'
+    # Nama kelas unik per sekolah (termasuk kelas terhapus); juga dipakai untuk mencari kelas dari form (school_id, name)
+    __table_args__ = (
+        db.UniqueConstraint('school_id', 'name', name='uq_classrooms_school_name'),
+        _deleted_index('classrooms'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
     students = db.relationship('Student', backref='classroom', lazy=True)
+    # Untuk sinkronisasi delta (lihat my_app/sync.py)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
-class Student(db.Model):
+class Student(SoftDelete, db.Model):
     __tablename__ = 'students'
+    # NIS unik per sekolah (restore mencocokkan siswa lewat NIS); daftar siswa per kelas urut nama.
+    # deleted_at di tengah indeks: WHERE classroom_id = ? AND deleted_at IS NULL ORDER BY name tetap satu range scan
+    __table_args__ = (
+        db.UniqueConstraint('school_id', 'nis', name='uq_students_school_nis'),
+        db.Index('ix_students_classroom_name', 'classroom_id', 'deleted_at', 'name'),
+        _deleted_index('students'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     nis = db.Column(db.String(20), nullable=False)
     
-    classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'), index=True)
+    classroom_id = db.Column(db.Integer, db.ForeignKey('classrooms.id'))
     rombel = db.Column(db.String(50)) 
+    # Saldo poin berjalan: 100 dikurangi poin pelanggaran aktif yang belum diremisi
+    # (dijaga my_app/leaderboard.py saat menulis, bukan dihitung ulang)
     poin = db.Column(db.Integer, default=100)
     
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
     violations = db.relationship('Violation', backref='student', lazy=True)
 
+    # Diisi saat siswa diluluskan lewat kenaikan kelas massal (classroom_id dikosongkan)
+    graduated_at = db.Column(db.DateTime, nullable=True)
+
+    # Dipakai backup inkremental untuk mendeteksi perubahan sejak backup terakhir
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
 class ViolationRule(db.Model):
     __tablename__ = 'violation_rules'
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(500), nullable=False)
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True)
 
     # relationship: rule -> ayats
     ayats = db.relationship('Ayat', backref='rule', lazy=True, cascade='all, delete-orphan')
@@ -76,20 +122,30 @@ class ViolationCategory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(50), nullable=False)
     points = db.Column(db.Integer, nullable=False)
-    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True)
 
-class Violation(db.Model):
+class Violation(SoftDelete, db.Model):
     __tablename__ = 'violations'
+    # Riwayat siswa dan laporan: WHERE student_id = ? AND deleted_at IS NULL ORDER BY date_posted
+    __table_args__ = (
+        db.Index('ix_violations_student_date', 'student_id', 'deleted_at', 'date_posted'),
+        _deleted_index('violations'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(2000), nullable=False)
     points = db.Column(db.Integer, nullable=False)
     date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     
-    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False, index=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False)
 
     pasal = db.Column(db.String(255), nullable=True)
-    kategori_pelanggaran = db.Column(db.String(50), nullable=True, index=True)
+    # Statistik dikelompokkan lewat category_id; kategori_pelanggaran adalah snapshot
+    # nama kategori saat dicatat (tetap tampil walau kategori diganti nama/dihapus)
+    category_id = db.Column(db.Integer, db.ForeignKey('violation_categories.id', ondelete='SET NULL',
+                                                      name='fk_violations_category_id'),
+                            nullable=True, index=True)
+    kategori_pelanggaran = db.Column(db.String(50), nullable=True)
     di_input_oleh = db.Column(db.String(100), nullable=True)
     
     photos = db.relationship('ViolationPhoto', backref='violation', lazy=True, cascade="all, delete-orphan")
@@ -99,6 +155,11 @@ class Violation(db.Model):
     remission_reason = db.Column(db.String(255), nullable=True) # Alasan Remisi
     remission_date = db.Column(db.DateTime, nullable=True) # Kapan diremisi
 
+    # Dipakai backup inkremental untuk mendeteksi perubahan sejak backup terakhir
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    is_archived = False
+
     @property
     def tanggal_kejadian(self):
         if self.date_posted:
@@ -132,9 +193,149 @@ class Ayat(db.Model):
 # Link Violation -> Ayat via many-to-many
 Violation.ayats = db.relationship('Ayat', secondary=violation_ayats, backref=db.backref('violations', lazy='dynamic'))
 
+PHOTO_KIND_EVIDENCE = 'bukti'
+PHOTO_KIND_REMISSION = 'remisi'
+
 class ViolationPhoto(db.Model):
     __tablename__ = 'violation_photos'
     
     id = db.Column(db.Integer, primary_key=True)
+    # Path relatif di folder upload. Foto baru: 'ab/cd/<sha256>.jpg' (satu file bisa dirujuk banyak baris)
+    filename = db.Column(db.String(255), nullable=False, index=True)
+    violation_id = db.Column(db.Integer, db.ForeignKey('violations.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False, default=PHOTO_KIND_EVIDENCE)
+
+    @property
+    def is_remission(self):
+        # File lama membedakan foto remisi lewat prefix nama 'remisi_'
+        return self.kind == PHOTO_KIND_REMISSION or self.filename.startswith('remisi_')
+
+class BackupSnapshot(db.Model):
+    """Watermark backup per sekolah. Backup inkremental berisi perubahan sejak 'until' snapshot sebelumnya."""
+    __tablename__ = 'backup_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False) # 'full' atau 'incremental'
+    since = db.Column(db.DateTime, nullable=True)
+    until = db.Column(db.DateTime, nullable=False)
     filename = db.Column(db.String(255), nullable=False)
-    violation_id = db.Column(db.Integer, db.ForeignKey('violations.id'), nullable=False)
\ No newline at end of file
+    parent_id = db.Column(db.Integer, db.ForeignKey('backup_snapshots.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Tombstone(db.Model):
+    """Jejak data yang dihapus, agar klien offline bisa ikut menghapus saat sinkronisasi."""
+    __tablename__ = 'tombstones'
+    __table_args__ = (db.Index('ix_tombstones_school_deleted', 'school_id', 'deleted_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    entity = db.Column(db.String(20), nullable=False) # 'class', 'student' atau 'violation'
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+# --- PERINGKAT & PERINGATAN POIN ---
+# Diisi my_app/leaderboard.py setiap kali pelanggaran dicatat/diremisi/dihapus.
+
+class StudentDailyPoints(db.Model):
+    """Rollup harian per siswa: jumlah kasus dan poin bersih (remisi dikurangkan)."""
+    __tablename__ = 'student_daily_points'
+    # Peringkat: WHERE school_id = ? AND day BETWEEN ? AND ? GROUP BY student_id
+    __table_args__ = (db.Index('ix_student_daily_points_school_day', 'school_id', 'day'),)
+
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    points = db.Column(db.Integer, nullable=False, default=0)
+    violation_count = db.Column(db.Integer, nullable=False, default=0)
+
+class PointAlert(db.Model):
+    """Saldo poin siswa turun melewati ambang sanksi. resolved_at diisi saat saldo naik kembali (remisi)."""
+    __tablename__ = 'point_alerts'
+    __table_args__ = (db.Index('ix_point_alerts_school_resolved', 'school_id', 'resolved_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id', ondelete='CASCADE'), nullable=False, index=True)
+    threshold = db.Column(db.Integer, nullable=False)
+    balance = db.Column(db.Integer, nullable=False) # Saldo saat ambang terlewati
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    resolved_at = db.Column(db.DateTime, nullable=True)
+
+    student = db.relationship('Student')
+
+class AuditEvent(db.Model):
+    """Jejak audit: siapa mengubah apa. Ditulis berkelompok oleh my_app/audit.py.
+
+    user_id/entity_id sengaja tanpa foreign key: jejak tetap ada walau user atau data
+    yang diubah sudah dihapus (username disimpan sebagai snapshot).
+    """
+    __tablename__ = 'audit_events'
+    __table_args__ = (
+        db.Index('ix_audit_events_school_created', 'school_id', 'created_at'),
+        db.Index('ix_audit_events_entity', 'entity', 'entity_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    school_id = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    username = db.Column(db.String(150), nullable=True)
+    action = db.Column(db.String(40), nullable=False) # Contoh: 'violation.delete'
+    entity = db.Column(db.String(20), nullable=False) # 'violation', 'student', 'class', 'settings'
+    entity_id = db.Column(db.Integer, nullable=True)
+    details = db.Column(db.Text, nullable=True) # JSON
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+# --- ARSIP TAHUN AJARAN ---
+# Pelanggaran dari tahun ajaran yang sudah lewat dipindahkan ke tabel arsip
+# (lihat my_app/archive.py) agar tabel 'violations' tetap kecil.
+
+archived_violation_ayats = db.Table(
+    'archived_violation_ayats',
+    db.Column('violation_id', db.Integer, db.ForeignKey('archived_violations.id'), primary_key=True),
+    db.Column('ayat_id', db.Integer, db.ForeignKey('ayats.id'), primary_key=True)
+)
+
+class ArchivedViolation(db.Model):
+    __tablename__ = 'archived_violations'
+
+    id = db.Column(db.Integer, primary_key=True)
+    original_id = db.Column(db.Integer, nullable=False, index=True) # ID asal di tabel 'violations'
+    description = db.Column(db.String(2000), nullable=False)
+    points = db.Column(db.Integer, nullable=False)
+    date_posted = db.Column(db.DateTime, nullable=False)
+
+    student_id = db.Column(db.Integer, db.ForeignKey('students.id'), nullable=False, index=True)
+
+    pasal = db.Column(db.String(255), nullable=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('violation_categories.id', ondelete='SET NULL',
+                                                      name='fk_archived_violations_category_id'),
+                            nullable=True, index=True)
+    kategori_pelanggaran = db.Column(db.String(50), nullable=True)
+    di_input_oleh = db.Column(db.String(100), nullable=True)
+
+    is_remitted = db.Column(db.Boolean, default=False)
+    remission_reason = db.Column(db.String(255), nullable=True)
+    remission_date = db.Column(db.DateTime, nullable=True)
+
+    academic_year = db.Column(db.String(9), nullable=False, index=True) # Contoh: '2024/2025'
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    student = db.relationship('Student', backref=db.backref('archived_violations', lazy=True))
+    photos = db.relationship('ArchivedViolationPhoto', backref='violation', lazy=True, cascade="all, delete-orphan")
+    ayats = db.relationship('Ayat', secondary=archived_violation_ayats)
+
+    is_archived = True
+
+    tanggal_kejadian = Violation.tanggal_kejadian
+    tanggal_dicatat = Violation.tanggal_dicatat
+
+class ArchivedViolationPhoto(db.Model):
+    __tablename__ = 'archived_violation_photos'
+
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(255), nullable=False, index=True)
+    violation_id = db.Column(db.Integer, db.ForeignKey('archived_violations.id'), nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False, default=PHOTO_KIND_EVIDENCE)
+
+    is_remission = ViolationPhoto.is_remission
@@ -0,0 +1,43 @@
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+
+# Routing baca ke replika database.
+#
+# Jika SQLALCHEMY_BINDS berisi bind 'replica' (env DATABASE_REPLICA_URL), query baca
+# di dalam view yang diberi @replica_reads dijalankan di replika. Semua tulis (flush,
+# UPDATE/INSERT/DELETE langsung) dan semua view lain tetap ke primary.
+# Tanpa bind 'replica' semuanya ke primary seperti biasa.
+#
+# Replika bisa tertinggal beberapa detik dari primary, jadi hanya halaman yang
+# boleh menampilkan data sedikit lama (dashboard, statistik, cetak) yang memakainya.
+
+REPLICA_BIND = 'replica'
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _reading_from_replica(clause):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _reading_from_replica(clause):
+    if not has_app_context() or not g.get('use_replica'):
+        return False
+    return not getattr(clause, 'is_dml', False)
+
+
+def replica_reads(f):
+    """Query baca di view ini boleh dilayani replika."""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.use_replica = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.pop('use_replica', None)
+    return decorated_function
@@ -0,0 +1,65 @@
+from flask import has_request_context, request
+from sqlalchemy import event
+
+# Profil SQLite untuk deployment satu sekolah di satu server (tanpa MySQL).
+#
+# - journal_mode=WAL: pembaca tidak menunggu penulis dan sebaliknya
+# - synchronous=NORMAL: aman dengan WAL, jauh lebih sedikit fsync
+# - cache_size/mmap_size/temp_store: halaman database tetap di memori
+# - busy_timeout: tunggu kunci tulis alih-alih langsung "database is locked"
+#
+# Serialisasi tulis: request yang mengubah data (POST dll.) membuka transaksi dengan
+# BEGIN IMMEDIATE sehingga kunci tulis diambil di awal dan antre lewat busy_timeout.
+# Dengan BEGIN biasa, dua request yang sudah membaca lalu sama-sama ingin menulis
+# langsung gagal SQLITE_BUSY tanpa menunggu. Request GET dan POST yang tidak menulis
+# (login: hash password lambat) tetap BEGIN biasa agar tidak menahan kunci tulis.
+
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+# Endpoint POST yang tidak mengubah data
+READ_ONLY_POSTS = {'auth.login', 'api.login'}
+
+
+def pragmas(config):
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -config.get('SQLITE_CACHE_SIZE_KB', 64 * 1024),
+        'mmap_size': config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'temp_store': 'MEMORY',
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 5000),
+    }
+
+
+def _needs_write_lock():
+    # Di luar request (perintah CLI, skrip) hampir selalu untuk menulis
+    if not has_request_context():
+        return True
+    return request.method not in READ_METHODS and request.endpoint not in READ_ONLY_POSTS
+
+
+def configure_engine(engine, config):
+    """Pasang pragma dan strategi BEGIN pada engine SQLite berbasis file."""
+    settings = pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        # Matikan BEGIN otomatis pysqlite; BEGIN dikirim sendiri di _on_begin
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in settings.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def _on_begin(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE' if _needs_write_lock() else 'BEGIN')
+
+
+def init_app(app, db):
+    if not app.config.get('SQLITE_PERFORMANCE_MODE'):
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            # Database di memori (test) hanya satu koneksi bersama: tidak ada WAL maupun antrean tulis
+            if engine.dialect.name == 'sqlite' and engine.url.database not in (None, '', ':memory:'):
+                configure_engine(engine, app.config)
@@ -0,0 +1,28 @@
+/**
+ * Dashboard live: berlangganan event pelanggaran sekolah lewat Server-Sent Events.
+ * Setiap event diteruskan sebagai CustomEvent 'violation-event' di window,
+ * sehingga tiap halaman cukup memasang listener untuk memperbarui angkanya.
+ */
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/events');
+    ['violation_added', 'violation_remitted', 'violations_remitted', 'violation_deleted', 'point_alert'].forEach(type => {
+        source.addEventListener(type, e => {
+            window.dispatchEvent(new CustomEvent('violation-event', {
+                detail: { type: type, data: JSON.parse(e.data) }
+            }));
+        });
+    });
+})();
+
+/**
+ * Tambah nilai angka pada elemen [data-live-counter="<nama>"].
+ */
+function bumpLiveCounter(name, delta) {
+    document.querySelectorAll(`[data-live-counter="${name}"]`).forEach(el => {
+        const value = parseInt(el.textContent.replace(/\D/g, ''), 10) || 0;
+        el.textContent = Math.max(0, value + delta);
+    });
+}
@@ -87,3 +87,77 @@ function getNotificationIcon(type) {
     };
     return icons[type] || icons.info;
 }
+
+/**
+ * Kontrol grafik tren di halaman statistik. Ganti rentang, granularitas atau
+ * pengelompokan mengambil seri dari endpoint JSON tanpa memuat ulang halaman.
+ * @param {Chart} chart Grafik tren yang sudah dibuat dengan seri awal dari server.
+ * @returns {{isDailyTotal: function(): boolean}} Status untuk update live.
+ */
+function initTrendControls(chart) {
+    const controls = document.getElementById('trend-controls');
+    const state = { range: controls ? controls.dataset.range : '7d', granularity: 'day', breakdown: 'total' };
+    const handle = { isDailyTotal: () => state.granularity === 'day' && state.breakdown === 'total' };
+    if (!controls) return handle;
+
+    const palette = ['#3B82F6', '#EF4444', '#10B981', '#F59E0B', '#8B5CF6', '#EC4899', '#14B8A6', '#6B7280'];
+    const captions = { day: 'hari', week: 'minggu', month: 'bulan' };
+    const granularitySelect = document.getElementById('trend-granularity');
+    const breakdownSelect = document.getElementById('trend-breakdown');
+    const baseDataset = Object.assign({}, chart.data.datasets[0]);
+    let request = 0;
+
+    function datasets(series) {
+        if (state.breakdown === 'total') {
+            return [Object.assign({}, baseDataset, { data: series.total })];
+        }
+        return series[state.breakdown].map((item, i) => ({
+            label: item.label,
+            data: item.data,
+            borderColor: palette[i % palette.length],
+            backgroundColor: palette[i % palette.length],
+            borderWidth: 2,
+            pointRadius: 2,
+            fill: false,
+            tension: 0.3
+        }));
+    }
+
+    function load() {
+        const current = ++request;
+        const params = new URLSearchParams({ range: state.range, granularity: state.granularity });
+        fetch(controls.dataset.url + '?' + params, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.ok ? response.json() : Promise.reject(response.status))
+            .then(series => {
+                // Abaikan respons lama jika filter sudah diganti lagi
+                if (current !== request) return;
+                chart.data.labels = series.labels;
+                chart.data.datasets = datasets(series);
+                chart.options.plugins.legend.display = state.breakdown !== 'total';
+                chart.update();
+                const caption = document.getElementById('trend-caption');
+                if (caption) caption.textContent = 'Jumlah kasus per ' + captions[state.granularity] + ' dalam periode waktu terpilih.';
+            })
+            .catch(() => showNotification('Gagal memuat data tren.', 'danger'));
+    }
+
+    controls.querySelectorAll('.trend-range').forEach(link => {
+        link.addEventListener('click', e => {
+            e.preventDefault();
+            state.range = link.dataset.range;
+            controls.querySelectorAll('.trend-range').forEach(other => {
+                const active = other === link;
+                other.classList.toggle('bg-white', active);
+                other.classList.toggle('text-blue-600', active);
+                other.classList.toggle('shadow-sm', active);
+                other.classList.toggle('text-gray-500', !active);
+                other.classList.toggle('hover:text-gray-700', !active);
+            });
+            history.replaceState(null, '', link.href);
+            load();
+        });
+    });
+    granularitySelect.addEventListener('change', () => { state.granularity = granularitySelect.value; load(); });
+    breakdownSelect.addEventListener('change', () => { state.breakdown = breakdownSelect.value; load(); });
+    return handle;
+}
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+from sqlalchemy import func
+
+from my_app import violations
+from my_app.extensions import db
+from my_app.models import Student, Violation, Classroom
+
+# Seri tren statistik (harian/mingguan/bulanan) untuk halaman statistik.
+#
+# Satu query agregat GROUP BY (tanggal, kategori, kelas) untuk seluruh rentang;
+# setiap baris hasil langsung ditambahkan ke list yang sudah dialokasikan penuh
+# lewat indeks bucket (selisih hari/minggu/bulan dari awal rentang). Seri total,
+# per kategori dan per kelas terisi sekaligus, termasuk bucket kosong (0).
+
+GRANULARITY_DAY = 'day'
+GRANULARITY_WEEK = 'week'
+GRANULARITY_MONTH = 'month'
+GRANULARITIES = (GRANULARITY_DAY, GRANULARITY_WEEK, GRANULARITY_MONTH)
+
+# Batas rentang bebas (?start=&end=) agar seri tetap kecil
+MAX_RANGE_DAYS = 3 * 366
+
+LABEL_FORMATS = {GRANULARITY_DAY: '%d %b', GRANULARITY_WEEK: '%d %b', GRANULARITY_MONTH: '%b %Y'}
+NO_CATEGORY = 'Tanpa Kategori'
+NO_CLASS = 'Tanpa Kelas'
+
+
+def bucket_start(day, granularity):
+    """Tanggal awal bucket yang memuat `day` (minggu dimulai Senin)."""
+    if granularity == GRANULARITY_WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == GRANULARITY_MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def bucket_index(day, first, granularity):
+    """Posisi bucket `day` relatif terhadap bucket pertama `first`."""
+    if granularity == GRANULARITY_WEEK:
+        return (bucket_start(day, granularity) - first).days // 7
+    if granularity == GRANULARITY_MONTH:
+        return (day.year - first.year) * 12 + day.month - first.month
+    return (day - first).days
+
+
+def bucket_starts(start, end, granularity):
+    first = bucket_start(start, granularity)
+    size = bucket_index(end, first, granularity) + 1
+    if granularity == GRANULARITY_MONTH:
+        return [date(first.year + (first.month - 1 + i) // 12, (first.month - 1 + i) % 12 + 1, 1)
+                for i in range(size)]
+    step = 7 if granularity == GRANULARITY_WEEK else 1
+    return [first + timedelta(days=i * step) for i in range(size)]
+
+
+def trend_series(school_id, start, end, granularity=GRANULARITY_DAY):
+    """Seri padat jumlah pelanggaran pada [start, end]: total, per kategori dan per kelas."""
+    buckets = bucket_starts(start, end, granularity)
+    first, size = buckets[0], len(buckets)
+
+    day = func.date(Violation.date_posted)
+    rows = db.session.query(day, Violation.category_id, Student.classroom_id, func.count(Violation.id)).join(
+        Student).filter(
+        Student.school_id == school_id,
+        Violation.date_posted >= start,
+        Violation.date_posted < end + timedelta(days=1)
+    ).group_by(day, Violation.category_id, Student.classroom_id).all()
+    category_names = violations.category_map(school_id)
+    class_names = dict(db.session.query(Classroom.id, Classroom.name).filter_by(school_id=school_id))
+    total = [0] * size
+    by_category = {}
+    by_class = {}
+    for day_value, category_id, classroom_id, count in rows:
+        # SQLite mengembalikan DATE() sebagai teks 'YYYY-MM-DD'
+        i = bucket_index(date.fromisoformat(str(day_value)), first, granularity)
+        total[i] += count
+        # Kategori yang sudah dihapus digabung dengan pelanggaran tanpa kategori
+        category_id = category_id if category_id in category_names else None
+        by_category.setdefault(category_id, [0] * size)[i] += count
+        by_class.setdefault(classroom_id, [0] * size)[i] += count
+
+    label_format = LABEL_FORMATS[granularity]
+    return {
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'buckets': [b.isoformat() for b in buckets],
+        'labels': [b.strftime(label_format) for b in buckets],
+        'total': total,
+        'by_category': _named_series(by_category, category_names, NO_CATEGORY),
+        'by_class': _named_series(by_class, class_names, NO_CLASS),
+    }
+
+
+def _named_series(series, names, fallback):
+    """[{id, label, data}] urut nama; seri tanpa id (None) paling akhir."""
+    return sorted(({'id': key, 'label': names.get(key, fallback), 'data': data} for key, data in series.items()),
+                  key=lambda item: (item['id'] is None, item['label']))
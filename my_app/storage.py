@@ -0,0 +1,181 @@
+import io
+import os
+import hashlib
+
+from flask import current_app
+from werkzeug.security import safe_join
+
+from my_app.extensions import db
+from my_app.models import ViolationPhoto, ArchivedViolationPhoto
+from my_app.utils import compress_image, make_icon
+
+# Foto bukti disimpan berdasarkan hash isinya: uploads/ab/cd/<sha256>.jpg
+# Foto yang sama (misal satu foto untuk beberapa pelanggaran) hanya disimpan sekali.
+HASH_NAME_LENGTH = 64
+
+
+def upload_folder():
+    folder = current_app.config['UPLOAD_FOLDER']
+    if not os.path.exists(folder): os.makedirs(folder)
+    return folder
+
+
+def content_path(digest, ext='jpg'):
+    """Path relatif (terhadap folder upload) untuk hash tertentu."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def is_content_addressed(filename):
+    """True jika nama file mengikuti layout ab/cd/<sha256>.jpg (isinya tidak pernah berubah)."""
+    parts = filename.split('/')
+    if len(parts) != 3:
+        return False
+    stem = os.path.splitext(parts[2])[0]
+    return len(stem) == HASH_NAME_LENGTH and parts[0] == stem[:2] and parts[1] == stem[2:4]
+
+
+def absolute_path(filename):
+    """Path absolut file upload, atau None jika nama file mencoba keluar dari folder upload."""
+    return safe_join(upload_folder(), filename)
+
+
+def save_bytes(data, ext='jpg'):
+    """Simpan bytes ke storage berbasis hash. Tidak menulis ulang jika isinya sudah ada.
+
+    File yang sudah ada disentuh (mtime baru) agar tidak dianggap orphan oleh
+    collect_garbage sebelum baris yang merujuknya di-commit.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    filename = content_path(digest, ext)
+    path = absolute_path(filename)
+    if os.path.exists(path):
+        os.utime(path)
+    else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    return filename
+
+
+def store_image(file_storage):
+    """Kompres gambar upload lalu simpan berdasarkan hash. Mengembalikan nama file relatif atau None."""
+    buffer = io.BytesIO()
+    if not compress_image(file_storage, buffer):
+        return None
+    return save_bytes(buffer.getvalue())
+
+
+def store_icon(source):
+    """Buat ikon PNG kecil dari logo (path atau file object) lalu simpan berdasarkan hash.
+
+    Nama file berbasis hash sekaligus menjadi versi URL, sehingga ikon bisa di-cache browser selamanya.
+    """
+    buffer = io.BytesIO()
+    if not make_icon(source, buffer):
+        return None
+    return save_bytes(buffer.getvalue(), 'png')
+
+
+# --- GARBAGE COLLECTOR & LAPORAN PENYIMPANAN ---
+# File tidak pernah dihapus langsung saat barisnya dihapus: upload lain dengan isi
+# yang sama bisa sedang berjalan dan belum di-commit. File yang tidak dirujuk lagi
+# dibersihkan `flask gc-uploads`, yang melewati file lebih muda dari --min-age.
+
+def iter_upload_files(root, _prefix=''):
+    """Telusuri folder upload secara bertahap dengan os.scandir. Menghasilkan (nama_relatif, DirEntry)."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            name = f"{_prefix}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_upload_files(entry.path, f"{name}/")
+            elif entry.is_file(follow_symlinks=False):
+                yield name, entry
+
+
+def referenced_files():
+    """Semua nama file yang masih dirujuk database (foto aktif, foto arsip, logo dan ikon sekolah)."""
+    from my_app.models import School
+
+    referenced = set()
+    for column in (ViolationPhoto.filename, ArchivedViolationPhoto.filename, School.logo, School.icon):
+        for (filename,) in db.session.query(column).filter(column.isnot(None)).distinct().yield_per(1000):
+            referenced.add(filename)
+    return referenced
+
+
+def collect_garbage(root, quarantine_dir=None, delete=False, min_age=3600, now=None):
+    """Cari file di folder upload yang tidak dirujuk database.
+
+    File yang lebih muda dari `min_age` detik dilewati agar upload yang belum
+    di-commit tidak ikut terhapus. Tanpa `delete`/`quarantine_dir` hanya
+    melaporkan. Mengembalikan (daftar_orphan, total_byte).
+    """
+    import shutil
+    import time
+
+    now = now or time.time()
+    referenced = referenced_files()
+    quarantine_root = os.path.abspath(quarantine_dir) if quarantine_dir else None
+    orphans = []
+    total = 0
+    for name, entry in iter_upload_files(root):
+        if name in referenced:
+            continue
+        if quarantine_root and os.path.abspath(entry.path).startswith(quarantine_root + os.sep):
+            continue
+        stat = entry.stat()
+        if now - stat.st_mtime < min_age:
+            continue
+        orphans.append(name)
+        total += stat.st_size
+        if quarantine_root:
+            target = os.path.join(quarantine_root, name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(entry.path, target)
+        elif delete:
+            os.remove(entry.path)
+    return orphans, total
+
+
+def storage_usage(root):
+    """Pemakaian penyimpanan per sekolah: [{'school': School, 'files': n, 'bytes': total}, ...].
+
+    File yang dipakai bersama beberapa pelanggaran dihitung sekali per sekolah.
+    """
+    from my_app.models import School, Student, Violation, ArchivedViolation
+
+    files_by_school = {}
+    queries = (
+        # Foto pelanggaran di Data Terhapus masih ada di disk sampai purge
+        db.session.query(Student.school_id, ViolationPhoto.filename).join(
+            Violation, Violation.id == ViolationPhoto.violation_id).join(Student).execution_options(
+            include_deleted=True),
+        db.session.query(Student.school_id, ArchivedViolationPhoto.filename).join(
+            ArchivedViolation, ArchivedViolation.id == ArchivedViolationPhoto.violation_id).join(Student),
+        db.session.query(School.id, School.logo).filter(School.logo.isnot(None)),
+        db.session.query(School.id, School.icon).filter(School.icon.isnot(None)),
+    )
+    for query in queries:
+        for school_id, filename in query.distinct().yield_per(1000):
+            files_by_school.setdefault(school_id, set()).add(filename)
+
+    report = []
+    for school in School.query.order_by(School.name):
+        total = 0
+        count = 0
+        for filename in files_by_school.get(school.id, ()):
+            path = safe_join(root, filename)
+            if path and os.path.isfile(path):
+                total += os.path.getsize(path)
+                count += 1
+        report.append({'school': school, 'files': count, 'bytes': total})
+    return report
+
+
+def format_size(num_bytes):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1024 or unit == 'GB':
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{num_bytes} B"
+        num_bytes /= 1024
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import selectinload
+
+from my_app.extensions import db
+from my_app.models import Classroom, Student, Violation, Tombstone
+
+# Sinkronisasi delta untuk klien offline (tablet di lorong sekolah).
+# Token perubahan = waktu server saat sinkronisasi, dikurangi margin agar
+# transaksi yang sedang berjalan saat itu tetap terambil di sinkronisasi
+# berikutnya. Data yang terkirim dua kali aman karena klien melakukan upsert per id.
+
+ENTITY_CLASS = 'class'
+ENTITY_STUDENT = 'student'
+ENTITY_VIOLATION = 'violation'
+ENTITIES = (ENTITY_CLASS, ENTITY_STUDENT, ENTITY_VIOLATION)
+
+TOKEN_MARGIN = timedelta(seconds=5)
+
+
+def record_tombstones(school_id, entity, ids):
+    """Catat penghapusan beberapa entitas sekaligus. Tidak melakukan commit."""
+    if not ids:
+        return
+    now = datetime.utcnow()
+    db.session.execute(insert(Tombstone), [
+        {'school_id': school_id, 'entity': entity, 'entity_id': entity_id, 'deleted_at': now}
+        for entity_id in ids
+    ])
+
+
+def clear_tombstones(school_id, entity, ids):
+    """Batalkan tombstone data yang dipulihkan (urungkan hapus). Tidak melakukan commit.
+
+    Baris yang dipulihkan punya updated_at baru, sehingga klien yang sudah
+    menerima tombstone mendapatkannya kembali di sinkronisasi berikutnya.
+    """
+    if not ids:
+        return
+    db.session.execute(delete(Tombstone).where(
+        Tombstone.school_id == school_id,
+        Tombstone.entity == entity,
+        Tombstone.entity_id.in_(list(ids))
+    ))
+
+
+def retention_cutoff(now=None):
+    days = current_app.config.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90)
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+def changes_since(school_id, since=None):
+    """Kumpulkan perubahan sekolah sejak `since` (None = snapshot penuh).
+
+    Mengembalikan dict berisi 'classes', 'students', 'violations' (objek model),
+    'deleted' (entity -> daftar id), 'reset' (True jika snapshot penuh)
+    dan 'until' (nilai token berikutnya).
+    """
+    now = datetime.utcnow()
+    until = now - TOKEN_MARGIN
+    reset = since is None or since < retention_cutoff(now)
+
+    classes = Classroom.query.filter(Classroom.school_id == school_id)
+    students = Student.query.filter(Student.school_id == school_id)
+    violations = Violation.query.join(Student).filter(Student.school_id == school_id).options(
+        selectinload(Violation.ayats), selectinload(Violation.photos))
+    deleted = {entity: [] for entity in ENTITIES}
+    if reset:
+        students = students.filter(Student.graduated_at.is_(None))
+    else:
+        classes = classes.filter(Classroom.updated_at >= since)
+        students = students.filter(Student.updated_at >= since)
+        violations = violations.filter(Violation.updated_at >= since)
+        rows = db.session.execute(select(Tombstone.entity, Tombstone.entity_id).where(
+            Tombstone.school_id == school_id,
+            Tombstone.deleted_at >= since
+        ))
+        for entity, entity_id in rows:
+            deleted.setdefault(entity, []).append(entity_id)
+
+    return {
+        'classes': classes.order_by(Classroom.id).all(),
+        'students': students.order_by(Student.id).all(),
+        'violations': violations.order_by(Violation.id).all(),
+        'deleted': deleted,
+        'reset': reset,
+        'until': until,
+    }
+
+
+def prune_tombstones(now=None):
+    """Hapus tombstone yang melewati masa simpan. Mengembalikan jumlah baris terhapus."""
+    result = db.session.execute(delete(Tombstone).where(Tombstone.deleted_at < retention_cutoff(now)))
+    return result.rowcount
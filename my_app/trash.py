@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, exists, select
+from sqlalchemy.orm import Session, contains_eager, joinedload, with_loader_criteria
+
+from my_app import cache, sync
+from my_app.extensions import db
+from my_app.models import (Classroom, Student, Violation, ViolationPhoto, ArchivedViolation, StudentDailyPoints,
+                           PointAlert, SoftDelete, violation_ayats, INCLUDE_DELETED)
+
+# Hapus lunak (Data Terhapus) untuk pelanggaran, siswa dan kelas.
+#
+# Menghapus hanya mengisi deleted_at dan mencatat tombstone sinkronisasi.
+# Listener do_orm_execute di bawah menambahkan "deleted_at IS NULL" ke setiap
+# SELECT ORM (termasuk join, subquery dan relasi lazy dari objek hasilnya),
+# sehingga beranda, statistik, riwayat siswa, peringkat, sinkronisasi dan
+# backup tidak perlu filter sendiri. Indeks di models.py menaruh deleted_at
+# di dalam indeks komposit agar filter ini tidak menambah lookup ke tabel.
+#
+# - Query yang butuh data terhapus: .execution_options(include_deleted=True)
+# - UPDATE/DELETE langsung tidak difilter: tambahkan kondisi deleted_at sendiri
+# - Saldo poin/rollup peringkat diatur pemanggil (leaderboard.record_removed/record_restored)
+#
+# `flask purge-deleted` menghapus permanen data yang lebih lama dari
+# SOFT_DELETE_RETENTION_DAYS, per batch dengan satu commit per batch.
+
+ENTITY_VIOLATION = sync.ENTITY_VIOLATION
+ENTITY_STUDENT = sync.ENTITY_STUDENT
+ENTITY_CLASS = sync.ENTITY_CLASS
+MODELS = {ENTITY_VIOLATION: Violation, ENTITY_STUDENT: Student, ENTITY_CLASS: Classroom}
+
+# Opsi query yang dipasang listener; juga dipakai benchmarks/explain_indexes.py
+ACTIVE_ONLY = with_loader_criteria(SoftDelete, lambda cls: cls.deleted_at.is_(None), include_aliases=True)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _hide_deleted(state):
+    # Refresh kolom objek yang sudah dimuat tidak difilter (objek yang baru dihapus tetap bisa dibaca);
+    # relasi lazy sudah mewarisi opsi dari query yang memuat objeknya
+    if (state.is_select and not state.is_column_load and not state.is_relationship_load
+            and not state.execution_options.get(INCLUDE_DELETED, False)):
+        state.statement = state.statement.options(ACTIVE_ONLY)
+
+
+def retention_cutoff(now=None, days=None):
+    if days is None:
+        days = current_app.config.get('SOFT_DELETE_RETENTION_DAYS', 30)
+    return (now or datetime.utcnow()) - timedelta(days=days)
+
+
+def delete_rows(school_id, entity, rows):
+    """Pindahkan baris ke Data Terhapus dan catat tombstone sinkronisasi. Tidak melakukan commit."""
+    now = datetime.utcnow()
+    for row in rows:
+        row.deleted_at = now
+    sync.record_tombstones(school_id, entity, [row.id for row in rows])
+    cache.bump_data_version(school_id)
+
+
+def restore_rows(school_id, entity, rows):
+    """Pulihkan baris dari Data Terhapus (urungkan). Tidak melakukan commit."""
+    for row in rows:
+        row.deleted_at = None
+    sync.clear_tombstones(school_id, entity, [row.id for row in rows])
+    cache.bump_data_version(school_id)
+
+
+def unlink_deleted_ayats(ayat_ids):
+    """Lepas tautan ayat ke pelanggaran terhapus sebelum ayat/pasal dihapus. Tidak melakukan commit.
+
+    ORM hanya melepas tautan pelanggaran aktif (Ayat.violations ikut difilter).
+    """
+    db.session.execute(delete(violation_ayats).where(
+        violation_ayats.c.ayat_id.in_(list(ayat_ids)),
+        violation_ayats.c.violation_id.in_(select(Violation.id).where(Violation.deleted_at.isnot(None)))
+    ))
+
+
+def _school_rows(entity, school_id):
+    model = MODELS[entity]
+    query = model.query.execution_options(include_deleted=True).filter(model.deleted_at.isnot(None))
+    if entity == ENTITY_VIOLATION:
+        return query.join(Student, Student.id == Violation.student_id).filter(Student.school_id == school_id)
+    return query.filter(model.school_id == school_id)
+
+
+def find_deleted(school_id, entity, entity_id):
+    """Baris terhapus milik sekolah, atau None."""
+    return _school_rows(entity, school_id).filter(MODELS[entity].id == entity_id).first()
+
+
+def deleted_parent(row):
+    """(entity, baris) siswa dari pelanggaran atau kelas dari siswa yang masih terhapus, atau None.
+
+    Baris harus dipulihkan setelah induknya.
+    """
+    if isinstance(row, Violation):
+        entity, parent_id = ENTITY_STUDENT, row.student_id
+    elif isinstance(row, Student) and row.classroom_id:
+        entity, parent_id = ENTITY_CLASS, row.classroom_id
+    else:
+        return None
+    model = MODELS[entity]
+    parent = model.query.execution_options(include_deleted=True).filter(
+        model.id == parent_id, model.deleted_at.isnot(None)).first()
+    return (entity, parent) if parent else None
+
+
+def deleted_rows(school_id, entity, limit=200):
+    """Isi Data Terhapus satu entitas, terbaru dulu."""
+    model = MODELS[entity]
+    query = _school_rows(entity, school_id)
+    if entity == ENTITY_VIOLATION:
+        query = query.options(contains_eager(Violation.student))
+    elif entity == ENTITY_STUDENT:
+        query = query.options(joinedload(Student.classroom))
+    return query.order_by(model.deleted_at.desc(), model.id.desc()).limit(limit).all()
+
+
+# --- PURGE ---
+
+def _expired_ids(model, cutoff, limit, *criteria):
+    return db.session.execute(select(model.id).where(model.deleted_at < cutoff, *criteria).order_by(
+        model.id).limit(limit).execution_options(include_deleted=True)).scalars().all()
+
+
+def purge(cutoff, batch_size=500):
+    """Hapus permanen data yang masuk Data Terhapus sebelum `cutoff`.
+
+    Pelanggaran dulu (beserta tautan ayat dan baris foto; file yang tidak
+    dirujuk lagi dibersihkan `flask gc-uploads`), lalu siswa dan kelas yang
+    sudah tidak dirujuk baris mana pun. Satu commit per batch. Mengembalikan {entity: jumlah}.
+    """
+    counts = {entity: 0 for entity in MODELS}
+    while True:
+        ids = _expired_ids(Violation, cutoff, batch_size)
+        if not ids:
+            break
+        db.session.execute(delete(violation_ayats).where(violation_ayats.c.violation_id.in_(ids)))
+        db.session.execute(delete(ViolationPhoto).where(ViolationPhoto.violation_id.in_(ids)))
+        db.session.execute(delete(Violation).where(Violation.id.in_(ids)).execution_options(
+            synchronize_session=False))
+        db.session.commit()
+        counts[ENTITY_VIOLATION] += len(ids)
+
+    # Siswa yang masih punya pelanggaran (termasuk yang terhapus belum lama) menunggu purge berikutnya
+    student_free = (~exists().where(Violation.student_id == Student.id),
+                    ~exists().where(ArchivedViolation.student_id == Student.id))
+    while True:
+        ids = _expired_ids(Student, cutoff, batch_size, *student_free)
+        if not ids:
+            break
+        # SQLite tidak menjalankan ON DELETE CASCADE
+        for model in (StudentDailyPoints, PointAlert):
+            db.session.execute(delete(model).where(model.student_id.in_(ids)))
+        db.session.execute(delete(Student).where(Student.id.in_(ids)).execution_options(synchronize_session=False))
+        db.session.commit()
+        counts[ENTITY_STUDENT] += len(ids)
+
+    while True:
+        ids = _expired_ids(Classroom, cutoff, batch_size, ~exists().where(Student.classroom_id == Classroom.id))
+        if not ids:
+            break
+        db.session.execute(delete(Classroom).where(Classroom.id.in_(ids)).execution_options(
+            synchronize_session=False))
+        db.session.commit()
+        counts[ENTITY_CLASS] += len(ids)
+    return counts
@@ -1,5 +1,5 @@
-import os
-from PIL import Image
+# Pillow di-import di dalam fungsi: baru dimuat saat ada upload gambar, bukan saat worker start
+
 
 def compress_image(file_storage, save_path, quality=60, max_size=(1024, 1024)):
     """
@@ -10,6 +10,8 @@ def compress_image(file_storage, save_path, quality=60, max_size=(1024, 1024)):
     :param quality: Kualitas output JPEG (1-100), default 60 (sudah cukup bagus utk web)
     :param max_size: Tuple (width, height) maksimal. Gambar akan di-resize proporsional.
     """
+    from PIL import Image
+
     try:
         # Buka gambar menggunakan Pillow
         image = Image.open(file_storage)
@@ -30,4 +32,28 @@ def compress_image(file_storage, save_path, quality=60, max_size=(1024, 1024)):
         return True
     except Exception as e:
         print(f"Gagal mengkompres gambar: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def make_icon(source, save_path, size=96):
+    """
+    Membuat ikon persegi kecil (PNG transparan) dari logo, untuk favicon dan logo header.
+
+    :param source: Path atau file object gambar logo
+    :param save_path: Path atau file object tujuan
+    :param size: Sisi ikon dalam pixel; logo di-resize proporsional lalu diletakkan di tengah
+    """
+    from PIL import Image
+
+    try:
+        image = Image.open(source)
+        image = image.convert("RGBA")
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+        icon = Image.new("RGBA", (size, size), (0, 0, 0, 0))
+        icon.paste(image, ((size - image.width) // 2, (size - image.height) // 2), image)
+        icon.save(save_path, format='PNG', optimize=True)
+
+        return True
+    except Exception as e:
+        print(f"Gagal membuat ikon: {e}")
+        return False
@@ -0,0 +1,33 @@
+from functools import wraps
+
+from flask import url_for, flash, redirect, abort
+from flask_login import current_user
+
+# Halaman web, satu blueprint per area (auth, files, admin, dashboard, classes, violations, settings, trash).
+# API mobile ada di my_app/api.py.
+
+# --- DECORATOR KHUSUS ---
+
+def super_admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != 'super_admin':
+            abort(403)
+        return f(*args, **kwargs)
+    return decorated_function
+
+def school_admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not current_user.is_authenticated or not current_user.school_id:
+            flash("Anda harus login sebagai Admin Sekolah untuk mengakses halaman ini.", "warning")
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def register_blueprints(app):
+    from my_app.views import admin, auth, classes, dashboard, files, settings, trash, violations
+
+    for module in (auth, files, admin, dashboard, classes, violations, settings, trash):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,46 @@
+from flask import render_template, url_for, flash, redirect, request, Blueprint
+
+from my_app.extensions import db
+from my_app.models import User, School, ViolationRule, ViolationCategory
+from my_app.views import super_admin_required
+
+# Halaman super admin: daftar sekolah dan pendaftaran sekolah baru
+bp = Blueprint('admin', __name__)
+
+@bp.route("/super-admin")
+@super_admin_required
+def super_dashboard():
+    schools = School.query.all()
+    total_users = User.query.count()
+    return render_template('super_admin/dashboard.html', schools=schools, total_users=total_users)
+
+@bp.route("/super-admin/create-school", methods=['GET', 'POST'])
+@super_admin_required
+def create_school():
+    if request.method == 'POST':
+        school_name = request.form.get('school_name')
+        address = request.form.get('address')
+        admin_username = request.form.get('admin_username')
+        admin_password = request.form.get('admin_password')
+        if School.query.filter_by(name=school_name).first():
+            flash('Nama sekolah sudah terdaftar.', 'danger')
+            return redirect(url_for('admin.create_school'))
+        if User.query.filter_by(username=admin_username).first():
+            flash('Username admin sudah digunakan.', 'danger')
+            return redirect(url_for('admin.create_school'))
+        new_school = School(name=school_name, address=address)
+        db.session.add(new_school)
+        db.session.flush()
+        new_user = User(username=admin_username, role='school_admin', school_id=new_school.id, full_name="Administrator")
+        new_user.set_password(admin_password)
+        db.session.add(new_user)
+        default_categories = [('Ringan', 5), ('Sedang', 15), ('Berat', 30)]
+        for c_name, c_point in default_categories:
+            db.session.add(ViolationCategory(name=c_name, points=c_point, school_id=new_school.id))
+        default_rules = [('Pasal 1', 'Ketertiban Umum'), ('Pasal 2', 'Kerapihan Seragam')]
+        for r_code, r_desc in default_rules:
+            db.session.add(ViolationRule(code=r_code, description=r_desc, school_id=new_school.id))
+        db.session.commit()
+        flash(f'Sekolah "{school_name}" berhasil dibuat!', 'success')
+        return redirect(url_for('admin.super_dashboard'))
+    return render_template('super_admin/create_school.html')
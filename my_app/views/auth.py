@@ -0,0 +1,31 @@
+from flask import render_template, url_for, flash, redirect, request, Blueprint
+from flask_login import login_user, current_user, logout_user
+
+from my_app.models import User
+
+bp = Blueprint('auth', __name__)
+
+@bp.route("/login", methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        if current_user.role == 'super_admin':
+            return redirect(url_for('admin.super_dashboard'))
+        return redirect(url_for('dashboard.home'))
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        user = User.query.filter_by(username=username).first()
+        if user and user.check_password(password):          
+            login_user(user)
+            if user.role == 'super_admin':
+                return redirect(url_for('admin.super_dashboard'))
+            else:
+                return redirect(url_for('dashboard.home'))
+        else:
+            flash('Login Gagal. Cek username dan password', 'danger')
+    return render_template('login.html')
+
+@bp.route("/logout")
+def logout():
+    logout_user()
+    return redirect(url_for('auth.login'))
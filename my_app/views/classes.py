@@ -0,0 +1,278 @@
+import secrets
+from datetime import datetime
+
+from flask import render_template, url_for, flash, redirect, request, Blueprint, jsonify
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from my_app import archive, audit, cache, trash
+from my_app.extensions import db
+from my_app.models import Student, Violation, Classroom
+from my_app.replica import replica_reads
+from my_app.views import school_admin_required
+from my_app.views.trash import offer_undo
+
+# Kelas, siswa dan kenaikan kelas
+bp = Blueprint('classes', __name__)
+
+# Nilai pilihan "Lulus" pada form kenaikan kelas massal
+PROMOTION_GRADUATE = 'graduate'
+
+def _class_summaries(school_id):
+    """Query semua kelas sekolah beserta jumlah siswa dan jumlah pelanggaran (satu query)."""
+    student_count = select(func.count(Student.id)).where(
+        Student.classroom_id == Classroom.id).correlate(Classroom).scalar_subquery()
+    violation_count = select(func.count(Violation.id)).join(Student, Student.id == Violation.student_id).where(
+        Student.classroom_id == Classroom.id).correlate(Classroom).scalar_subquery()
+    return db.session.query(
+        Classroom, student_count.label('student_count'), violation_count.label('violation_count')
+    ).filter(Classroom.school_id == school_id).order_by(Classroom.name)
+
+def _class_roster(school_id, class_id):
+    """Query siswa satu kelas urut nama beserta jumlah pelanggaran (satu query); poin = saldo berjalan."""
+    violation_count = select(func.count(Violation.id)).where(
+        Violation.student_id == Student.id).correlate(Student).scalar_subquery()
+    return db.session.query(Student, violation_count.label('violation_count')).filter(
+        Student.classroom_id == class_id,
+        Student.school_id == school_id
+    ).order_by(Student.name)
+
+@bp.route("/classes", methods=['GET', 'POST'])
+@school_admin_required
+def manage_classes():
+    if request.method == 'POST':
+        class_name = request.form.get('class_name')
+        if class_name:
+            # Nama kelas unik termasuk kelas terhapus: kelas terhapus dengan nama yang sama dipulihkan
+            existing_class = Classroom.query.execution_options(include_deleted=True).filter_by(
+                name=class_name, school_id=current_user.school_id).first()
+            if existing_class and existing_class.deleted_at:
+                trash.restore_rows(current_user.school_id, trash.ENTITY_CLASS, [existing_class])
+                db.session.commit()
+                audit.record(audit.CLASS_RESTORE, audit.ENTITY_CLASS, existing_class.id, name=class_name)
+                flash(f'Kelas {class_name} dipulihkan dari Data Terhapus.', 'success')
+            elif not existing_class:
+                new_class = Classroom(name=class_name, school_id=current_user.school_id)
+                db.session.add(new_class)
+                db.session.flush()
+                new_class_id = new_class.id
+                cache.bump_data_version(current_user.school_id)
+                db.session.commit()
+                audit.record(audit.CLASS_CREATE, audit.ENTITY_CLASS, new_class_id, name=class_name)
+                flash(f'Kelas {class_name} berhasil dibuat!', 'success')
+            else:
+                flash(f'Kelas {class_name} sudah ada.', 'warning')
+        return redirect(url_for('classes.manage_classes'))
+    return render_template('manajemenkelas.html', classes=_class_summaries(current_user.school_id).all())
+
+@bp.route("/classes/delete/<int:class_id>", methods=['POST'])
+@school_admin_required
+def delete_class(class_id):
+    classroom = Classroom.query.filter_by(id=class_id, school_id=current_user.school_id).first_or_404()
+    if classroom.students:
+        flash('Tidak bisa menghapus kelas yang masih memiliki murid.', 'danger')
+    else:
+        class_name = classroom.name
+        trash.delete_rows(classroom.school_id, trash.ENTITY_CLASS, [classroom])
+        db.session.commit()
+        audit.record(audit.CLASS_DELETE, audit.ENTITY_CLASS, class_id, name=class_name)
+        offer_undo(trash.ENTITY_CLASS, class_id)
+        flash(f'Kelas {class_name} dipindahkan ke Data Terhapus.', 'success')
+    return redirect(url_for('classes.manage_classes'))
+
+@bp.route("/classes/<int:class_id>", methods=['GET', 'POST'])
+@school_admin_required
+def view_class(class_id):
+    classroom = Classroom.query.filter_by(id=class_id, school_id=current_user.school_id).first_or_404()
+    all_classes = Classroom.query.filter(Classroom.id != class_id, Classroom.school_id == current_user.school_id).order_by(Classroom.name).all()
+    if request.method == 'POST' and 'import_students' in request.form:
+        raw_names = request.form.get('student_names')
+        if raw_names:
+            names_list = raw_names.strip().split('\n')
+            count = 0
+            for name in names_list:
+                clean_name = name.strip()
+                if clean_name:
+                    dummy_nis = secrets.token_hex(4) 
+                    student = Student(name=clean_name, nis=dummy_nis, classroom=classroom, school_id=current_user.school_id)
+                    db.session.add(student)
+                    count += 1
+            class_name = classroom.name
+            cache.bump_data_version(current_user.school_id)
+            db.session.commit()
+            audit.record(audit.STUDENT_IMPORT, audit.ENTITY_CLASS, class_id, class_name=class_name, count=count)
+            flash(f'Berhasil mengimpor {count} murid.', 'success')
+            return redirect(url_for('classes.view_class', class_id=class_id))
+    if request.method == 'POST' and 'mutate_students' in request.form:
+        target_class_id = request.form.get('target_class_id')
+        selected_student_ids = request.form.getlist('selected_students')
+        if target_class_id and selected_student_ids:
+            target_class = Classroom.query.filter_by(id=target_class_id, school_id=current_user.school_id).first()
+            if target_class:
+                # Satu UPDATE ... WHERE id IN (...) untuk semua siswa terpilih
+                Student.query.filter(
+                    Student.id.in_(selected_student_ids),
+                    Student.school_id == current_user.school_id
+                ).update({Student.classroom_id: target_class.id}, synchronize_session=False)
+                moved = {'from_class_id': class_id, 'from_class': classroom.name,
+                         'to_class_id': target_class.id, 'to_class': target_class.name}
+                cache.bump_data_version(current_user.school_id)
+                db.session.commit()
+                for student_id in selected_student_ids:
+                    if student_id.isdigit():
+                        audit.record(audit.STUDENT_MOVE, audit.ENTITY_STUDENT, int(student_id), **moved)
+                flash('Mutasi berhasil.', 'success')
+            else:
+                flash('Kelas tujuan tidak valid.', 'danger')
+        return redirect(url_for('classes.view_class', class_id=class_id))
+    return render_template('detailkelas.html', classroom=classroom, all_classes=all_classes,
+                           roster=_class_roster(current_user.school_id, class_id).all())
+
+def _parse_promotion_mapping(form, classes_by_id):
+    """Baca pilihan kelas tujuan dari form: {id_kelas_asal: id_kelas_tujuan atau None (lulus)}."""
+    mapping = {}
+    for cls_id in classes_by_id:
+        target = form.get(f'target_{cls_id}', '')
+        if target == PROMOTION_GRADUATE:
+            mapping[cls_id] = None
+        elif target.isdigit() and int(target) in classes_by_id and int(target) != cls_id:
+            mapping[cls_id] = int(target)
+    return mapping
+
+def _promotion_plan(mapping):
+    """Ambil snapshot ID siswa per kelas asal dalam satu query.
+
+    Snapshot diambil sebelum ada UPDATE agar rantai X -> XI -> XII tidak ikut
+    memindahkan siswa yang baru saja naik ke kelas berikutnya.
+    """
+    plan = {cls_id: [] for cls_id in mapping}
+    if not mapping:
+        return plan
+    rows = db.session.query(Student.id, Student.classroom_id).filter(
+        Student.school_id == current_user.school_id,
+        Student.classroom_id.in_(list(mapping))
+    ).all()
+    for stud_id, cls_id in rows:
+        plan[cls_id].append(stud_id)
+    return plan
+
+@bp.route("/classes/promote", methods=['GET', 'POST'])
+@school_admin_required
+def promote_classes():
+    classes = Classroom.query.filter_by(school_id=current_user.school_id).order_by(Classroom.name).all()
+    classes_by_id = {c.id: c for c in classes}
+    mapping = _parse_promotion_mapping(request.form, classes_by_id) if request.method == 'POST' else {}
+    plan = _promotion_plan(mapping)
+    if request.method == 'POST' and request.form.get('action') == 'apply':
+        if not mapping:
+            flash('Belum ada kelas tujuan yang dipilih.', 'warning')
+            return redirect(url_for('classes.promote_classes'))
+        moved = graduated = 0
+        try:
+            for source_id, student_ids in plan.items():
+                if not student_ids:
+                    continue
+                target_id = mapping[source_id]
+                values = {Student.classroom_id: target_id}
+                if target_id is None:
+                    values[Student.graduated_at] = datetime.utcnow()
+                    graduated += len(student_ids)
+                else:
+                    moved += len(student_ids)
+                Student.query.filter(Student.id.in_(student_ids)).update(values, synchronize_session=False)
+            cache.bump_data_version(current_user.school_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Terjadi kesalahan: {str(e)}', 'danger')
+            return redirect(url_for('classes.promote_classes'))
+        # Satu event per kelas asal; daftar siswa di details
+        for source_id, student_ids in plan.items():
+            if student_ids:
+                audit.record(audit.STUDENT_PROMOTE, audit.ENTITY_CLASS, source_id, to_class_id=mapping[source_id],
+                             graduated=mapping[source_id] is None, student_ids=student_ids)
+        flash(f'Kenaikan kelas selesai: {moved} siswa dipindahkan, {graduated} siswa diluluskan.', 'success')
+        return redirect(url_for('classes.manage_classes'))
+    preview = None
+    if request.method == 'POST':
+        preview = [{
+            'source': classes_by_id[source_id],
+            'target': classes_by_id.get(mapping[source_id]),
+            'count': len(student_ids)
+        } for source_id, student_ids in plan.items()]
+        preview.sort(key=lambda row: row['source'].name)
+    counts = dict(db.session.query(Student.classroom_id, func.count(Student.id)).filter(
+        Student.school_id == current_user.school_id
+    ).group_by(Student.classroom_id).all())
+    return render_template('promosi.html', classes=classes, counts=counts, mapping=mapping,
+                           preview=preview, graduate_value=PROMOTION_GRADUATE)
+
+@bp.route("/api/students/<class_name>")
+@school_admin_required
+def get_students_by_class(class_name):
+    classroom = Classroom.query.filter_by(name=class_name, school_id=current_user.school_id).first()
+    if classroom:
+        # ?detail=1 menyertakan id siswa (dipakai mode input kelompok)
+        if request.args.get('detail', type=int) == 1:
+            rows = db.session.query(Student.id, Student.name).filter_by(classroom_id=classroom.id).order_by(Student.name)
+            return jsonify([{'id': s_id, 'name': name} for s_id, name in rows])
+        students = [student.name for student in classroom.students]
+        students.sort()
+        return jsonify(students)
+    else:
+        return jsonify([])
+
+
+@bp.route("/student/delete/<int:student_id>", methods=['POST'])
+@school_admin_required
+def delete_student(student_id):
+    student = Student.query.filter_by(id=student_id, school_id=current_user.school_id).first_or_404()
+    # Siswa yang sudah lulus tidak punya kelas: kembali ke beranda / Data Terhapus
+    class_url = url_for('classes.view_class', class_id=student.classroom_id) if student.classroom_id else None
+    if student.violations or student.archived_violations:
+        flash(f'Gagal menghapus siswa {student.name}. Siswa ini memiliki data pelanggaran.', 'danger')
+        return redirect(class_url or url_for('dashboard.home'))
+    try:
+        # Baris rollup/peringatan siswa dihapus saat purge (my_app/trash.py)
+        deleted = {'name': student.name, 'nis': student.nis, 'class_id': student.classroom_id}
+        trash.delete_rows(student.school_id, trash.ENTITY_STUDENT, [student])
+        db.session.commit()
+        audit.record(audit.STUDENT_DELETE, audit.ENTITY_STUDENT, student_id, **deleted)
+        offer_undo(trash.ENTITY_STUDENT, student_id)
+        flash(f'Siswa {student.name} dipindahkan ke Data Terhapus.', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Terjadi kesalahan: {str(e)}', 'danger')
+    return redirect(class_url or url_for('trash.deleted_items'))
+
+@bp.route("/student/<int:student_id>")
+@school_admin_required
+@replica_reads
+def student_history(student_id):
+    student = Student.query.filter_by(id=student_id, school_id=current_user.school_id).first_or_404()
+    total_points = sum(v.points for v in student.violations if not v.is_remitted)
+    # Riwayat tahun ajaran lama hanya dimuat jika diminta (?arsip=1)
+    show_archive = request.args.get('arsip', type=int) == 1
+    archived_violations = archive.archived_violations_for_student(student.id) if show_archive else []
+    return render_template('student_history.html', student=student, total_points=total_points,
+                           show_archive=show_archive, archived_violations=archived_violations)
+
+@bp.route("/class/print/<int:class_id>")
+@school_admin_required
+@replica_reads
+def print_class_report(class_id):
+    classroom = Classroom.query.filter_by(id=class_id, school_id=current_user.school_id).first_or_404()
+    
+    violations = Violation.query.join(Student).filter(
+        Student.classroom_id == class_id,
+        Student.school_id == current_user.school_id
+    ).order_by(Violation.date_posted.desc()).all()
+
+    # Sertakan data arsip tahun ajaran lama jika diminta (?arsip=1)
+    if request.args.get('arsip', type=int) == 1:
+        violations += archive.archived_violations_for_class(current_user.school_id, class_id)
+    
+    return render_template('print_class_report.html', 
+                         classroom=classroom, 
+                         violations=violations, 
+                         school=current_user.school)
@@ -0,0 +1,175 @@
+import time
+from datetime import date, datetime, timedelta
+
+from flask import render_template, request, flash, Blueprint, current_app, Response, stream_with_context, jsonify
+from flask_login import current_user
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+
+from my_app import cache, events, leaderboard, stats, violations
+from my_app.extensions import db
+from my_app.models import Student, Violation, Classroom, ViolationCategory
+from my_app.replica import replica_reads
+from my_app.views import school_admin_required
+
+# Beranda, statistik dan stream event dashboard live
+bp = Blueprint('dashboard', __name__)
+
+# Pilihan rentang grafik tren di halaman statistik (jumlah hari)
+TREND_RANGES = {'7d': 7, '30d': 30, '90d': 90, '180d': 180, '365d': 365}
+
+@bp.route("/")
+@bp.route("/home")
+@bp.route("/index")
+@school_admin_required
+@replica_reads
+def home():
+    page = request.args.get('page', 1, type=int)
+    search = request.args.get('search', '')
+    category = request.args.get('category', type=int)
+    date_range = request.args.get('date_range', '')
+    query = Violation.query.join(Student).filter(Student.school_id == current_user.school_id)
+    if search: query = query.filter(Student.name.contains(search))
+    if category: query = query.filter(Violation.category_id == category)
+    if date_range:
+        today = datetime.utcnow()
+        if date_range == 'today': query = query.filter(Violation.date_posted >= today.replace(hour=0, minute=0, second=0))
+        elif date_range == 'week': query = query.filter(Violation.date_posted >= today - timedelta(days=7))
+        elif date_range == 'month': query = query.filter(Violation.date_posted >= today - timedelta(days=30))
+    pelanggaran_pagination = query.options(joinedload(Violation.photos)).order_by(Violation.date_posted.desc()).paginate(page=page, per_page=10, error_out=False)
+    summary = cache.Lazy(_home_summary, current_user.school_id)
+    categories = ViolationCategory.query.filter_by(school_id=current_user.school_id).all()
+    return render_template('index.html', summary=summary,
+                           pelanggaran_pagination=pelanggaran_pagination, search_query=search, category_filter=category,
+                           date_range_value=date_range, categories=categories)
+
+def _home_summary(school_id):
+    """Angka kartu ringkasan dashboard (di-cache sebagai fragmen 'home-summary')."""
+    return dict(
+        total_students=Student.query.filter_by(school_id=school_id).count(),
+        total_violations=Violation.query.join(Student).filter(Student.school_id == school_id).count(),
+        total_classes=Classroom.query.filter_by(school_id=school_id).count()
+    )
+
+@bp.route("/events")
+@school_admin_required
+def event_stream():
+    """Server-Sent Events: pelanggaran baru/remisi/hapus untuk dashboard sekolah."""
+    school_id = current_user.school_id
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    stream = events.get_broker().listen(school_id, last_event_id)
+    timeout = current_app.config.get('EVENT_STREAM_TIMEOUT', 300)
+
+    def generate():
+        deadline = time.monotonic() + timeout
+        yield 'retry: 3000\n\n'
+        for event in stream:
+            yield events.format_sse(event)
+            if time.monotonic() >= deadline:
+                break
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def _category_counts(school_id):
+    """{label: jumlah} pelanggaran per kategori, dikelompokkan lewat category_id (integer).
+
+    Nama diambil dari peta kategori yang di-cache; pelanggaran tanpa kategori aktif
+    (kategori "Umum", kategori yang sudah dihapus, data lama) memakai snapshot nama.
+    """
+    names = violations.category_map(school_id)
+    rows = db.session.query(Violation.category_id, func.count(Violation.id)).join(Student).filter(
+        Student.school_id == school_id).group_by(Violation.category_id).all()
+    counts = {}
+    orphaned = False
+    for category_id, count in rows:
+        if category_id in names:
+            counts[names[category_id]] = counts.get(names[category_id], 0) + count
+        else:
+            orphaned = True
+    if orphaned:
+        snapshots = db.session.query(Violation.kategori_pelanggaran, func.count(Violation.id)).join(Student).filter(
+            Student.school_id == school_id,
+            or_(Violation.category_id.is_(None), Violation.category_id.notin_(list(names)))
+        ).group_by(Violation.kategori_pelanggaran).all()
+        for label, count in snapshots:
+            label = label or 'Umum'
+            counts[label] = counts.get(label, 0) + count
+    return counts
+
+def _trend_bounds(trend_range):
+    """(awal, akhir) inklusif untuk salah satu TREND_RANGES, berakhir hari ini (UTC)."""
+    end = datetime.utcnow().date()
+    return end - timedelta(days=TREND_RANGES[trend_range]), end
+
+def _statistics_context(school_id, trend_range):
+    """Semua agregat halaman statistik; dipanggil lewat cache.Lazy hanya jika fragmen belum di-cache."""
+    category_counts = _category_counts(school_id)
+    pie_labels = list(category_counts)
+    pie_data = list(category_counts.values())
+    if not pie_data:
+        pie_labels = ["Belum ada data"]
+        pie_data = [0]
+    top_today = leaderboard.top_students(school_id, *leaderboard.range_bounds(leaderboard.RANGE_TODAY), limit=5)
+    trend = stats.trend_series(school_id, *_trend_bounds(trend_range))
+    return dict(
+        pie_data=pie_data, pie_labels=pie_labels,
+        top_today=top_today, trend_labels=trend['labels'], trend_data=trend['total'],
+        total_violations_today=sum(item.violation_count for item in top_today) if top_today else 0
+    )
+
+@bp.route("/statistics")
+@school_admin_required
+@replica_reads
+def statistics():
+    trend_range = request.args.get('trend_range', '7d')
+    if trend_range not in TREND_RANGES:
+        trend_range = '7d'
+    return render_template('statistics.html', stats=cache.Lazy(_statistics_context, current_user.school_id, trend_range),
+                           current_range=trend_range, today=cache.today_key())
+
+@bp.route("/statistics/trend")
+@school_admin_required
+@replica_reads
+def statistics_trend():
+    """Seri tren (JSON) untuk statistics.js agar ganti rentang tidak memuat ulang halaman.
+
+    Parameter: range (TREND_RANGES) atau start/end (YYYY-MM-DD), dan granularity (day/week/month).
+    """
+    granularity = request.args.get('granularity', stats.GRANULARITY_DAY)
+    if granularity not in stats.GRANULARITIES:
+        return jsonify({'error': 'Granularitas tidak dikenal.'}), 400
+    trend_range = request.args.get('range', '7d')
+    start, end = _trend_bounds(trend_range if trend_range in TREND_RANGES else '7d')
+    try:
+        if request.args.get('start'):
+            start = date.fromisoformat(request.args['start'])
+            end = date.fromisoformat(request.args.get('end') or end.isoformat())
+    except ValueError:
+        return jsonify({'error': 'Format tanggal tidak valid.'}), 400
+    if start > end or (end - start).days > stats.MAX_RANGE_DAYS:
+        return jsonify({'error': 'Rentang tanggal tidak valid.'}), 400
+    return jsonify(stats.trend_series(current_user.school_id, start, end, granularity))
+
+@bp.route("/leaderboard", endpoint="leaderboard")
+@school_admin_required
+@replica_reads
+def leaderboard_page():
+    """Peringkat pelanggar per periode/kelas dan peringatan saldo poin yang masih terbuka."""
+    school_id = current_user.school_id
+    range_name = request.args.get('range', leaderboard.RANGE_WEEK)
+    start, end = leaderboard.range_bounds(range_name)
+    # Rentang bebas: ?start=YYYY-MM-DD&end=YYYY-MM-DD
+    try:
+        if request.args.get('start'):
+            start = date.fromisoformat(request.args['start'])
+            end = date.fromisoformat(request.args.get('end') or end.isoformat())
+            range_name = 'custom'
+    except ValueError:
+        flash('Format tanggal tidak valid.', 'warning')
+    class_id = request.args.get('class_id', type=int)
+    classes = Classroom.query.filter_by(school_id=school_id).order_by(Classroom.name).all()
+    return render_template('leaderboard.html',
+                           rows=leaderboard.top_students(school_id, start, end, classroom_id=class_id, limit=20),
+                           alerts=leaderboard.open_alerts(school_id), classes=classes, ranges=leaderboard.RANGES,
+                           current_range=range_name, class_id=class_id, start=start, end=end)
@@ -0,0 +1,36 @@
+from flask import url_for, redirect, Blueprint, send_from_directory
+from flask_login import current_user
+
+from my_app import storage
+
+# File upload (foto bukti, logo) dan favicon sekolah
+bp = Blueprint('files', __name__)
+
+# Umur cache browser untuk foto berbasis hash (1 tahun)
+UPLOAD_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Umur cache redirect /favicon.ico (1 jam); ikonnya sendiri berbasis hash dan di-cache setahun
+FAVICON_REDIRECT_MAX_AGE = 3600
+
+@bp.route('/favicon.ico')
+def favicon():
+    # Hanya redirect ke URL ikon berversi: tanpa query (current_user dari cache identitas) dan tanpa akses disk
+    school = current_user.school if current_user.is_authenticated else None
+    if school is not None and school.icon:
+        target = url_for('files.uploaded_file', filename=school.icon)
+    else:
+        target = url_for('static', filename='favicon.svg')
+    response = redirect(target)
+    response.cache_control.private = True
+    response.cache_control.max_age = FAVICON_REDIRECT_MAX_AGE
+    response.vary.add('Cookie')
+    return response
+
+@bp.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    # File berbasis hash tidak pernah berubah isinya, jadi aman di-cache browser selamanya
+    if storage.is_content_addressed(filename):
+        response = send_from_directory(storage.upload_folder(), filename, max_age=UPLOAD_IMMUTABLE_MAX_AGE)
+        response.cache_control.immutable = True
+        return response
+    return send_from_directory(storage.upload_folder(), filename)
@@ -0,0 +1,323 @@
+import io
+import os
+import time
+
+from flask import render_template, url_for, flash, redirect, request, Blueprint, send_file, g
+from flask_login import login_user, current_user
+from sqlalchemy.orm import joinedload
+from werkzeug.utils import secure_filename
+
+from my_app import archive, audit, cache, identity, storage, trash
+from my_app.extensions import db
+from my_app.models import User, Violation, ArchivedViolation, ViolationRule, ViolationCategory, Ayat
+from my_app.replica import replica_reads
+from my_app.views import school_admin_required
+
+# Pengaturan sekolah: profil, anggota, pasal/ayat, kategori, arsip, backup & restore
+bp = Blueprint('settings', __name__)
+
+# Field form yang tidak ikut dicatat di jejak audit
+AUDIT_HIDDEN_FIELDS = {'password'}
+
+def _mark_changed():
+    """Tandai request ini berhasil mengubah pengaturan (dipanggil setelah commit)."""
+    g.settings_changed = True
+
+@bp.after_request
+def _audit_settings_change(response):
+    """Setiap POST pengaturan yang berhasil dicatat sebagai satu event audit (tanpa password).
+
+    Jalur gagal juga menjawab 302 + flash, jadi hanya request yang ditandai
+    _mark_changed() yang dicatat.
+    """
+    if g.pop('settings_changed', False) and response.status_code < 400 and current_user.is_authenticated:
+        form = {key: value for key, value in request.form.items() if key not in AUDIT_HIDDEN_FIELDS}
+        files = [f.filename for f in request.files.values() if f.filename]
+        audit.record(audit.SETTINGS_CHANGE, audit.ENTITY_SETTINGS, endpoint=request.endpoint, form=form,
+                     files=files)
+    return response
+
+@bp.route("/settings")
+@school_admin_required
+def settings():
+    school = current_user.school
+    members = User.query.filter_by(school_id=school.id).all()
+    # Daftar pasal + ayat di-cache sebagai fragmen; query hanya jalan saat fragmen dirender ulang
+    rules = cache.Lazy(lambda: ViolationRule.query.options(joinedload(ViolationRule.ayats)).filter_by(school_id=school.id).all())
+    categories = ViolationCategory.query.filter_by(school_id=school.id).all()
+    current_year = archive.academic_year_start()
+    return render_template('settings.html', school=school, members=members, rules=rules, categories=categories,
+                           current_academic_year=current_year.year, archived_years=archive.archived_years(school.id))
+
+@bp.route("/settings/audit")
+@school_admin_required
+@replica_reads
+def audit_log():
+    """Jejak audit sekolah terbaru, bisa difilter per aksi (?action=violation.delete)."""
+    action = request.args.get('action') or None
+    return render_template('audit.html', events=audit.recent_events(current_user.school_id, action=action),
+                           actions=audit.ACTIONS, current_action=action)
+
+@bp.route("/settings/archive", methods=['POST'])
+@school_admin_required
+def settings_archive():
+    # Arsipkan semua pelanggaran sebelum awal tahun ajaran yang dipilih (default: tahun ajaran berjalan)
+    try:
+        boundary = archive.academic_year_start()
+        year = request.form.get('academic_year', '').strip()
+        if year:
+            # Tahun ajaran mendatang ikut mengarsipkan pelanggaran tahun ajaran berjalan
+            if not year.isdigit() or not 1 <= int(year) <= boundary.year:
+                flash('Tahun ajaran tidak valid.', 'danger')
+                return redirect(url_for('settings.settings', _anchor='tab-backup'))
+            boundary = boundary.replace(year=int(year))
+        count = archive.archive_violations(current_user.school_id, boundary)
+        db.session.commit()
+        _mark_changed()
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Terjadi kesalahan: {str(e)}', 'danger')
+        return redirect(url_for('settings.settings', _anchor='tab-backup'))
+    flash(f'{count} pelanggaran sebelum tahun ajaran {archive.academic_year_label(boundary)} berhasil diarsipkan.', 'success')
+    return redirect(url_for('settings.settings', _anchor='tab-backup'))
+
+@bp.route("/settings/update_school", methods=['POST'])
+@school_admin_required
+def settings_update_school():
+    name = request.form.get('name')
+    address = request.form.get('address')
+    school = current_user.school
+    if name: school.name = name
+    if address: school.address = address
+    if 'logo' in request.files:
+        file = request.files['logo']
+        if file and file.filename:
+            upload_folder = storage.upload_folder()
+            fname = secure_filename(file.filename)
+            timestamp = str(int(time.time()))
+            filename = f"logo_{school.id}_{timestamp}_{fname}"
+            file.save(os.path.join(upload_folder, filename))
+            school.logo = filename
+            # Favicon dibuat sekali di sini, bukan setiap kali browser memintanya
+            school.icon = storage.store_icon(os.path.join(upload_folder, filename))
+    db.session.commit()
+    _mark_changed()
+    identity.invalidate_school(school.id)
+    flash('Profil sekolah berhasil diperbarui.', 'success')
+    return redirect(url_for('settings.settings'))
+
+@bp.route("/settings/add_member", methods=['POST'])
+@school_admin_required
+def settings_add_member():
+    username = request.form.get('username')
+    password = request.form.get('password')
+    full_name = request.form.get('full_name')
+    if User.query.filter_by(username=username).first():
+        flash('Username sudah digunakan.', 'danger')
+        return redirect(url_for('settings.settings'))
+    new_user = User(username=username, full_name=full_name, role='school_admin', school_id=current_user.school_id)
+    new_user.set_password(password)
+    db.session.add(new_user)
+    db.session.commit()
+    _mark_changed()
+    flash('Anggota berhasil ditambahkan.', 'success')
+    return redirect(url_for('settings.settings'))
+
+@bp.route("/settings/edit_member", methods=['POST'])
+@school_admin_required
+def settings_edit_member():
+    user_id = request.form.get('user_id')
+    password = request.form.get('password')
+    username = request.form.get('username')
+    user = User.query.filter_by(id=user_id, school_id=current_user.school_id).first()
+    if user:
+        if username and username != user.username:
+            if User.query.filter_by(username=username).first():
+                flash('Username sudah terpakai.', 'danger')
+                return redirect(url_for('settings.settings'))
+            user.username = username
+        if password:
+            user.set_password(password)
+            flash(f'Password untuk {user.username} berhasil direset.', 'success')
+        db.session.commit()
+        _mark_changed()
+        identity.invalidate_user(user.id)
+        if user.id == current_user.id:
+            # ID sesi memuat credential_version; perbarui agar akun sendiri tidak ikut logout
+            login_user(user)
+    return redirect(url_for('settings.settings'))
+
+@bp.route("/settings/delete_member/<int:user_id>", methods=['POST'])
+@school_admin_required
+def settings_delete_member(user_id):
+    if user_id == current_user.id:
+        flash('Anda tidak bisa menghapus akun sendiri.', 'warning')
+        return redirect(url_for('settings.settings'))
+    user = User.query.filter_by(id=user_id, school_id=current_user.school_id).first()
+    if user:
+        db.session.delete(user)
+        db.session.commit()
+        _mark_changed()
+        identity.invalidate_user(user_id)
+        flash('Anggota berhasil dihapus.', 'success')
+    return redirect(url_for('settings.settings'))
+
+@bp.route("/settings/rules", methods=['POST'])
+@school_admin_required
+def settings_rules():
+    action = request.form.get('action')
+    if action == 'add':
+        code = request.form.get('code')
+        desc = request.form.get('description')
+        rule = ViolationRule(code=code, description=desc, school_id=current_user.school_id)
+        db.session.add(rule)
+    elif action == 'delete':
+        rule_id = request.form.get('rule_id')
+        rule = ViolationRule.query.filter_by(id=rule_id, school_id=current_user.school_id).first()
+        if rule:
+            trash.unlink_deleted_ayats([ayat.id for ayat in rule.ayats])
+            db.session.delete(rule)
+    cache.bump_data_version(current_user.school_id)
+    db.session.commit()
+    _mark_changed()
+    return redirect(url_for('settings.settings'))
+
+
+@bp.route("/settings/ayats", methods=['POST'])
+@school_admin_required
+def settings_ayats():
+    action = request.form.get('action')
+    if action == 'add':
+        rule_id = request.form.get('rule_id')
+        number = request.form.get('number')
+        description = request.form.get('description')
+        if rule_id and description:
+            # PERBAIKAN: Validasi backend untuk mencegah error 500 jika karakter melebihi batas database
+            if len(description) >= 1000:
+                flash('Karakter sudah mencapai 1000 karakter, harap kurangi.', 'danger')
+                return redirect(url_for('settings.settings', _anchor='tab-aturan'))
+                
+            rule = ViolationRule.query.filter_by(id=rule_id, school_id=current_user.school_id).first()
+            if rule:
+                db.session.add(Ayat(number=number, description=description, rule_id=rule.id))
+    elif action == 'delete':
+        ayat_id = request.form.get('ayat_id')
+        ayat = Ayat.query.join(ViolationRule).filter(Ayat.id==ayat_id, ViolationRule.school_id==current_user.school_id).first()
+        if ayat:
+            trash.unlink_deleted_ayats([ayat.id])
+            db.session.delete(ayat)
+    cache.bump_data_version(current_user.school_id)
+    db.session.commit()
+    _mark_changed()
+    # Redirect back to settings but stay on the "aturan" (Pasal) tab
+    return redirect(url_for('settings.settings', _anchor='tab-aturan'))
+
+@bp.route("/settings/categories", methods=['POST'])
+@school_admin_required
+def settings_categories():
+    action = request.form.get('action')
+    if action == 'add':
+        name = request.form.get('name')
+        points = request.form.get('points')
+        cat = ViolationCategory(name=name, points=points, school_id=current_user.school_id)
+        db.session.add(cat)
+    elif action == 'delete':
+        cat_id = request.form.get('cat_id')
+        cat = ViolationCategory.query.filter_by(id=cat_id, school_id=current_user.school_id).first()
+        if cat:
+            # Riwayat tetap menampilkan nama lama lewat snapshot kategori_pelanggaran
+            for model in (Violation, ArchivedViolation):
+                model.query.filter_by(category_id=cat.id).update({model.category_id: None}, synchronize_session=False)
+            db.session.delete(cat)
+    cache.bump_data_version(current_user.school_id)
+    db.session.commit()
+    _mark_changed()
+    return redirect(url_for('settings.settings'))
+
+@bp.route("/settings/backup")
+@school_admin_required
+def backup_data():
+    # Tetap di primary: watermark `until` harus konsisten dengan data yang diekspor,
+    # dan request ini menulis BackupSnapshot
+    # Mesin backup (zip, JSON streaming) baru dimuat saat dipakai, bukan saat worker start
+    from my_app import backup
+
+    school = current_user.school
+    upload_folder = storage.upload_folder()
+    # ?mode=incremental hanya mengekspor perubahan sejak backup terakhir
+    incremental = request.args.get('mode') == backup.BACKUP_INCREMENTAL
+
+    memory_file = io.BytesIO()
+    snapshot = backup.create_backup(memory_file, school, upload_folder, incremental=incremental)
+    db.session.commit()
+    memory_file.seek(0)
+
+    return send_file(
+        memory_file,
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=snapshot.filename
+    )
+
+@bp.route("/settings/restore", methods=['POST'])
+@school_admin_required
+def restore_data():
+    import zipfile
+    from my_app import backup
+
+    if 'backup_file' not in request.files:
+        flash('Tidak ada file yang diunggah.', 'danger')
+        return redirect(url_for('settings.settings'))
+        
+    files = [f for f in request.files.getlist('backup_file') if f.filename != '']
+    
+    if not files:
+        flash('Tidak ada file yang dipilih.', 'danger')
+        return redirect(url_for('settings.settings'))
+
+    if all(f.filename.endswith('.zip') for f in files):
+        archives = []
+        try:
+            upload_folder = storage.upload_folder()
+
+            # 1. Baca header data.json dari setiap file (tanpa daftar siswa), lalu susun rantai backup penuh + inkremental
+            chain = []
+            for file in files:
+                zf = zipfile.ZipFile(file)
+                archives.append(zf)
+                if 'data.json' not in zf.namelist():
+                    flash('Format backup tidak valid (data.json hilang).', 'danger')
+                    return redirect(url_for('settings.settings'))
+                data = backup.read_header(zf)
+                chain.append((backup.read_manifest(data), (zf, data)))
+
+            ordered, complete = backup.order_backup_chain(chain)
+            if not complete:
+                flash('Rantai backup tidak lengkap; sebagian perubahan mungkin tidak ikut dipulihkan.', 'warning')
+
+            # 2. Terapkan berurutan dalam satu transaksi
+            school = current_user.school
+            count_students = 0
+            count_violations = 0
+            for _, (zf, data) in ordered:
+                added_students, added_violations = backup.restore_archive(zf, data, school, upload_folder)
+                count_students += added_students
+                count_violations += added_violations
+
+            db.session.commit()
+            _mark_changed()
+            flash(f'Restore Berhasil! {count_students} siswa dan {count_violations} pelanggaran dipulihkan.', 'success')
+            
+        except zipfile.BadZipFile:
+            flash('File ZIP rusak atau tidak valid.', 'danger')
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Terjadi kesalahan: {str(e)}', 'danger')
+        finally:
+            for zf in archives:
+                zf.close()
+            
+    else:
+        flash('Format file harus .zip', 'danger')
+        
+    return redirect(url_for('settings.settings'))
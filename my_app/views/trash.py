@@ -0,0 +1,73 @@
+from flask import render_template, url_for, flash, redirect, Blueprint, current_app, abort, session
+from flask_login import current_user
+
+from my_app import audit, events, leaderboard, trash
+from my_app.extensions import db
+from my_app.views import school_admin_required
+
+# Data Terhapus: daftar pelanggaran/siswa/kelas yang dihapus dan tombol urungkan
+bp = Blueprint('trash', __name__)
+
+LABELS = {trash.ENTITY_VIOLATION: 'Pelanggaran', trash.ENTITY_STUDENT: 'Siswa', trash.ENTITY_CLASS: 'Kelas'}
+RESTORE_ACTIONS = {trash.ENTITY_VIOLATION: audit.VIOLATION_RESTORE, trash.ENTITY_STUDENT: audit.STUDENT_RESTORE,
+                   trash.ENTITY_CLASS: audit.CLASS_RESTORE}
+
+# Kunci session untuk tombol "Urungkan" di bawah pesan flash (base.html)
+UNDO_SESSION_KEY = 'undo'
+
+
+def offer_undo(entity, entity_id):
+    """Tampilkan tombol urungkan untuk penghapusan ini di halaman berikutnya."""
+    session[UNDO_SESSION_KEY] = {'entity': entity, 'id': entity_id, 'label': LABELS[entity]}
+
+
+def _after_restore_url(entity, row):
+    if entity == trash.ENTITY_VIOLATION:
+        return url_for('classes.student_history', student_id=row.student_id)
+    if entity == trash.ENTITY_STUDENT and row.classroom_id:
+        return url_for('classes.view_class', class_id=row.classroom_id)
+    if entity == trash.ENTITY_CLASS:
+        return url_for('classes.view_class', class_id=row.id)
+    return url_for('trash.deleted_items')
+
+
+@bp.route("/trash")
+@school_admin_required
+def deleted_items():
+    school_id = current_user.school_id
+    return render_template('data_terhapus.html',
+                           violations=trash.deleted_rows(school_id, trash.ENTITY_VIOLATION),
+                           students=trash.deleted_rows(school_id, trash.ENTITY_STUDENT),
+                           classes=trash.deleted_rows(school_id, trash.ENTITY_CLASS),
+                           retention_days=current_app.config['SOFT_DELETE_RETENTION_DAYS'])
+
+
+@bp.route("/trash/<entity>/<int:entity_id>/restore", methods=['POST'])
+@school_admin_required
+def restore(entity, entity_id):
+    if entity not in trash.MODELS:
+        abort(404)
+    school_id = current_user.school_id
+    row = trash.find_deleted(school_id, entity, entity_id)
+    if row is None:
+        abort(404)
+    parent = trash.deleted_parent(row)
+    if parent:
+        parent_entity, parent_row = parent
+        flash(f'Pulihkan dulu {LABELS[parent_entity].lower()} {parent_row.name} dari Data Terhapus.', 'warning')
+        return redirect(url_for('trash.deleted_items'))
+
+    payload = None
+    if entity == trash.ENTITY_VIOLATION:
+        leaderboard.record_restored([row])
+        payload = events.violation_payload(row)
+    trash.restore_rows(school_id, entity, [row])
+    next_url = _after_restore_url(entity, row)
+    db.session.commit()
+    if payload:
+        # Bagi dashboard live, pelanggaran yang dipulihkan sama dengan pelanggaran baru
+        events.publish(school_id, events.VIOLATION_ADDED, payload)
+        leaderboard.publish_alerts(school_id)
+    audit.record(RESTORE_ACTIONS[entity], entity, entity_id)
+    flash(f'{LABELS[entity]} berhasil dipulihkan.', 'success')
+    return redirect(next_url)
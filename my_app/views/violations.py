@@ -0,0 +1,206 @@
+from datetime import date
+
+from flask import render_template, url_for, flash, redirect, request, Blueprint, jsonify, current_app
+from flask_login import current_user
+
+from my_app import audit, cache, events, leaderboard, storage, trash, violations
+from my_app.extensions import db
+from my_app.models import User, Student, Violation, Classroom, ViolationRule, ViolationCategory, Ayat
+from my_app.replica import replica_reads
+from my_app.views import school_admin_required
+from my_app.views.trash import offer_undo
+
+# Pencatatan, remisi, hapus dan cetak pelanggaran
+bp = Blueprint('violations', __name__)
+
+@bp.route("/add_violation", methods=['GET', 'POST'])
+@school_admin_required
+def add_violation():
+    classes = Classroom.query.filter_by(school_id=current_user.school_id).order_by(Classroom.name).all()
+    rules = ViolationRule.query.filter_by(school_id=current_user.school_id).all()
+    categories = ViolationCategory.query.filter_by(school_id=current_user.school_id).all()
+    staff_members = User.query.filter_by(school_id=current_user.school_id).all()
+    if request.method == 'POST':
+        class_name = request.form.get('kelas')
+        student_name = request.form.get('nama_murid')
+        # Mode kelompok: beberapa siswa dipilih sekaligus (berdasarkan id)
+        selected_ids = [int(s) for s in request.form.getlist('student_ids') if s.isdigit()]
+        description = request.form.get('deskripsi')
+        pasal_id = request.form.get('pasal_id')
+        ayat_ids = request.form.getlist('ayat_ids')
+        kategori_id = request.form.get('kategori_id')
+        tanggal_str = request.form.get('tanggal_kejadian')
+        jam_str = request.form.get('jam_kejadian')
+        di_input_oleh = request.form.get('di_input_oleh')
+        selected_category = ViolationCategory.query.filter_by(id=kategori_id, school_id=current_user.school_id).first() if kategori_id else None
+        points = selected_category.points if selected_category else 0
+        kategori_name = selected_category.name if selected_category else "Umum"
+        classroom = Classroom.query.filter_by(name=class_name, school_id=current_user.school_id).first()
+        student_names = {}
+        if classroom and selected_ids:
+            student_names = dict(db.session.query(Student.id, Student.name).filter(
+                Student.id.in_(selected_ids),
+                Student.classroom_id == classroom.id,
+                Student.school_id == current_user.school_id
+            ).order_by(Student.name).all())
+        elif classroom:
+            student = Student.query.filter_by(name=student_name, classroom_id=classroom.id, school_id=current_user.school_id).first()
+            if student:
+                student_names = {student.id: student.name}
+        student_ids = list(student_names)
+        if student_ids:
+            date_posted = violations.parse_incident_datetime(tanggal_str, jam_str)
+            # Determine pasal string from selected rule id (if provided)
+            pasal = None
+            rule = None
+            if pasal_id:
+                rule = ViolationRule.query.filter_by(id=pasal_id, school_id=current_user.school_id).first()
+                if rule:
+                    pasal = f"{rule.code} - {rule.description}"
+            # Foto dikompres sekali lalu dirujuk semua pelanggaran dalam kelompok
+            photo_filenames = violations.store_photos(request.files.getlist('bukti_file'))
+            created = violations.record_violations(
+                student_ids, description, points, kategori_name,
+                pasal=pasal, rule_id=rule.id if rule else None, ayat_ids=ayat_ids,
+                date_posted=date_posted, di_input_oleh=di_input_oleh,
+                photo_filenames=photo_filenames,
+                category_id=selected_category.id if selected_category else None
+            )
+            payloads = [events.violation_payload(v, student_names[v.student_id], classroom.name) for v in created]
+            cache.bump_data_version(current_user.school_id)
+            db.session.commit()
+            for payload in payloads:
+                events.publish(current_user.school_id, events.VIOLATION_ADDED, payload)
+            leaderboard.publish_alerts(current_user.school_id)
+            audit.record_violations(audit.VIOLATION_CREATE, payloads)
+            if len(student_ids) > 1:
+                flash(f'Pelanggaran berhasil dicatat untuk {len(student_ids)} siswa!', 'success')
+            else:
+                flash('Pelanggaran berhasil dicatat!', 'success')
+            return redirect(url_for('dashboard.home'))
+        else:
+            flash('Siswa tidak ditemukan.', 'danger')
+    return render_template('add_violation.html', classes=classes, rules=rules, categories=categories, staff_members=staff_members)
+
+@bp.route("/api/rules/<int:rule_id>/ayats")
+@school_admin_required
+def get_ayats_by_rule(rule_id):
+    ayats = Ayat.query.filter_by(rule_id=rule_id).all()
+    result = []
+    for a in ayats:
+        result.append({
+            'id': a.id,
+            'number': a.number,
+            'description': a.description
+        })
+    return jsonify(result)
+
+@bp.route("/violation/delete/<int:violation_id>", methods=['POST'])
+@school_admin_required
+def delete_violation(violation_id):
+    violation = Violation.query.join(Student).filter(
+        Violation.id == violation_id,
+        Student.school_id == current_user.school_id
+    ).first_or_404()
+    student_id = violation.student_id
+    payload = events.violation_payload(violation)
+    description = violation.description
+    leaderboard.record_removed([violation])
+    # Hapus lunak: foto tetap disimpan sampai purge (flask purge-deleted)
+    trash.delete_rows(current_user.school_id, trash.ENTITY_VIOLATION, [violation])
+    db.session.commit()
+    events.publish(current_user.school_id, events.VIOLATION_DELETED, payload)
+    audit.record_violations(audit.VIOLATION_DELETE, [payload], description=description)
+    offer_undo(trash.ENTITY_VIOLATION, violation_id)
+    flash('Data pelanggaran dipindahkan ke Data Terhapus.', 'success')
+    return redirect(url_for('classes.student_history', student_id=student_id))
+
+@bp.route("/violation/remit/<int:violation_id>", methods=['POST'])
+@school_admin_required
+def remit_violation(violation_id):
+    violation = Violation.query.join(Student).filter(
+        Violation.id == violation_id,
+        Student.school_id == current_user.school_id
+    ).first_or_404()
+    reason = request.form.get('remission_reason')
+    if not reason:
+        flash('Keterangan remisi wajib diisi.', 'warning')
+        return redirect(url_for('classes.student_history', student_id=violation.student_id))
+    
+    violations.remit_violation(violation, reason, request.files.get('remission_photo'))
+    payload = events.violation_payload(violation)
+    db.session.commit()
+    events.publish(current_user.school_id, events.VIOLATION_REMITTED, payload)
+    audit.record_violations(audit.VIOLATION_REMIT, [payload], reason=reason)
+    flash('Remisi berhasil.', 'success')
+    return redirect(url_for('classes.student_history', student_id=violation.student_id))
+
+def _bulk_remission_filters(form):
+    """Filter remisi massal dari form: id kelas/siswa/kategori dan rentang tanggal (YYYY-MM-DD)."""
+    filters = {key: form.get(key, type=int) for key in ('classroom_id', 'student_id', 'category_id')}
+    for key in ('start', 'end'):
+        try:
+            filters[key] = date.fromisoformat(form[key]) if form.get(key) else None
+        except ValueError:
+            filters[key] = None
+    return filters
+
+@bp.route("/violations/remit-bulk", methods=['GET', 'POST'])
+@school_admin_required
+def bulk_remission():
+    """Remisi massal (misal amnesti akhir semester) dengan pratinjau sebelum diproses."""
+    school_id = current_user.school_id
+    filters = _bulk_remission_filters(request.form if request.method == 'POST' else request.args)
+    if request.method == 'POST' and request.form.get('action') == 'apply':
+        reason = request.form.get('remission_reason')
+        if not reason:
+            flash('Keterangan remisi wajib diisi.', 'warning')
+        else:
+            count, _, _ = violations.bulk_remission_preview(school_id, filters, limit=0)
+            if not count:
+                flash('Tidak ada pelanggaran aktif yang cocok dengan filter.', 'warning')
+                return redirect(url_for('violations.bulk_remission'))
+            # Satu file foto bukti untuk semua pelanggaran (penyimpanan berbasis hash)
+            photo = request.files.get('remission_photo')
+            photo_filename = storage.store_image(photo) if photo and photo.filename else None
+            if count > current_app.config['BULK_REMISSION_BACKGROUND_THRESHOLD']:
+                violations.start_bulk_remission(current_app._get_current_object(), school_id, filters, reason,
+                                                photo_filename)
+                audit.record(audit.VIOLATION_BULK_REMIT, audit.ENTITY_VIOLATION, count=count, reason=reason,
+                             background=True, **filters)
+                flash(f'Remisi {count} pelanggaran sedang diproses di latar belakang.', 'info')
+                return redirect(url_for('dashboard.home'))
+            try:
+                count, points = violations.bulk_remit(school_id, filters, reason, photo_filename)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                flash(f'Terjadi kesalahan: {str(e)}', 'danger')
+                return redirect(url_for('violations.bulk_remission'))
+            violations.publish_bulk_remission(school_id, count, points)
+            audit.record(audit.VIOLATION_BULK_REMIT, audit.ENTITY_VIOLATION, count=count, points=points, reason=reason,
+                         **filters)
+            flash(f'Remisi massal berhasil: {count} pelanggaran, {points} poin dikembalikan.', 'success')
+            return redirect(url_for('dashboard.home'))
+
+    classes = Classroom.query.filter_by(school_id=school_id).order_by(Classroom.name).all()
+    categories = ViolationCategory.query.filter_by(school_id=school_id).order_by(ViolationCategory.name).all()
+    students = Student.query.filter_by(school_id=school_id, classroom_id=filters['classroom_id']).order_by(
+        Student.name).all() if filters['classroom_id'] else []
+    preview = violations.bulk_remission_preview(school_id, filters) if request.method == 'POST' else None
+    return render_template('remisi_massal.html', classes=classes, categories=categories, students=students,
+                           filters=filters, preview=preview)
+
+@bp.route("/violation/print/<int:violation_id>")
+@school_admin_required
+@replica_reads
+def print_violation(violation_id):
+    violation = Violation.query.join(Student).filter(
+        Violation.id == violation_id,
+        Student.school_id == current_user.school_id
+    ).first_or_404()
+    
+    return render_template('print_violation.html', 
+                         violation=violation, 
+                         student=violation.student, 
+                         school=current_user.school)
@@ -0,0 +1,210 @@
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, or_, select, update, func
+from sqlalchemy.orm import joinedload
+
+from my_app import cache, events, leaderboard, storage
+from my_app.extensions import db
+from my_app.models import (School, Student, Violation, ViolationCategory, ViolationPhoto, Ayat, violation_ayats,
+                           PHOTO_KIND_REMISSION)
+
+# Batas jumlah foto bukti per input pelanggaran
+MAX_PHOTOS = 10
+
+# Peta {id kategori: nama} per app dan sekolah, disimpan bersama School.data_version
+# saat dibaca. Perubahan kategori menaikkan versi (cache.bump_data_version), jadi
+# langsung terlihat tanpa perlu invalidasi manual.
+_category_maps = {}
+_category_maps_lock = threading.Lock()
+
+
+def parse_incident_datetime(tanggal_str, jam_str):
+    """Gabungkan tanggal 'dd/mm/yyyy' dan jam 'HH:MM' dari form; fallback ke waktu sekarang."""
+    try:
+        date_obj = datetime.strptime(tanggal_str, '%d/%m/%Y')
+        if jam_str:
+            time_obj = datetime.strptime(jam_str, '%H:%M').time()
+            return datetime.combine(date_obj.date(), time_obj)
+        return date_obj
+    except (ValueError, TypeError):
+        return datetime.utcnow()
+
+
+def store_photos(files):
+    """Kompres dan simpan foto sekali saja; hasilnya bisa dipakai bersama banyak pelanggaran."""
+    filenames = []
+    for file in [f for f in files if f and f.filename != ''][:MAX_PHOTOS]:
+        filename = storage.store_image(file)
+        if filename:
+            filenames.append(filename)
+    return filenames
+
+
+def category_map(school_id):
+    """{id: nama} kategori sekolah untuk memberi label agregat yang dikelompokkan per category_id."""
+    version = db.session.query(School.data_version).filter_by(id=school_id).scalar() or 0
+    with _category_maps_lock:
+        maps = _category_maps.setdefault(current_app._get_current_object(), {})
+        cached = maps.get(school_id)
+    if cached and cached[0] == version:
+        return cached[1]
+    names = dict(db.session.query(ViolationCategory.id, ViolationCategory.name).filter_by(school_id=school_id))
+    with _category_maps_lock:
+        maps[school_id] = (version, names)
+    return names
+
+
+def record_violations(student_ids, description, points, kategori, pasal=None, rule_id=None,
+                      ayat_ids=(), date_posted=None, di_input_oleh=None, photo_filenames=(),
+                      category_id=None):
+    """Catat pelanggaran yang sama untuk satu atau banyak siswa.
+
+    `kategori` disimpan sebagai snapshot nama, `category_id` sebagai kunci
+    statistik (None untuk kategori "Umum"). Baris Violation disisipkan dalam satu flush, lalu tautan ayat dan foto
+    dengan INSERT executemany. Foto yang sama dirujuk semua pelanggaran
+    (penyimpanan berbasis hash). Tidak melakukan commit; pemanggil memegang
+    transaksi (dan cache.bump_data_version sekolahnya). Mengembalikan daftar Violation baru.
+    """
+    date_posted = date_posted or datetime.utcnow()
+    violations = [Violation(
+        description=description,
+        points=points,
+        date_posted=date_posted,
+        student_id=student_id,
+        pasal=pasal,
+        category_id=category_id,
+        kategori_pelanggaran=kategori,
+        di_input_oleh=di_input_oleh
+    ) for student_id in student_ids]
+    if not violations:
+        return []
+    db.session.add_all(violations)
+    db.session.flush()
+    leaderboard.record_added(violations)
+
+    # Ayat hanya valid jika milik pasal yang dipilih
+    valid_ayat_ids = []
+    if ayat_ids and rule_id:
+        try:
+            ayat_int_ids = [int(a) for a in ayat_ids if a]
+        except ValueError:
+            ayat_int_ids = []
+        if ayat_int_ids:
+            valid_ayat_ids = [a_id for (a_id,) in db.session.query(Ayat.id).filter(
+                Ayat.id.in_(ayat_int_ids), Ayat.rule_id == rule_id)]
+    if valid_ayat_ids:
+        db.session.execute(insert(violation_ayats), [
+            {'violation_id': v.id, 'ayat_id': a_id} for v in violations for a_id in valid_ayat_ids
+        ])
+    if photo_filenames:
+        db.session.execute(insert(ViolationPhoto), [
+            {'filename': filename, 'violation_id': v.id} for v in violations for filename in photo_filenames
+        ])
+    return violations
+
+
+def remit_violation(violation, reason, photo_file=None):
+    """Tandai pelanggaran sebagai diremisi, opsional dengan foto bukti remisi. Tidak melakukan commit."""
+    leaderboard.record_remitted([violation])
+    cache.bump_data_version(violation.student.school_id)
+    violation.is_remitted = True
+    violation.remission_reason = reason
+    violation.remission_date = datetime.utcnow()
+    if photo_file and photo_file.filename != '':
+        filename = storage.store_image(photo_file)
+        if filename:
+            # kind='remisi' membedakan dengan foto pelanggaran biasa
+            db.session.add(ViolationPhoto(filename=filename, violation_id=violation.id, kind=PHOTO_KIND_REMISSION))
+    return violation
+
+
+# --- REMISI MASSAL ---
+
+# Jumlah id per UPDATE ... WHERE id IN (...), di bawah batas parameter SQLite lama (999)
+BULK_UPDATE_BATCH = 500
+
+def _bulk_remission_criteria(school_id, classroom_id=None, student_id=None, category_id=None,
+                             start=None, end=None):
+    """Kondisi WHERE pada tabel violations saja (siswa lewat subquery), agar bisa dipakai
+    langsung oleh UPDATE di semua database (MySQL menolak subquery ke tabel yang di-UPDATE)."""
+    students = select(Student.id).where(Student.school_id == school_id)
+    if classroom_id:
+        students = students.where(Student.classroom_id == classroom_id)
+    if student_id:
+        students = students.where(Student.id == student_id)
+    # deleted_at ditulis sendiri: UPDATE tidak difilter listener hapus lunak (my_app/trash.py)
+    criteria = [Violation.student_id.in_(students), Violation.deleted_at.is_(None),
+                or_(Violation.is_remitted.is_(None), Violation.is_remitted == False)]  # noqa: E712
+    if category_id:
+        criteria.append(Violation.category_id == category_id)
+    if start:
+        criteria.append(Violation.date_posted >= start)
+    if end:
+        # Tanggal akhir inklusif
+        criteria.append(Violation.date_posted < end + timedelta(days=1))
+    return criteria
+
+
+def bulk_remission_preview(school_id, filters, limit=50):
+    """(jumlah, total poin, contoh pelanggaran) yang akan diremisi dengan filter ini."""
+    criteria = _bulk_remission_criteria(school_id, **filters)
+    count, points = db.session.query(func.count(Violation.id), func.coalesce(func.sum(Violation.points), 0)).filter(
+        *criteria).one()
+    sample = Violation.query.filter(*criteria).options(joinedload(Violation.student)).order_by(Violation.date_posted.desc()).limit(limit).all() if limit else []
+    return count, points, sample
+
+
+def bulk_remit(school_id, filters, reason, photo_filename=None):
+    """Remisi semua pelanggaran aktif yang cocok dengan filter dalam satu UPDATE. Tidak melakukan commit.
+
+    Saldo poin dan rollup peringkat ikut disesuaikan; satu foto bukti (opsional)
+    dirujuk semua pelanggaran. Mengembalikan (jumlah, total poin).
+    """
+    criteria = _bulk_remission_criteria(school_id, **filters)
+    # Kunci baris yang akan diremisi (PostgreSQL/MySQL) agar saldo tidak dihitung ganda
+    rows = db.session.query(Violation.id, Violation.student_id, Violation.date_posted, Violation.points,
+                            Violation.is_remitted).filter(*criteria).with_for_update().all()
+    if not rows:
+        return 0, 0
+    leaderboard.record_remitted(rows)
+    cache.bump_data_version(school_id)
+    now = datetime.utcnow()
+    # Hanya id yang sudah dihitung di atas: pelanggaran yang masuk setelah SELECT
+    # (SQLite tidak mengenal FOR UPDATE) tidak boleh ikut diremisi tanpa saldo
+    ids = [row.id for row in rows]
+    for offset in range(0, len(ids), BULK_UPDATE_BATCH):
+        db.session.execute(update(Violation).where(Violation.id.in_(ids[offset:offset + BULK_UPDATE_BATCH])).values(
+            is_remitted=True, remission_reason=reason, remission_date=now, updated_at=now
+        ).execution_options(synchronize_session=False))
+    if photo_filename:
+        db.session.execute(insert(ViolationPhoto), [
+            {'filename': photo_filename, 'violation_id': row.id, 'kind': PHOTO_KIND_REMISSION} for row in rows
+        ])
+    return len(rows), sum(row.points or 0 for row in rows)
+
+
+def publish_bulk_remission(school_id, count, points):
+    """Satu event ringkas untuk dashboard live (bukan satu event per pelanggaran). Panggil setelah commit."""
+    events.publish(school_id, events.VIOLATIONS_REMITTED, {'count': count, 'points': points})
+    leaderboard.publish_alerts(school_id)
+
+
+def start_bulk_remission(app, school_id, filters, reason, photo_filename=None):
+    """Jalankan bulk_remit di thread latar belakang (seleksi besar), dalam satu transaksi sendiri."""
+    def run():
+        with app.app_context():
+            try:
+                count, points = bulk_remit(school_id, filters, reason, photo_filename)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                app.logger.exception('Remisi massal sekolah %s gagal', school_id)
+                return
+            publish_bulk_remission(school_id, count, points)
+            app.logger.info('Remisi massal sekolah %s: %s pelanggaran', school_id, count)
+
+    thread = threading.Thread(target=run, name=f'bulk-remission-{school_id}', daemon=True)
+    thread.start()
+    return thread
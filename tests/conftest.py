@@ -1,17 +1,13 @@
 import pytest
-from my_app.app import app as flask_app
+from my_app import create_app
+from my_app.config import TestConfig
 from my_app.extensions import db
 from my_app.models import User
 
 @pytest.fixture
 def app():
     """Membuat instance aplikasi dengan konfigurasi testing."""
-    flask_app.config.update({
-        "TESTING": True,
-        "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
-        "WTF_CSRF_ENABLED": False,
-        "SECRET_KEY": "test_secret_key"
-    })
+    flask_app = create_app(TestConfig)
 
     with flask_app.app_context():
         db.create_all()
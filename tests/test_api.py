@@ -0,0 +1,163 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+
+from my_app.models import User, School, Classroom, Student, Violation, ViolationRule, ViolationCategory, Ayat
+from my_app.extensions import db
+
+
+def _setup_school(app, username):
+    with app.app_context():
+        school = School(name=f"Sekolah {username}", address="Test Address")
+        user = User(username=username, role="school_admin", full_name="Guru API")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="12C", school_id=school.id)
+        rule = ViolationRule(code="Pasal A", description="Api", school_id=school.id)
+        category = ViolationCategory(name="Ringan", points=5, school_id=school.id)
+        db.session.add_all([classroom, rule, category])
+        db.session.flush()
+        students = [Student(name=f"Siswa API {i}", nis=f"700{i}", school_id=school.id, classroom_id=classroom.id)
+                    for i in range(3)]
+        ayat = Ayat(number="1", description="Terlambat", rule_id=rule.id)
+        db.session.add_all(students + [ayat])
+        db.session.commit()
+        return {
+            'student_ids': [s.id for s in students],
+            'class_id': classroom.id,
+            'rule_id': rule.id,
+            'ayat_id': ayat.id,
+            'category_id': category.id,
+        }
+
+
+def test_api_requires_login(client):
+    response = client.get('/api/v1/students')
+    assert response.status_code == 401
+    assert 'error' in response.get_json()
+
+
+def test_api_create_list_and_remit(client, app):
+    ids = _setup_school(app, "api_user")
+    response = client.post('/api/v1/login', json={'username': 'api_user', 'password': 'pass123'})
+    assert response.status_code == 200
+
+    response = client.get('/api/v1/students?fields=id,name&limit=2')
+    page = response.get_json()
+    assert [set(item) for item in page['items']] == [{'id', 'name'}] * 2
+    assert page['next_cursor']
+    page2 = client.get(f"/api/v1/students?fields=id&cursor={page['next_cursor']}").get_json()
+    assert [item['id'] for item in page['items'] + page2['items']] == ids['student_ids']
+    assert page2['next_cursor'] is None
+
+    response = client.post('/api/v1/violations', json={
+        'student_ids': ids['student_ids'][:2],
+        'description': 'Terlambat upacara',
+        'category_id': ids['category_id'],
+        'rule_id': ids['rule_id'],
+        'ayat_ids': [ids['ayat_id']],
+        'date_posted': '2026-02-25T07:15:00',
+    })
+    assert response.status_code == 201
+    created = response.get_json()['items']
+    assert len(created) == 2
+    assert created[0]['points'] == 5 and created[0]['ayat_ids'] == [ids['ayat_id']]
+    assert created[0]['recorded_by'] == 'Guru API'
+
+    response = client.post(f"/api/v1/violations/{created[0]['id']}/remit", json={'reason': 'Sudah minta maaf'})
+    assert response.status_code == 200
+    assert response.get_json()['is_remitted'] is True
+
+    response = client.post('/api/v1/violations', json={'student_id': 999999, 'description': 'x'})
+    assert response.status_code == 404
+
+
+def test_api_violation_cursor_pagination(client, app):
+    ids = _setup_school(app, "api_cursor")
+    base = datetime(2026, 3, 1, 8, 0)
+    with app.app_context():
+        # Beberapa pelanggaran dengan waktu sama untuk menguji tie-break id
+        db.session.add_all([
+            Violation(description=f"Pelanggaran {i}", points=1, student_id=ids['student_ids'][0],
+                      date_posted=base - timedelta(days=i // 2))
+            for i in range(7)
+        ])
+        db.session.commit()
+
+    client.post('/api/v1/login', json={'username': 'api_cursor', 'password': 'pass123'})
+    seen, cursor = [], None
+    while True:
+        url = f"/api/v1/violations?class_id={ids['class_id']}&limit=3&fields=id,date_posted"
+        if cursor:
+            url += f"&cursor={cursor}"
+        page = client.get(url).get_json()
+        seen += page['items']
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+    assert len(seen) == 7
+    assert len({item['id'] for item in seen}) == 7
+    keys = [(item['date_posted'], item['id']) for item in seen]
+    assert keys == sorted(keys, reverse=True)
+
+    assert client.get('/api/v1/violations?cursor=!!!').status_code == 400
+
+
+def test_api_gzip_response(client, app, monkeypatch):
+    from my_app import api
+    _setup_school(app, "api_gzip")
+    client.post('/api/v1/login', json={'username': 'api_gzip', 'password': 'pass123'})
+    plain = client.get('/api/v1/students')
+    assert 'Content-Encoding' not in plain.headers
+
+    # Respons kecil tidak dikompres
+    small = client.get('/api/v1/categories', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+
+    monkeypatch.setattr(api, 'GZIP_MIN_SIZE', 0)
+    response = client.get('/api/v1/students', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data())) == plain.get_json()
+
+
+def test_api_delta_sync(client, app):
+    ids = _setup_school(app, "api_sync")
+    old = datetime(2025, 1, 1)
+    with app.app_context():
+        violation = Violation(description="Lama", points=1, student_id=ids['student_ids'][0])
+        db.session.add(violation)
+        db.session.commit()
+        violation_id = violation.id
+        # Data yang tidak berubah sejak lama tidak boleh ikut terkirim di delta
+        Student.query.filter(Student.id.in_(ids['student_ids'])).update(
+            {Student.updated_at: old}, synchronize_session=False)
+        Classroom.query.filter_by(id=ids['class_id']).update({Classroom.updated_at: old}, synchronize_session=False)
+        Violation.query.filter_by(id=violation_id).update({Violation.updated_at: old}, synchronize_session=False)
+        db.session.commit()
+
+    client.post('/api/v1/login', json={'username': 'api_sync', 'password': 'pass123'})
+    full = client.get('/api/v1/sync').get_json()
+    assert full['reset'] is True
+    assert [s['id'] for s in full['students']] == ids['student_ids']
+    assert [v['id'] for v in full['violations']] == [violation_id]
+
+    with app.app_context():
+        from my_app.sync import changes_since
+        delta = changes_since(db.session.get(Student, ids['student_ids'][0]).school_id, datetime.utcnow())
+        assert delta['students'] == [] and delta['violations'] == [] and delta['classes'] == []
+
+    # Kelulusan (UPDATE massal) dan hapus pelanggaran
+    client.post('/classes/promote', data={f"target_{ids['class_id']}": 'graduate', 'action': 'apply'})
+    client.post(f'/violation/delete/{violation_id}')
+
+    delta = client.get(f"/api/v1/sync?since={full['token']}").get_json()
+    assert delta['reset'] is False
+    assert [s['id'] for s in delta['students']] == ids['student_ids']
+    assert all(s['graduated'] for s in delta['students'])
+    assert delta['deleted']['violation'] == [violation_id]
+    assert delta['violations'] == []
+
+    assert client.get('/api/v1/sync?since=xyz').status_code == 400
@@ -0,0 +1,96 @@
+import json
+from datetime import datetime
+
+from my_app import audit
+from my_app.extensions import db
+from my_app.models import User, School, Classroom, Student, Violation, ViolationCategory, AuditEvent
+
+
+def _setup_school(app):
+    with app.app_context():
+        school = School(name="Sekolah Audit", address="Test Address")
+        user = User(username="audit_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        kelas_a = Classroom(name="6A", school_id=school.id)
+        kelas_b = Classroom(name="6B", school_id=school.id)
+        ringan = ViolationCategory(name="Ringan", points=5, school_id=school.id)
+        db.session.add_all([kelas_a, kelas_b, ringan])
+        db.session.flush()
+        db.session.add(Student(name="Eka", nis="9001", school_id=school.id, classroom_id=kelas_a.id))
+        db.session.commit()
+        return school.id, kelas_a.id, kelas_b.id, ringan.id
+
+
+def test_write_routes_are_audited_after_flush(client, app):
+    school_id, kelas_a_id, kelas_b_id, ringan_id = _setup_school(app)
+    client.post('/login', data={'username': 'audit_user', 'password': 'pass123'})
+    client.post('/add_violation', data={
+        'kelas': '6A', 'nama_murid': 'Eka', 'deskripsi': 'Terlambat',
+        'kategori_id': ringan_id, 'tanggal_kejadian': '02/03/2026',
+    })
+    with app.app_context():
+        violation_id = Violation.query.one().id
+        student_id = Student.query.filter_by(nis="9001").one().id
+    client.post(f'/violation/remit/{violation_id}', data={'remission_reason': 'Berkelakuan baik'})
+    client.post(f'/violation/delete/{violation_id}')
+    client.post(f'/classes/{kelas_a_id}', data={'mutate_students': '1', 'target_class_id': kelas_b_id,
+                                               'selected_students': [str(student_id)]})
+    client.post('/settings/add_member', data={'username': 'guru_baru', 'password': 'rahasia', 'full_name': 'Guru'})
+
+    with app.app_context():
+        # Belum ada yang ditulis: event masih di antrean
+        assert AuditEvent.query.count() == 0
+        assert audit.flush(app) == 5
+        events = AuditEvent.query.order_by(AuditEvent.id).all()
+        assert [e.action for e in events] == [audit.VIOLATION_CREATE, audit.VIOLATION_REMIT, audit.VIOLATION_DELETE,
+                                              audit.STUDENT_MOVE, audit.SETTINGS_CHANGE]
+        assert {e.username for e in events} == {'audit_user'}
+        assert {e.school_id for e in events} == {school_id}
+        assert events[2].entity_id == violation_id and json.loads(events[2].details)['description'] == 'Terlambat'
+        assert json.loads(events[3].details)['to_class'] == '6B'
+        settings_details = json.loads(events[4].details)
+        assert settings_details['endpoint'] == 'settings.settings_add_member'
+        assert settings_details['form']['username'] == 'guru_baru'
+        assert 'password' not in settings_details['form']
+
+    assert 'Hapus pelanggaran' in client.get('/settings/audit').get_data(as_text=True)
+
+
+def test_rejected_settings_posts_are_not_audited(client, app):
+    _setup_school(app)
+    client.post('/login', data={'username': 'audit_user', 'password': 'pass123'})
+    # Semua ditolak dengan redirect + flash danger
+    client.post('/settings/add_member', data={'username': 'audit_user', 'password': 'x', 'full_name': 'Ganda'})
+    client.post('/settings/ayats', data={'action': 'add', 'rule_id': '1', 'description': 'x' * 1000})
+    client.post('/settings/archive', data={'academic_year': '99999'})
+    client.post('/settings/categories', data={'action': 'add', 'name': 'Berat', 'points': '30'})
+
+    with app.app_context():
+        assert audit.flush(app) == 1
+        event = AuditEvent.query.one()
+        assert event.action == audit.SETTINGS_CHANGE
+        assert json.loads(event.details)['endpoint'] == 'settings.settings_categories'
+
+
+def _row(action):
+    return {'school_id': None, 'user_id': None, 'username': 'cli', 'action': action, 'entity': audit.ENTITY_SETTINGS,
+            'entity_id': None, 'details': None, 'created_at': datetime.utcnow()}
+
+
+def test_background_flusher_and_bounded_queue(app):
+    writer = audit.AuditWriter(app, max_size=100, batch_size=10, interval=0.05)
+    for i in range(25):
+        writer.put(_row(f'test.{i}'))
+    writer.close()
+    assert writer.thread is not None and not writer.thread.is_alive()
+    assert AuditEvent.query.filter(AuditEvent.action.like('test.%')).count() == 25
+
+    # Antrean penuh: event dibuang, route tidak tertahan
+    full = audit.AuditWriter(app, max_size=1, interval=0)
+    full.put(_row('penuh.1'))
+    full.put(_row('penuh.2'))
+    assert full.dropped == 1
+    assert full.flush() == 1
@@ -0,0 +1,86 @@
+from my_app import cache
+from my_app.models import User, School, ViolationRule
+from my_app.extensions import db
+
+
+def test_memory_cache_evicts_least_recently_used():
+    store = cache.MemoryCache(max_bytes=10)
+    store.set('a', 'aaaa')
+    store.set('b', 'bbbb')
+    assert store.get('a') == 'aaaa'   # 'a' jadi yang terbaru dipakai
+    store.set('c', 'cccc')
+    assert store.get('b') is None
+    assert store.get('a') == 'aaaa' and store.get('c') == 'cccc'
+    assert store.size == 8
+    store.set('besar', 'x' * 11)      # lebih besar dari batas: tidak disimpan
+    assert store.get('besar') is None
+
+
+def test_file_cache_shared_and_bounded(tmp_path):
+    first = cache.FileCache(str(tmp_path), max_bytes=10)
+    second = cache.FileCache(str(tmp_path), max_bytes=10)
+    first.set('a', 'aaaa')
+    assert second.get('a') == 'aaaa'
+    first.set('b', 'bbbb')
+    first.set('c', 'cccc')
+    stored = [first.get(k) for k in ('a', 'b', 'c')]
+    assert stored.count(None) == 1
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 10
+
+
+def test_lazy_value_only_computed_when_used():
+    calls = []
+    value = cache.Lazy(lambda: calls.append(1) or {'total': 3})
+    assert calls == []
+    assert value['total'] == 3 and value['total'] == 3
+    assert calls == [1]
+
+
+def test_fragment_cache_invalidated_after_post(client, app, monkeypatch):
+    monkeypatch.setitem(cache._caches, app, cache.MemoryCache(1024 * 1024))
+    with app.app_context():
+        school = School(name="Test School Cache", address="Test Address")
+        user = User(username="cache_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        rule = ViolationRule(code="Pasal Cache", description="Awal", school_id=school.id)
+        db.session.add(rule)
+        db.session.commit()
+        rule_id = rule.id
+
+    client.post('/login', data={'username': 'cache_user', 'password': 'pass123'})
+    assert 'Pasal Cache' in client.get('/settings').get_data(as_text=True)
+
+    # Perubahan langsung ke database (tanpa POST) belum terlihat: fragmen diambil dari cache
+    with app.app_context():
+        db.session.get(ViolationRule, rule_id).code = "Pasal Diubah"
+        db.session.commit()
+    html = client.get('/settings').get_data(as_text=True)
+    assert 'Pasal Cache' in html and 'Pasal Diubah' not in html
+
+    # Perubahan aturan lewat settings menaikkan data_version di transaksi yang sama
+    client.post('/settings/rules', data={'action': 'add', 'code': 'Pasal Baru', 'description': 'Baru'})
+    html = client.get('/settings').get_data(as_text=True)
+    assert 'Pasal Diubah' in html and 'Pasal Baru' in html
+
+    with app.app_context():
+        assert School.query.filter_by(name="Test School Cache").first().data_version >= 1
+
+
+def test_bump_data_version_follows_transaction(app):
+    with app.app_context():
+        school = School(name="Sekolah Versi", address="Test Address")
+        db.session.add(school)
+        db.session.commit()
+        school_id = school.id
+
+        # Dua kali bump dalam satu transaksi tetap satu kenaikan; rollback membatalkannya
+        cache.bump_data_version(school_id)
+        cache.bump_data_version(school_id)
+        db.session.commit()
+        cache.bump_data_version(school_id)
+        db.session.rollback()
+        db.session.commit()
+        assert db.session.get(School, school_id).data_version == 1
@@ -0,0 +1,140 @@
+import os
+import zipfile
+
+from my_app.models import School, BackupSnapshot, Classroom, Student, Violation, ViolationPhoto
+from my_app.extensions import db
+
+
+def test_backup_all_command_writes_and_rotates(app, tmp_path):
+    """Test perintah CLI backup-all menulis ZIP ke disk dan menyisakan N file terbaru."""
+    with app.app_context():
+        school = School(name="Sekolah CLI", address="Test Address")
+        db.session.add(school)
+        db.session.commit()
+        school_id = school.id
+
+    runner = app.test_cli_runner()
+    out_dir = str(tmp_path)
+    for _ in range(2):
+        result = runner.invoke(args=['backup-all', '--out', out_dir, '--keep', '1'])
+        assert result.exit_code == 0, result.output
+
+    school_dir = os.path.join(out_dir, f"school_{school_id}")
+    files = [f for f in os.listdir(school_dir) if f.endswith('.zip')]
+    assert len(files) == 1
+    with zipfile.ZipFile(os.path.join(school_dir, files[0])) as zf:
+        assert 'data.json' in zf.namelist()
+
+    with app.app_context():
+        assert BackupSnapshot.query.filter_by(school_id=school_id).count() == 2
+
+
+def test_gc_uploads_quarantines_orphans(app, tmp_path, monkeypatch):
+    """Test gc-uploads hanya memindahkan file yang tidak dirujuk database."""
+    uploads = tmp_path / "uploads"
+    (uploads / "ab" / "cd").mkdir(parents=True)
+    (uploads / "ab" / "cd" / "dipakai.jpg").write_bytes(b"x" * 10)
+    (uploads / "logo_1.png").write_bytes(b"x" * 5)
+    (uploads / "yatim.jpg").write_bytes(b"x" * 7)
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(uploads))
+
+    with app.app_context():
+        school = School(name="Sekolah GC", address="Test Address", logo="logo_1.png")
+        db.session.add(school)
+        db.session.flush()
+        classroom = Classroom(name="10A", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        student = Student(name="Siswa GC", nis="5001", school_id=school.id, classroom_id=classroom.id)
+        db.session.add(student)
+        db.session.flush()
+        violation = Violation(description="GC", points=5, student_id=student.id)
+        db.session.add(violation)
+        db.session.flush()
+        db.session.add(ViolationPhoto(filename="ab/cd/dipakai.jpg", violation_id=violation.id))
+        db.session.commit()
+
+    quarantine = tmp_path / "karantina"
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['gc-uploads', '--quarantine', str(quarantine), '--min-age', '0'])
+    assert result.exit_code == 0, result.output
+    assert "1 file orphan" in result.output
+
+    assert not (uploads / "yatim.jpg").exists()
+    assert (quarantine / "yatim.jpg").exists()
+    assert (uploads / "ab" / "cd" / "dipakai.jpg").exists()
+    assert (uploads / "logo_1.png").exists()
+
+    result = runner.invoke(args=['storage-report'])
+    assert "Sekolah GC: 2 file, 15 B" in result.output
+
+
+def test_backup_rotation_keeps_incremental_chain_restorable(client, app, tmp_path, monkeypatch):
+    """Test rotasi --keep menyimpan rantai penuh + inkremental utuh, dan rantai yang hilang dimulai ulang."""
+    import io
+    from datetime import datetime
+    from my_app import backup
+    from my_app.models import User
+
+    # Beberapa backup dalam detik yang sama: beri nomor agar nama file tidak bentrok
+    numbers = iter(range(100))
+    filename = backup.backup_filename
+    monkeypatch.setattr(backup, 'backup_filename',
+                        lambda school, kind, when=None: filename(school, kind).replace('.zip', f'_{next(numbers)}.zip'))
+
+    with app.app_context():
+        school = School(name="Sekolah Rantai", address="Test Address")
+        user = User(username="rantai_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="10A", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        student = Student(name="Siswa Rantai", nis="6001", school_id=school.id, classroom_id=classroom.id)
+        db.session.add(student)
+        db.session.commit()
+        school_id, student_id = school.id, student.id
+
+    runner = app.test_cli_runner()
+    out_dir = str(tmp_path)
+    school_dir = os.path.join(out_dir, f"school_{school_id}")
+
+    def run_backup(*extra):
+        result = runner.invoke(args=['backup-all', '--out', out_dir, '--school', str(school_id), '--keep', '1', *extra])
+        assert result.exit_code == 0, result.output
+
+    for day in range(1, 4):
+        with app.app_context():
+            db.session.add(Violation(description=f"Hari {day}", points=5, date_posted=datetime(2024, 8, day),
+                                     student_id=student_id))
+            db.session.commit()
+        run_backup(*(['--incremental'] if day > 1 else []))
+
+    # Backup penuh dan inkremental pertama masih dibutuhkan file terbaru
+    files = sorted(os.listdir(school_dir))
+    assert len(files) == 3
+
+    with app.app_context():
+        Violation.query.delete()
+        db.session.commit()
+    client.post('/login', data={'username': 'rantai_user', 'password': 'pass123'})
+    uploads = [(io.BytesIO(open(os.path.join(school_dir, name), 'rb').read()), name) for name in files]
+    response = client.post('/settings/restore', data={'backup_file': uploads}, content_type='multipart/form-data',
+                           follow_redirects=True)
+    assert 'Rantai backup tidak lengkap' not in response.get_data(as_text=True)
+    with app.app_context():
+        assert sorted(v.description for v in Violation.query) == ["Hari 1", "Hari 2", "Hari 3"]
+
+    # Backup penuh baru memulai rantai baru; rantai lama dirotasi seluruhnya
+    run_backup()
+    assert len(os.listdir(school_dir)) == 1
+
+    # File rantai hilang: backup --incremental otomatis menjadi backup penuh
+    for name in os.listdir(school_dir):
+        os.remove(os.path.join(school_dir, name))
+    run_backup('--incremental')
+    with app.app_context():
+        latest = backup.last_snapshot(school_id)
+        assert latest.kind == 'full' and latest.parent_id is None
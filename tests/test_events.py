@@ -0,0 +1,80 @@
+import threading
+
+from my_app import events
+from my_app.models import User, School, Classroom, Student
+from my_app.extensions import db
+
+
+def test_memory_broker_resume_from_last_id():
+    broker = events.MemoryBroker()
+    broker.publish(1, events.VIOLATION_ADDED, {'id': 10})
+    broker.publish(2, events.VIOLATION_ADDED, {'id': 20})
+    broker.publish(1, events.VIOLATION_DELETED, {'id': 10})
+
+    stream = broker.listen(1, last_event_id='0')
+    first, second = next(stream), next(stream)
+    assert (first[1], first[2]) == (events.VIOLATION_ADDED, {'id': 10})
+    assert (second[1], second[2]) == (events.VIOLATION_DELETED, {'id': 10})
+
+    # Klien yang tersambung ulang hanya menerima event setelah ID terakhir
+    stream = broker.listen(1, last_event_id=first[0], timeout=0.05)
+    assert next(stream)[2] == {'id': 10}
+    assert next(stream) is None
+
+
+def test_memory_broker_wakes_listener():
+    broker = events.MemoryBroker()
+    stream = broker.listen(5, timeout=5)
+    timer = threading.Timer(0.05, broker.publish, args=(5, events.VIOLATION_ADDED, {'id': 1}))
+    timer.start()
+    assert next(stream)[2] == {'id': 1}
+    timer.join()
+
+
+def test_file_broker_shared_between_instances(tmp_path):
+    # Dua instance mewakili dua worker yang berbeda
+    publisher = events.FileBroker(str(tmp_path))
+    subscriber = events.FileBroker(str(tmp_path))
+    publisher.publish(3, events.VIOLATION_ADDED, {'id': 1})
+
+    stream = subscriber.listen(3, timeout=0.5)
+    publisher.publish(3, events.VIOLATION_REMITTED, {'id': 1})
+    event_id, event_type, data = next(stream)
+    assert (event_type, data) == (events.VIOLATION_REMITTED, {'id': 1})
+
+    publisher.publish(3, events.VIOLATION_DELETED, {'id': 1})
+    resumed = subscriber.listen(3, last_event_id=event_id, timeout=0.5)
+    assert next(resumed)[1] == events.VIOLATION_DELETED
+
+
+def test_event_stream_endpoint(client, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'EVENT_STREAM_TIMEOUT', 0)
+    # Broker baru agar event dari test lain (ID sekolah bisa sama) tidak ikut terbaca
+    monkeypatch.setitem(events._brokers, app, events.MemoryBroker())
+    with app.app_context():
+        school = School(name="Test School Live", address="Test Address")
+        user = User(username="live_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="9L", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        db.session.add(Student(name="Siswa Live", nis="8001", school_id=school.id, classroom_id=classroom.id))
+        db.session.commit()
+
+    client.post('/login', data={'username': 'live_user', 'password': 'pass123'})
+    client.post('/add_violation', data={
+        'kelas': '9L',
+        'nama_murid': 'Siswa Live',
+        'deskripsi': 'Ramai di kelas',
+        'tanggal_kejadian': '25/02/2026',
+    })
+
+    response = client.get('/events?last_id=0')
+    assert response.mimetype == 'text/event-stream'
+    body = response.get_data(as_text=True)
+    assert 'event: violation_added' in body
+    assert '"student_name":"Siswa Live"' in body
+    assert '"class_name":"9L"' in body
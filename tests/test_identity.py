@@ -0,0 +1,86 @@
+from flask import g
+from sqlalchemy import event
+
+from my_app import identity
+from my_app.models import User, School
+from my_app.extensions import db
+
+
+def _setup_admin(app, username):
+    with app.app_context():
+        school = School(name=f"Sekolah {username}", address="Test Address")
+        user = User(username=username, role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.commit()
+        return user.id, school.id
+
+
+def _request(client, method, path, **kwargs):
+    # Fixture app menahan satu app context untuk semua request, sehingga current_user
+    # yang tersimpan di g ikut terbawa; buang agar load_user benar-benar dipanggil
+    g.pop('_login_user', None)
+    return client.open(path, method=method, **kwargs)
+
+
+def _count_user_queries(app):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if 'FROM users' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+
+def test_identity_cache_skips_user_query(client, app, monkeypatch):
+    monkeypatch.setitem(identity._caches, app, identity.IdentityCache(ttl=60, max_size=10))
+    _setup_admin(app, 'identitas_user')
+    _request(client, 'POST', '/login', data={'username': 'identitas_user', 'password': 'pass123'})
+    assert _request(client, 'GET', '/').status_code == 200
+
+    statements, stop = _count_user_queries(app)
+    try:
+        assert _request(client, 'GET', '/').status_code == 200
+        assert _request(client, 'GET', '/settings').status_code == 200
+    finally:
+        stop()
+    # /settings sendiri menampilkan daftar anggota; load_user tidak boleh query lagi
+    assert not any('users.id = ?' in s for s in statements)
+
+
+def test_school_update_invalidates_cached_school(client, app, monkeypatch):
+    monkeypatch.setitem(identity._caches, app, identity.IdentityCache(ttl=60, max_size=10))
+    _setup_admin(app, 'identitas_sekolah')
+    _request(client, 'POST', '/login', data={'username': 'identitas_sekolah', 'password': 'pass123'})
+    _request(client, 'GET', '/')
+
+    _request(client, 'POST', '/settings/update_school', data={'name': 'Nama Sekolah Baru', 'address': 'Alamat'})
+    assert 'Nama Sekolah Baru' in _request(client, 'GET', '/settings').get_data(as_text=True)
+
+
+def test_password_reset_ends_other_sessions(app, monkeypatch):
+    monkeypatch.setitem(identity._caches, app, identity.IdentityCache(ttl=60, max_size=10))
+    user_id, _ = _setup_admin(app, 'identitas_reset')
+    admin, other = app.test_client(), app.test_client()
+    for client in (admin, other):
+        _request(client, 'POST', '/login', data={'username': 'identitas_reset', 'password': 'pass123'})
+        assert _request(client, 'GET', '/').status_code == 200
+
+    _request(admin, 'POST', '/settings/edit_member', data={'user_id': user_id, 'password': 'baru456'})
+
+    # Sesi yang mengganti password tetap login, sesi lain harus login ulang
+    assert _request(admin, 'GET', '/').status_code == 200
+    assert _request(other, 'GET', '/').status_code == 302
+
+
+def test_session_without_credential_version_must_login_again(client, app):
+    user_id, _ = _setup_admin(app, 'identitas_lama')
+    with client.session_transaction() as sess:
+        # Format sesi lama: hanya ID user, tanpa ":<credential_version>"
+        sess['_user_id'] = str(user_id)
+        sess['_fresh'] = True
+    assert _request(client, 'GET', '/').status_code == 302
+    assert identity.load_user(str(user_id)) is None
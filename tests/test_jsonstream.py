@@ -0,0 +1,64 @@
+import io
+import json
+
+import pytest
+
+from my_app import jsonstream
+
+
+def test_iter_object_streams_array_items_across_chunks():
+    """Test pembaca JSON bertahap menghasilkan data yang sama dengan json.loads meski buffer kecil."""
+    data = {
+        "school": {"name": "Sekolah \"Stream\"", "logo": None},
+        "backup": {"type": "full", "until": "2026-01-01T00:00:00"},
+        "students": [{"name": f"Siswa {i}", "nis": str(1000 + i), "violations": [{"points": 12345}]}
+                     for i in range(50)],
+        "settings": {"members": [], "rules": [{"code": "Pasal 1", "ayats": []}]}
+    }
+    text = json.dumps(data, indent=4)
+
+    header = {}
+    students = []
+    for key, value in jsonstream.iter_object(io.StringIO(text), stream_keys=('students',), chunk_size=7):
+        # Blok baca sangat kecil agar token terpotong di batas buffer
+        if key == 'students':
+            students.extend(value)
+        else:
+            header[key] = value
+
+    assert students == data['students']
+    assert header == {k: v for k, v in data.items() if k != 'students'}
+
+
+def test_iter_object_skips_unconsumed_arrays():
+    """Test array streaming yang tidak dibaca pemanggil tetap dilewati dengan benar."""
+    text = json.dumps({"students": [1, 2, 3], "settings": {"a": 1}})
+    pairs = [(k, v) for k, v in jsonstream.iter_object(io.StringIO(text), stream_keys=('students',))]
+    assert pairs[1] == ("settings", {"a": 1})
+
+
+class _CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+def test_large_value_parsed_without_rereading_every_chunk():
+    """Test nilai besar dibaca dengan buffer yang tumbuh berlipat, bukan satu parse ulang per chunk."""
+    big = {"violations": [{"description": "x" * 50} for _ in range(2000)]}
+    fp = _CountingReader(json.dumps({"students": [big]}))
+    items = [list(v) for _, v in jsonstream.iter_object(fp, stream_keys=('students',), chunk_size=64)]
+    assert items == [[big]]
+    assert fp.reads < 20
+
+
+def test_malformed_value_is_bounded():
+    """Test nilai yang tidak pernah selesai berhenti di batas ukuran, tidak membaca seluruh file."""
+    fp = _CountingReader('{"school": "' + "x" * 100000)
+    with pytest.raises(ValueError, match="melebihi"):
+        list(jsonstream.iter_object(fp, chunk_size=64, max_value_size=1000))
+    assert fp.tell() < 5000
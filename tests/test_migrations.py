@@ -0,0 +1,74 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade, downgrade
+from sqlalchemy import inspect, text
+
+from my_app import create_app
+from my_app.config import TestConfig
+from my_app.extensions import db
+
+
+def _file_app(tmp_path):
+    class MigrationConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'migrasi.db'}"
+
+    return create_app(MigrationConfig)
+
+
+def test_migrations_match_models(tmp_path):
+    """flask db upgrade menghasilkan skema yang sama persis dengan models.py."""
+    app = _file_app(tmp_path)
+    with app.app_context():
+        upgrade()
+        with db.engine.connect() as conn:
+            diff = compare_metadata(MigrationContext.configure(conn), db.metadata)
+        assert diff == []
+
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('violations')}
+        assert 'ix_violations_student_date' in indexes
+        assert 'ix_violations_student_id' not in indexes
+
+
+def test_migrations_downgrade_to_base(tmp_path):
+    app = _file_app(tmp_path)
+    with app.app_context():
+        upgrade()
+        downgrade(revision='base')
+        assert inspect(db.engine).get_table_names() == ['alembic_version']
+
+
+def test_category_id_backfilled_from_snapshot(tmp_path):
+    """Pelanggaran lama mendapat category_id dari nama kategori di sekolah yang sama."""
+    app = _file_app(tmp_path)
+    with app.app_context():
+        upgrade(revision='0ae0e73872ce')
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO schools (id, name, data_version) VALUES (1, 'A', 0), (2, 'B', 0)"))
+            conn.execute(text("INSERT INTO violation_categories (id, name, points, school_id) "
+                              "VALUES (1, 'Ringan', 5, 1), (2, 'Ringan', 5, 2)"))
+            conn.execute(text("INSERT INTO students (id, name, nis, school_id) VALUES (1, 'X', '1', 1), (2, 'Y', '2', 2)"))
+            conn.execute(text("INSERT INTO violations (description, points, date_posted, student_id, kategori_pelanggaran) "
+                              "VALUES ('a', 5, '2026-01-01', 1, 'Ringan'), ('b', 5, '2026-01-01', 2, 'Ringan'), "
+                              "('c', 0, '2026-01-01', 1, 'Umum')"))
+        upgrade()
+        with db.engine.connect() as conn:
+            rows = conn.execute(text("SELECT description, category_id FROM violations ORDER BY description")).all()
+        assert [tuple(row) for row in rows] == [('a', 1), ('b', 2), ('c', None)]
+
+
+def test_baseline_database_upgrades(tmp_path):
+    """Database dari db.create_all() versi awal (revisi initial schema) bisa di-upgrade ke head."""
+    app = _file_app(tmp_path)
+    with app.app_context():
+        upgrade(revision='7f9396a4bd63')
+        assert 'archived_violations' not in inspect(db.engine).get_table_names()
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO schools (id, name) VALUES (1, 'A')"))
+            conn.execute(text("INSERT INTO students (id, name, nis, school_id) VALUES (1, 'X', '1', 1)"))
+            conn.execute(text("INSERT INTO violations (id, description, points, date_posted, student_id) "
+                              "VALUES (1, 'a', 5, '2026-01-01', 1)"))
+            conn.execute(text("INSERT INTO violation_photos (filename, violation_id) VALUES ('bukti_1.jpg', 1)"))
+        upgrade()
+        with db.engine.connect() as conn:
+            assert conn.execute(text("SELECT kind FROM violation_photos")).scalar() == 'bukti'
+            assert conn.execute(text("SELECT data_version FROM schools")).scalar() == 0
@@ -0,0 +1,58 @@
+from sqlalchemy import insert, select
+
+from my_app import create_app
+from my_app.config import TestConfig
+from my_app.extensions import db
+from my_app.models import User, School, Classroom, Student, Violation
+
+
+def test_read_only_routes_use_replica(tmp_path, monkeypatch):
+    """Dua file SQLite sebagai primary dan replika: halaman baca ke replika, tulis ke primary."""
+    # init_app mendaftarkan metadata untuk setiap bind di objek db global; jangan bocor ke test lain
+    monkeypatch.setattr(db, 'metadatas', dict(db.metadatas))
+
+    class ReplicaConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_BINDS = {'replica': f"sqlite:///{tmp_path / 'replica.db'}"}
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        replica = db.engines['replica']
+        db.create_all()
+        db.metadata.create_all(replica)
+
+        school = School(name="Sekolah Replika", address="Test Address")
+        user = User(username="replika_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="9A", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        student = Student(name="Siswa Replika", nis="9001", school_id=school.id, classroom_id=classroom.id)
+        db.session.add(student)
+        db.session.commit()
+
+        # Salin data ke replika, lalu beri replika satu pelanggaran yang tidak ada di primary
+        with replica.begin() as conn:
+            for model in (School, User, Classroom, Student):
+                rows = [dict(row._mapping) for row in db.session.execute(select(model.__table__))]
+                conn.execute(insert(model.__table__), rows)
+            conn.execute(insert(Violation.__table__), [{
+                'description': 'Hanya di replika', 'points': 5, 'student_id': student.id,
+                'kategori_pelanggaran': 'Ringan',
+            }])
+        student_id = student.id
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'replika_user', 'password': 'pass123'})
+    assert 'Hanya di replika' in client.get(f'/student/{student_id}').get_data(as_text=True)
+    assert client.get('/api/v1/violations').get_json()['items'] == []
+
+    client.post('/classes', data={'class_name': '9B'})
+    with app.app_context():
+        assert db.session.query(Classroom).filter_by(name='9B').count() == 1
+        with db.engines['replica'].connect() as conn:
+            names = conn.execute(select(Classroom.__table__.c.name)).scalars().all()
+        assert names == ['9A']
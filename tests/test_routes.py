@@ -1,6 +1,7 @@
-from my_app.models import User, School, ViolationRule, Ayat, Classroom, Student, ViolationCategory, Violation
+from my_app.models import User, School, ViolationRule, Ayat, Classroom, Student, ViolationCategory, Violation, ViolationPhoto, ArchivedViolation
 from my_app.extensions import db
-from datetime import datetime
+from my_app import archive, trash
+from datetime import datetime, timedelta
 import json
 
 def test_home_page(client):
@@ -249,4 +250,543 @@ def test_add_violation_with_ayats(client, app):
         violation = violations[0]
         assert len(violation.ayats) == 2
         assert any(a.number == "1" for a in violation.ayats)
-        assert any(a.number == "2" for a in violation.ayats)
\ No newline at end of file
+        assert any(a.number == "2" for a in violation.ayats)
+
+# ===== TESTS UNTUK KENAIKAN KELAS MASSAL =====
+
+def test_promote_classes_preview_and_apply(client, app):
+    """Test kenaikan kelas berantai X -> XI -> XII dan kelulusan dalam satu proses."""
+    with app.app_context():
+        school = School(name="Test School Promosi", address="Test Address")
+        user = User(username="promosi_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+
+        kelas_x = Classroom(name="X", school_id=school.id)
+        kelas_xi = Classroom(name="XI", school_id=school.id)
+        kelas_xii = Classroom(name="XII", school_id=school.id)
+        db.session.add_all([kelas_x, kelas_xi, kelas_xii])
+        db.session.flush()
+
+        s_x = Student(name="Siswa X", nis="1001", school_id=school.id, classroom_id=kelas_x.id)
+        s_xi = Student(name="Siswa XI", nis="1002", school_id=school.id, classroom_id=kelas_xi.id)
+        s_xii = Student(name="Siswa XII", nis="1003", school_id=school.id, classroom_id=kelas_xii.id)
+        db.session.add_all([s_x, s_xi, s_xii])
+        db.session.commit()
+
+        ids = {'x': kelas_x.id, 'xi': kelas_xi.id, 'xii': kelas_xii.id}
+        student_ids = (s_x.id, s_xi.id, s_xii.id)
+
+    client.post('/login', data={'username': 'promosi_user', 'password': 'pass123'})
+
+    form = {
+        f"target_{ids['x']}": str(ids['xi']),
+        f"target_{ids['xi']}": str(ids['xii']),
+        f"target_{ids['xii']}": 'graduate',
+    }
+
+    # Pratinjau tidak boleh mengubah data
+    response = client.post('/classes/promote', data=dict(form, action='preview'))
+    assert response.status_code == 200
+    assert b'Pratinjau Kenaikan Kelas' in response.data
+    with app.app_context():
+        assert db.session.get(Student, student_ids[0]).classroom_id == ids['x']
+
+    response = client.post('/classes/promote', data=dict(form, action='apply'), follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        moved_x, moved_xi, graduated = (db.session.get(Student, sid) for sid in student_ids)
+        assert moved_x.classroom_id == ids['xi']
+        assert moved_xi.classroom_id == ids['xii']
+        assert graduated.classroom_id is None
+        assert graduated.graduated_at is not None
+
+
+
+# ===== TESTS UNTUK ARSIP TAHUN AJARAN =====
+
+def test_archive_old_violations(client, app):
+    """Test pelanggaran tahun ajaran lama dipindah ke arsip beserta foto dan ayat."""
+    with app.app_context():
+        school = School(name="Test School Arsip", address="Test Address")
+        user = User(username="arsip_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+
+        classroom = Classroom(name="10A", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        student = Student(name="Siswa Arsip", nis="2001", school_id=school.id, classroom_id=classroom.id)
+        rule = ViolationRule(code="Pasal A", description="Arsip", school_id=school.id)
+        db.session.add_all([student, rule])
+        db.session.flush()
+        ayat = Ayat(number="1", description="Ayat Arsip", rule_id=rule.id)
+        db.session.add(ayat)
+
+        old = Violation(description="Pelanggaran lama", points=5, date_posted=datetime(2020, 9, 1),
+                        student_id=student.id, kategori_pelanggaran="Ringan")
+        new = Violation(description="Pelanggaran baru", points=5, date_posted=datetime.utcnow(),
+                        student_id=student.id, kategori_pelanggaran="Ringan")
+        db.session.add_all([old, new])
+        db.session.flush()
+        old.ayats.append(ayat)
+        db.session.add(ViolationPhoto(filename="bukti_lama.jpg", violation_id=old.id))
+        db.session.commit()
+        student_id = student.id
+
+    client.post('/login', data={'username': 'arsip_user', 'password': 'pass123'})
+    response = client.post('/settings/archive', follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert [v.description for v in Violation.query.all()] == ["Pelanggaran baru"]
+        archived = ArchivedViolation.query.one()
+        assert archived.academic_year == "2020/2021"
+        assert [p.filename for p in archived.photos] == ["bukti_lama.jpg"]
+        assert [a.description for a in archived.ayats] == ["Ayat Arsip"]
+        # Tanpa mikrodetik, agar pemetaan batch tetap cocok di kolom DATETIME MySQL
+        assert archived.archived_at.microsecond == 0
+        assert ViolationPhoto.query.count() == 0
+
+    response = client.get(f'/student/{student_id}')
+    assert b'Pelanggaran lama' not in response.data
+    response = client.get(f'/student/{student_id}?arsip=1')
+    assert b'Pelanggaran lama' in response.data
+
+
+def test_archive_rejects_invalid_academic_year(client, app):
+    """Test tahun ajaran di luar jangkauan atau di masa depan ditolak tanpa mengarsipkan apa pun."""
+    with app.app_context():
+        school = School(name="Test School Arsip Tahun", address="Test Address")
+        user = User(username="arsip_tahun_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        student = Student(name="Siswa Arsip Tahun", nis="2101", school_id=school.id)
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(Violation(description="Pelanggaran berjalan", points=5, date_posted=datetime.utcnow(),
+                                 student_id=student.id))
+        db.session.commit()
+        next_year = archive.academic_year_start().year + 1
+
+    client.post('/login', data={'username': 'arsip_tahun_user', 'password': 'pass123'})
+    for year in ('0', '99999', str(next_year), 'abc'):
+        response = client.post('/settings/archive', data={'academic_year': year}, follow_redirects=True)
+        assert response.status_code == 200
+        assert 'Tahun ajaran tidak valid.' in response.get_data(as_text=True)
+    with app.app_context():
+        assert ArchivedViolation.query.count() == 0
+        assert Violation.query.count() == 1
+
+
+# ===== TESTS UNTUK BACKUP INKREMENTAL =====
+
+def test_incremental_backup_and_chained_restore(client, app):
+    """Test backup inkremental hanya berisi perubahan, dan restore base + delta berurutan."""
+    import io
+    import zipfile
+
+    with app.app_context():
+        school = School(name="Test School Backup", address="Test Address")
+        user = User(username="backup_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="10A", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        student = Student(name="Siswa Backup", nis="3001", school_id=school.id, classroom_id=classroom.id,
+                          updated_at=datetime(2020, 1, 1))
+        db.session.add(student)
+        db.session.flush()
+        db.session.add(Violation(description="Pelanggaran awal", points=5, date_posted=datetime(2024, 8, 1),
+                                 student_id=student.id, updated_at=datetime(2020, 1, 1)))
+        db.session.commit()
+        student_id = student.id
+
+    client.post('/login', data={'username': 'backup_user', 'password': 'pass123'})
+    full = client.get('/settings/backup').data
+
+    with app.app_context():
+        db.session.add(Violation(description="Pelanggaran baru", points=5, date_posted=datetime(2024, 9, 1),
+                                 student_id=student_id))
+        db.session.commit()
+
+    delta = client.get('/settings/backup?mode=incremental').data
+    with zipfile.ZipFile(io.BytesIO(delta)) as zf:
+        data = json.loads(zf.read('data.json'))
+    assert data['backup']['type'] == 'incremental'
+    assert [v['description'] for s in data['students'] for v in s['violations']] == ["Pelanggaran baru"]
+
+    # Hapus semua pelanggaran lalu pulihkan dari base + delta
+    with app.app_context():
+        Violation.query.delete()
+        db.session.commit()
+
+    response = client.post('/settings/restore', data={
+        'backup_file': [(io.BytesIO(delta), 'delta.zip'), (io.BytesIO(full), 'full.zip')]
+    }, content_type='multipart/form-data', follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        descriptions = sorted(v.description for v in Violation.query.all())
+        assert descriptions == ["Pelanggaran awal", "Pelanggaran baru"]
+
+
+def test_incremental_backup_carries_deletions(client, app):
+    """Test data yang dihapus setelah backup penuh ikut terhapus saat restore base + delta."""
+    import io
+    import zipfile
+
+    with app.app_context():
+        school = School(name="Test School Hapus", address="Test Address")
+        user = User(username="hapus_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="10B", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        kept = Student(name="Siswa Tetap", nis="3101", school_id=school.id, classroom_id=classroom.id)
+        gone = Student(name="Siswa Keluar", nis="3102", school_id=school.id, classroom_id=classroom.id)
+        db.session.add_all([kept, gone])
+        db.session.flush()
+        violation = Violation(description="Salah input", points=5, date_posted=datetime(2024, 8, 1),
+                              student_id=kept.id)
+        db.session.add(violation)
+        db.session.commit()
+        school_id, violation_id, gone_id = school.id, violation.id, gone.id
+
+    client.post('/login', data={'username': 'hapus_user', 'password': 'pass123'})
+    full = client.get('/settings/backup').data
+    client.post(f'/violation/delete/{violation_id}')
+    client.post(f'/student/delete/{gone_id}')
+
+    delta = client.get('/settings/backup?mode=incremental').data
+    with zipfile.ZipFile(io.BytesIO(delta)) as zf:
+        data = json.loads(zf.read('data.json'))
+    assert data['deleted'] == {
+        'classrooms': [],
+        'students': ['3102'],
+        'violations': [{'nis': '3101', 'date': '2024-08-01T00:00:00', 'description': 'Salah input'}],
+    }
+
+    # Base memulihkan data yang dihapus, delta menghapusnya lagi
+    response = client.post('/settings/restore', data={
+        'backup_file': [(io.BytesIO(full), 'full.zip'), (io.BytesIO(delta), 'delta.zip')]
+    }, content_type='multipart/form-data', follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert Violation.query.count() == 0
+        assert [s.nis for s in Student.query.filter_by(school_id=school_id)] == ['3101']
+        assert db.session.get(Violation, violation_id, execution_options={'include_deleted': True}).deleted_at
+
+
+def test_incremental_backup_overlaps_previous_watermark(client, app):
+    """Test baris yang di-flush sesaat sebelum watermark tetap ikut, dan tanggal remisi ikut dipulihkan."""
+    import io
+    import zipfile
+    from my_app import backup
+
+    with app.app_context():
+        school = School(name="Test School Margin", address="Test Address")
+        user = User(username="margin_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        student = Student(name="Siswa Margin", nis="3201", school_id=school.id)
+        db.session.add(student)
+        db.session.flush()
+        violation = Violation(description="Terlambat", points=5, date_posted=datetime(2024, 8, 1),
+                              student_id=student.id)
+        db.session.add(violation)
+        db.session.commit()
+        school_id, violation_id = school.id, violation.id
+
+    client.post('/login', data={'username': 'margin_user', 'password': 'pass123'})
+    full = client.get('/settings/backup').data
+
+    # Remisi di-flush sebelum watermark backup penuh, tetapi baru di-commit setelahnya
+    remission_date = datetime(2024, 9, 1, 7, 30)
+    with app.app_context():
+        until = backup.last_snapshot(school_id).until
+        violation = db.session.get(Violation, violation_id)
+        violation.is_remitted = True
+        violation.remission_reason = "Perbaikan sikap"
+        violation.remission_date = remission_date
+        violation.updated_at = until - timedelta(seconds=1)
+        db.session.commit()
+
+    delta = client.get('/settings/backup?mode=incremental').data
+    with zipfile.ZipFile(io.BytesIO(delta)) as zf:
+        data = json.loads(zf.read('data.json'))
+    assert [v['description'] for s in data['students'] for v in s['violations']] == ["Terlambat"]
+
+    # Base masih tanpa remisi; delta memulihkan status, alasan dan tanggal remisi
+    with app.app_context():
+        violation = db.session.get(Violation, violation_id)
+        violation.is_remitted, violation.remission_reason, violation.remission_date = False, None, None
+        db.session.commit()
+    client.post('/settings/restore', data={
+        'backup_file': [(io.BytesIO(full), 'full.zip'), (io.BytesIO(delta), 'delta.zip')]
+    }, content_type='multipart/form-data')
+    with app.app_context():
+        violation = db.session.get(Violation, violation_id)
+        assert (violation.is_remitted, violation.remission_reason, violation.remission_date) == (
+            True, "Perbaikan sikap", remission_date)
+
+
+# ===== TESTS UNTUK PENYIMPANAN FOTO BERBASIS HASH =====
+
+def _sample_image():
+    import io
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64), color=(200, 30, 30)).save(buffer, format='PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def test_duplicate_photos_stored_once(client, app, tmp_path, monkeypatch):
+    """Test foto yang sama untuk dua pelanggaran hanya disimpan sekali dan dibersihkan GC saat tidak dirujuk."""
+    import os
+    import time
+    from my_app import storage
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+
+    with app.app_context():
+        school = School(name="Test School Foto", address="Test Address")
+        user = User(username="foto_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="10A", school_id=school.id)
+        db.session.add(classroom)
+        db.session.flush()
+        db.session.add(Student(name="Siswa Foto", nis="4001", school_id=school.id, classroom_id=classroom.id))
+        db.session.commit()
+
+    client.post('/login', data={'username': 'foto_user', 'password': 'pass123'})
+    for description in ("Kejadian pertama", "Kejadian kedua"):
+        client.post('/add_violation', data={
+            'kelas': '10A',
+            'nama_murid': 'Siswa Foto',
+            'deskripsi': description,
+            'tanggal_kejadian': '25/02/2026',
+            'bukti_file': (_sample_image(), 'bukti.png')
+        }, content_type='multipart/form-data')
+
+    with app.app_context():
+        photos = ViolationPhoto.query.all()
+        assert len(photos) == 2
+        assert photos[0].filename == photos[1].filename
+        filename = photos[0].filename
+        violation_ids = [p.violation_id for p in photos]
+    assert os.path.exists(os.path.join(tmp_path, filename))
+
+    response = client.get(f'/uploads/{filename}')
+    assert response.status_code == 200
+    assert 'immutable' in response.headers['Cache-Control']
+    response.close()
+
+    client.post(f'/violation/delete/{violation_ids[0]}')
+    assert os.path.exists(os.path.join(tmp_path, filename))
+    client.post(f'/violation/delete/{violation_ids[1]}')
+    # Hapus lunak: file baru dilepas saat purge
+    assert os.path.exists(os.path.join(tmp_path, filename))
+    path = os.path.join(tmp_path, filename)
+    with app.app_context():
+        trash.purge(datetime.utcnow() + timedelta(seconds=1))
+        # Purge tidak menghapus file; upload ulang isi yang sama menyegarkan mtime sehingga GC melewatinya
+        assert os.path.exists(path)
+        os.utime(path, (0, 0))
+        with open(path, 'rb') as f:
+            assert storage.save_bytes(f.read()) == filename
+        assert storage.collect_garbage(str(tmp_path), delete=True) == ([], 0)
+        orphans, _ = storage.collect_garbage(str(tmp_path), delete=True, now=time.time() + 7200)
+    assert orphans == [filename]
+    assert not os.path.exists(path)
+
+# ===== TESTS UNTUK INPUT PELANGGARAN KELOMPOK =====
+
+def test_add_violation_batch(client, app, tmp_path, monkeypatch):
+    """Test satu input pelanggaran untuk beberapa siswa sekaligus."""
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+
+    with app.app_context():
+        school = School(name="Test School Kelompok", address="Test Address")
+        user = User(username="kelompok_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="11B", school_id=school.id)
+        rule = ViolationRule(code="Pasal K", description="Kelompok", school_id=school.id)
+        category = ViolationCategory(name="Berat", points=30, school_id=school.id)
+        db.session.add_all([classroom, rule, category])
+        db.session.flush()
+        students = [Student(name=f"Siswa K{i}", nis=f"500{i}", school_id=school.id, classroom_id=classroom.id) for i in range(3)]
+        ayat = Ayat(number="1", description="Tawuran", rule_id=rule.id)
+        db.session.add_all(students + [ayat])
+        db.session.commit()
+        chosen_ids = [students[0].id, students[2].id]
+        rule_id, ayat_id, category_id = rule.id, ayat.id, category.id
+
+    client.post('/login', data={'username': 'kelompok_user', 'password': 'pass123'})
+    response = client.get('/api/students/11B?detail=1')
+    assert [s['name'] for s in response.get_json()] == ["Siswa K0", "Siswa K1", "Siswa K2"]
+
+    response = client.post('/add_violation', data={
+        'kelas': '11B',
+        'student_ids': [str(s_id) for s_id in chosen_ids],
+        'deskripsi': 'Tawuran di kantin',
+        'pasal_id': rule_id,
+        'ayat_ids': [ayat_id],
+        'kategori_id': str(category_id),
+        'tanggal_kejadian': '25/02/2026',
+        'jam_kejadian': '09:30',
+        'bukti_file': (_sample_image(), 'bukti.png')
+    }, content_type='multipart/form-data', follow_redirects=True)
+    assert response.status_code == 200
+
+    with app.app_context():
+        violations = Violation.query.filter_by(description='Tawuran di kantin').all()
+        assert sorted(v.student_id for v in violations) == sorted(chosen_ids)
+        assert all(v.points == 30 and len(v.ayats) == 1 for v in violations)
+        photos = ViolationPhoto.query.filter(ViolationPhoto.violation_id.in_([v.id for v in violations])).all()
+        assert len(photos) == 2
+        assert len({p.filename for p in photos}) == 1
+
+
+def test_logo_upload_creates_cacheable_favicon(client, app, tmp_path, monkeypatch):
+    """Test upload logo membuat ikon kecil berbasis hash yang di-cache lama oleh browser."""
+    import os
+    from PIL import Image
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+
+    with app.app_context():
+        school = School(name="Test School Logo", address="Test Address")
+        user = User(username="logo_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.commit()
+
+    client.post('/login', data={'username': 'logo_user', 'password': 'pass123'})
+    client.post('/settings/update_school', data={
+        'name': 'Test School Logo',
+        'logo': (_sample_image(), 'logo.png')
+    }, content_type='multipart/form-data')
+
+    with app.app_context():
+        icon = School.query.filter_by(name="Test School Logo").first().icon
+    assert icon and icon.endswith('.png')
+    with Image.open(os.path.join(tmp_path, icon)) as image:
+        assert image.size == (96, 96)
+
+    response = client.get('/favicon.ico')
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith(f'/uploads/{icon}')
+
+    response = client.get(f'/uploads/{icon}')
+    assert response.status_code == 200
+    assert response.cache_control.immutable and response.cache_control.max_age >= 86400
+    etag = response.headers['ETag']
+    response.close()
+    assert client.get(f'/uploads/{icon}', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_statistics_group_by_category_id(client, app):
+    """Statistik kategori dikelompokkan per category_id; ganti nama tidak memecah data, hapus memakai snapshot."""
+    from my_app import cache
+    from my_app.views.dashboard import _category_counts
+
+    with app.app_context():
+        school = School(name="Test School Kategori", address="Test Address")
+        user = User(username="kategori_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="8C", school_id=school.id)
+        ringan = ViolationCategory(name="Ringan", points=5, school_id=school.id)
+        berat = ViolationCategory(name="Berat", points=30, school_id=school.id)
+        db.session.add_all([classroom, ringan, berat])
+        db.session.flush()
+        db.session.add(Student(name="Siswa Kategori", nis="6001", school_id=school.id, classroom_id=classroom.id))
+        db.session.commit()
+        school_id, ringan_id, berat_id = school.id, ringan.id, berat.id
+
+    client.post('/login', data={'username': 'kategori_user', 'password': 'pass123'})
+    for description, category_id in (('Terlambat', ringan_id), ('Berkelahi', berat_id), ('Lain-lain', '')):
+        client.post('/add_violation', data={
+            'kelas': '8C', 'nama_murid': 'Siswa Kategori', 'deskripsi': description,
+            'kategori_id': category_id, 'tanggal_kejadian': '25/02/2026',
+        })
+
+    with app.app_context():
+        assert Violation.query.filter_by(description='Terlambat').one().category_id == ringan_id
+        ViolationCategory.query.get(ringan_id).name = "Ringan Sekali"
+        cache.bump_data_version(school_id)
+        db.session.commit()
+    client.post('/settings/categories', data={'action': 'delete', 'cat_id': berat_id})
+
+    with app.app_context():
+        assert Violation.query.filter_by(description='Berkelahi').one().kategori_pelanggaran == 'Berat'
+        assert _category_counts(school_id) == {'Ringan Sekali': 1, 'Berat': 1, 'Umum': 1}
+
+    html = client.get(f'/?category={ringan_id}').get_data(as_text=True)
+    assert 'Terlambat' in html and 'Berkelahi' not in html
+
+def test_class_pages_use_grouped_counts(client, app):
+    """Daftar kelas dan detail kelas menampilkan jumlah pelanggaran dari satu query agregat."""
+    from sqlalchemy import event
+
+    with app.app_context():
+        school = School(name="Test School Roster", address="Test Address")
+        user = User(username="roster_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        classroom = Classroom(name="9Z", school_id=school.id)
+        db.session.add_all([classroom, Classroom(name="9Y", school_id=school.id)])
+        db.session.flush()
+        students = [Student(name=f"Siswa {i:02d}", nis=f"95{i:02d}", school_id=school.id, classroom_id=classroom.id)
+                    for i in range(40)]
+        db.session.add_all(students)
+        db.session.flush()
+        db.session.add_all([Violation(description="Terlambat", points=5, student_id=students[0].id),
+                            Violation(description="Bolos", points=10, student_id=students[0].id)])
+        db.session.commit()
+        class_id = classroom.id
+
+    client.post('/login', data={'username': 'roster_user', 'password': 'pass123'})
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if 'FROM students' in statement or 'FROM violations' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        html = client.get(f'/classes/{class_id}').get_data(as_text=True)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+    assert len(statements) == 1
+    assert '40 Siswa' in html and html.index('Siswa 00') < html.index('Siswa 39')
+
+    html = client.get('/classes').get_data(as_text=True)
+    assert '40 Siswa Terdaftar' in html and '2 Pelanggaran' in html and '0 Siswa Terdaftar' in html
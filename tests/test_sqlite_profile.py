@@ -0,0 +1,57 @@
+import threading
+
+from sqlalchemy import text
+
+from my_app import create_app
+from my_app.config import TestConfig
+from my_app.extensions import db
+from my_app.models import User, School, Classroom
+
+
+def _file_app(tmp_path, **overrides):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'sekolah.db'}"
+
+    for key, value in overrides.items():
+        setattr(FileConfig, key, value)
+    app = create_app(FileConfig)
+    with app.app_context():
+        db.create_all()
+        school = School(name="Sekolah SQLite", address="Test Address")
+        user = User(username="sqlite_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.commit()
+    return app
+
+
+def test_sqlite_pragmas_applied(tmp_path):
+    app = _file_app(tmp_path)
+    with app.app_context():
+        assert db.session.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(text('PRAGMA synchronous')).scalar() == 1   # NORMAL
+        assert db.session.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_concurrent_writes_do_not_lock(tmp_path):
+    app = _file_app(tmp_path)
+    errors = []
+
+    def worker(index):
+        client = app.test_client()
+        client.post('/login', data={'username': 'sqlite_user', 'password': 'pass123'})
+        for n in range(5):
+            response = client.post('/classes', data={'class_name': f'K{index}-{n}'})
+            if response.status_code != 302:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with app.app_context():
+        assert Classroom.query.count() == 30
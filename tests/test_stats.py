@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta
+
+from my_app import stats
+from my_app.extensions import db
+from my_app.models import User, School, Classroom, Student, ViolationCategory
+
+
+def test_bucket_index_week_and_month():
+    # 1 Jan 2026 hari Kamis: minggu pertama dimulai Senin 29 Des 2025
+    weeks = stats.bucket_starts(date(2026, 1, 1), date(2026, 1, 20), stats.GRANULARITY_WEEK)
+    assert weeks == [date(2025, 12, 29), date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19)]
+    months = stats.bucket_starts(date(2025, 11, 15), date(2026, 2, 1), stats.GRANULARITY_MONTH)
+    assert months == [date(2025, 11, 1), date(2025, 12, 1), date(2026, 1, 1), date(2026, 2, 1)]
+    assert stats.bucket_index(date(2026, 2, 28), months[0], stats.GRANULARITY_MONTH) == 3
+
+
+def test_trend_endpoint_dense_series(client, app):
+    today = datetime.utcnow().date()
+    with app.app_context():
+        school = School(name="Sekolah Tren", address="Test Address")
+        user = User(username="tren_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        kelas_a = Classroom(name="7A", school_id=school.id)
+        kelas_b = Classroom(name="7B", school_id=school.id)
+        ringan = ViolationCategory(name="Ringan", points=5, school_id=school.id)
+        db.session.add_all([kelas_a, kelas_b, ringan])
+        db.session.flush()
+        db.session.add_all([
+            Student(name="Citra", nis="8001", school_id=school.id, classroom_id=kelas_a.id),
+            Student(name="Dedi", nis="8002", school_id=school.id, classroom_id=kelas_b.id),
+        ])
+        db.session.commit()
+        ringan_id = ringan.id
+
+    client.post('/login', data={'username': 'tren_user', 'password': 'pass123'})
+    for kelas, nama, category_id, day in (('7A', 'Citra', ringan_id, today), ('7A', 'Citra', '', today),
+                                          ('7B', 'Dedi', ringan_id, today - timedelta(days=3))):
+        client.post('/add_violation', data={
+            'kelas': kelas, 'nama_murid': nama, 'deskripsi': 'Test tren',
+            'kategori_id': category_id, 'tanggal_kejadian': day.strftime('%d/%m/%Y'),
+        })
+
+    series = client.get('/statistics/trend?range=7d').get_json()
+    assert len(series['labels']) == len(series['total']) == 8
+    assert series['total'][-1] == 2 and series['total'][-4] == 1 and sum(series['total']) == 3
+    assert [(s['label'], sum(s['data'])) for s in series['by_category']] == [('Ringan', 2), (stats.NO_CATEGORY, 1)]
+    assert [(s['label'], s['data'][-1]) for s in series['by_class']] == [('7A', 2), ('7B', 0)]
+
+    monthly = client.get('/statistics/trend?range=365d&granularity=month').get_json()
+    assert sum(monthly['total']) == 3 and monthly['buckets'][-1] == today.replace(day=1).isoformat()
+
+    assert client.get('/statistics/trend?granularity=year').status_code == 400
+    assert client.get('/statistics/trend?start=2026-03-01&end=2020-01-01').status_code == 400
+    assert client.get('/statistics?trend_range=365d').status_code == 200
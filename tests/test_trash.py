@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+
+from my_app.extensions import db
+from my_app.models import (User, School, Classroom, Student, Violation, ViolationCategory, ViolationRule, Ayat,
+                           Tombstone, violation_ayats)
+
+
+def _setup_school(app):
+    with app.app_context():
+        school = School(name="Sekolah Terhapus", address="Test Address")
+        user = User(username="terhapus_user", role="school_admin")
+        user.set_password("pass123")
+        user.school = school
+        db.session.add_all([school, user])
+        db.session.flush()
+        kelas = Classroom(name="8A", school_id=school.id)
+        berat = ViolationCategory(name="Berat", points=30, school_id=school.id)
+        db.session.add_all([kelas, berat])
+        db.session.flush()
+        db.session.add_all([
+            Student(name="Citra", nis="8001", school_id=school.id, classroom_id=kelas.id),
+            Student(name="Dodi", nis="8002", school_id=school.id, classroom_id=kelas.id),
+        ])
+        db.session.commit()
+        return school.id, kelas.id, berat.id
+
+
+def test_delete_violation_is_hidden_and_undo_restores_it(client, app):
+    school_id, _, berat_id = _setup_school(app)
+    client.post('/login', data={'username': 'terhapus_user', 'password': 'pass123'})
+    client.post('/add_violation', data={'kelas': '8A', 'nama_murid': 'Citra', 'deskripsi': 'Bolos upacara',
+                                        'kategori_id': berat_id, 'tanggal_kejadian': '02/03/2026'})
+    with app.app_context():
+        citra = Student.query.filter_by(nis="8001").one()
+        student_id, violation_id = citra.id, citra.violations[0].id
+        assert citra.poin == 70
+
+    page = client.post(f'/violation/delete/{violation_id}', follow_redirects=True).get_data(as_text=True)
+    assert 'Urungkan' in page and 'Bolos upacara' not in page
+    with app.app_context():
+        # Semua query ORM melewati baris terhapus; saldo kembali, klien sinkron menerima tombstone
+        assert Violation.query.count() == 0
+        assert db.session.get(Student, student_id).poin == 100
+        assert Tombstone.query.filter_by(entity='violation', entity_id=violation_id).count() == 1
+        assert db.session.get(Violation, violation_id, execution_options={'include_deleted': True}).deleted_at is not None
+    assert 'Bolos upacara' in client.get('/trash').get_data(as_text=True)
+
+    client.post(f'/trash/violation/{violation_id}/restore')
+    with app.app_context():
+        assert db.session.get(Violation, violation_id).deleted_at is None
+        assert db.session.get(Student, student_id).poin == 70
+        assert Tombstone.query.count() == 0
+    assert 'Bolos upacara' in client.get(f'/student/{student_id}').get_data(as_text=True)
+
+
+def test_restore_order_and_recreated_class_name(client, app):
+    _, kelas_id, _ = _setup_school(app)
+    client.post('/login', data={'username': 'terhapus_user', 'password': 'pass123'})
+    with app.app_context():
+        student_ids = [s.id for s in Student.query.order_by(Student.id)]
+    for student_id in student_ids:
+        client.post(f'/student/delete/{student_id}')
+    client.post(f'/classes/delete/{kelas_id}')
+    with app.app_context():
+        assert Student.query.count() == 0 and Classroom.query.count() == 0
+
+    # Siswa baru bisa dipulihkan setelah kelasnya
+    page = client.post(f'/trash/student/{student_ids[0]}/restore', follow_redirects=True).get_data(as_text=True)
+    assert 'Pulihkan dulu kelas 8A' in page
+    with app.app_context():
+        assert Student.query.count() == 0
+
+    # Membuat kelas dengan nama yang sama memulihkan kelas lama (nama kelas unik per sekolah)
+    client.post('/classes', data={'class_name': '8A'})
+    client.post(f'/trash/student/{student_ids[0]}/restore')
+    with app.app_context():
+        assert [c.id for c in Classroom.query] == [kelas_id]
+        assert [s.id for s in db.session.get(Classroom, kelas_id).students] == [student_ids[0]]
+
+
+def test_purge_deleted_command_and_ayat_links(client, app):
+    school_id, _, _ = _setup_school(app)
+    client.post('/login', data={'username': 'terhapus_user', 'password': 'pass123'})
+    old = datetime.utcnow() - timedelta(days=40)
+    with app.app_context():
+        rule = ViolationRule(code="P1", description="Kedisiplinan", school_id=school_id)
+        db.session.add(rule)
+        db.session.flush()
+        ayat = Ayat(number="1", description="Upacara", rule_id=rule.id)
+        citra, dodi = Student.query.order_by(Student.id).all()
+        lama = Violation(description="Lama", points=5, student_id=citra.id, deleted_at=old, ayats=[ayat])
+        baru = Violation(description="Baru", points=5, student_id=citra.id, deleted_at=datetime.utcnow())
+        dodi.deleted_at = old
+        db.session.add_all([lama, baru])
+        db.session.commit()
+        baru_id, citra_id, dodi_id, ayat_id = baru.id, citra.id, dodi.id, ayat.id
+
+    # Menghapus ayat ikut melepas tautannya ke pelanggaran terhapus
+    client.post('/settings/ayats', data={'action': 'delete', 'ayat_id': ayat_id})
+    with app.app_context():
+        assert db.session.execute(db.select(violation_ayats)).all() == []
+
+    result = app.test_cli_runner().invoke(args=['purge-deleted', '--days', '30', '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert '1 pelanggaran, 1 siswa dan 0 kelas' in result.output
+    with app.app_context():
+        assert [v.id for v in Violation.query.execution_options(include_deleted=True)] == [baru_id]
+        assert [s.id for s in Student.query.execution_options(include_deleted=True)] == [citra_id]
+        assert Student.query.execution_options(include_deleted=True).filter_by(id=dodi_id).first() is None
+
+
+def test_delete_graduated_student(client, app):
+    _setup_school(app)
+    client.post('/login', data={'username': 'terhapus_user', 'password': 'pass123'})
+    with app.app_context():
+        citra, dodi = Student.query.order_by(Student.id).all()
+        db.session.add(Violation(description="Bolos", points=30, student_id=citra.id))
+        # Siswa lulus (kenaikan kelas) tidak punya kelas lagi
+        for student in (citra, dodi):
+            student.classroom_id, student.graduated_at = None, datetime.utcnow()
+        db.session.commit()
+        citra_id, dodi_id = citra.id, dodi.id
+
+    response = client.post(f'/student/delete/{citra_id}')
+    assert response.status_code == 302 and response.headers['Location'] == '/index'
+    response = client.post(f'/student/delete/{dodi_id}')
+    assert response.status_code == 302 and response.headers['Location'] == '/trash'
+    with app.app_context():
+        assert [s.id for s in Student.query] == [citra_id]